@@ -0,0 +1,179 @@
+# BinaryCatalog.py
+
+import mmap
+import struct
+import sys
+from array import array
+
+from IngredientRegistry import IngredientRegistry, get_registry
+
+# 파일 구조 (리틀 엔디언, 모든 구간은 4바이트 정렬)
+#   헤더      : magic "CKTB", version, 노드 수, 문자열 수, 재료 참조 수, 문자열 blob 크기 (u32),
+#               원본 JSON의 sha256 (32바이트, 모르면 0) → 스냅숏이 지금 JSON에서 만들어졌는지 확인용
+#   문자열 표 : (문자열 수 + 1)개의 u32 오프셋 + UTF-8 blob  → 이름/재료 문자열은 한 번씩만 저장
+#   노드 배열 : 전위 순회 순서로 노드마다 i32 5개
+#               (부모 번호(루트는 -1), 이름 문자열 id, 재료 시작 위치, 재료 개수, 서브트리 끝 번호)
+#   재료 참조 : 각 노드의 인크리멘털 재료 문자열 id (u32)
+MAGIC = b"CKTB"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sIIIII32s")
+NODE_FIELDS = 5
+PARENT, NAME, ING_START, ING_COUNT, SUBTREE_END = range(NODE_FIELDS)
+
+
+def _pad4(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def compile_catalog(data: dict, out_path: str, registry: IngredientRegistry = None,
+                    source_digest: str = None) -> int:
+    """
+    cocktails.json 형식의 딕셔너리를 바이너리 카탈로그 파일로 저장한다. 노드 수를 반환.
+    재료는 CocktailTree와 같은 레지스트리의 대표 이름으로 바꿔 저장한다.
+    source_digest: 원본 JSON 파일 내용의 sha256 (hexdigest). 헤더에 적어 두면 read_source_digest로 확인할 수 있다.
+    """
+    intern_name = (registry or get_registry()).intern_name
+    string_ids = {}
+    strings = []
+
+    def intern(s: str) -> int:
+        sid = string_ids.get(s)
+        if sid is None:
+            sid = string_ids[s] = len(strings)
+            strings.append(s)
+        return sid
+
+    nodes = array("i")
+    ing_refs = array("I")
+
+    # 전위 순회 (재귀 없이). 서브트리 끝 번호는 자식을 모두 기록한 뒤 채운다.
+    stack = [(data, -1, False)]
+    open_nodes = []
+    while stack:
+        node_data, parent, closing = stack.pop()
+        if closing:
+            nodes[open_nodes.pop() * NODE_FIELDS + SUBTREE_END] = len(nodes) // NODE_FIELDS
+            continue
+        index = len(nodes) // NODE_FIELDS
+        ings = node_data.get("ingredients", [])
+        nodes.extend((parent, intern(node_data["name"].strip()), len(ing_refs), len(ings), 0))
+        ing_refs.extend(intern(intern_name(ing)) for ing in ings)
+        open_nodes.append(index)
+        stack.append((None, None, True))
+        for child_data in reversed(node_data.get("children", [])):
+            stack.append((child_data, index, False))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    blob = b"".join(encoded)
+
+    if sys.byteorder != "little":
+        for arr in (nodes, ing_refs, offsets):
+            arr.byteswap()
+
+    with open(out_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(nodes) // NODE_FIELDS,
+                            len(strings), len(ing_refs), len(blob),
+                            bytes.fromhex(source_digest) if source_digest else b""))
+        f.write(offsets.tobytes())
+        f.write(blob + b"\0" * (_pad4(len(blob)) - len(blob)))
+        f.write(nodes.tobytes())
+        f.write(ing_refs.tobytes())
+    return len(nodes) // NODE_FIELDS
+
+
+def read_source_digest(path: str):
+    """바이너리 카탈로그 헤더에 적힌 원본 JSON의 sha256 (hexdigest). 적혀 있지 않으면 None. (헤더만 읽는다)"""
+    with open(path, "rb") as f:
+        magic, version, *_, digest = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path}: 지원하지 않는 카탈로그 형식입니다.")
+    return digest.hex() if any(digest) else None
+
+
+class MappedCatalog:
+    """
+    바이너리 카탈로그를 mmap으로 여는 읽기 전용 뷰.
+    파일을 열 때는 헤더만 읽고, 노드/문자열은 접근할 때 mmap된 페이지에서 바로 꺼내므로
+    카탈로그 크기와 상관없이 여는 시간이 거의 일정하다.
+    - name(i), parent(i), ingredients(i), subtree_end(i), children(i): 노드 i의 정보 (i는 전위 순회 번호)
+    - nodes / ing_refs / string_offsets: 파일 위의 정수 배열 (memoryview, 복사 없음)
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise ValueError("바이너리 카탈로그는 리틀 엔디언 시스템에서만 mmap으로 읽을 수 있습니다.")
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, node_count, string_count, ref_count, blob_size, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: 지원하지 않는 카탈로그 형식입니다.")
+        self.node_count = node_count
+        self.string_count = string_count
+
+        pos = HEADER.size
+        self.string_offsets = self._view[pos:pos + 4 * (string_count + 1)].cast("I")
+        pos += 4 * (string_count + 1)
+        self._blob = self._view[pos:pos + blob_size]
+        pos += _pad4(blob_size)
+        self.nodes = self._view[pos:pos + 4 * NODE_FIELDS * node_count].cast("i")
+        pos += 4 * NODE_FIELDS * node_count
+        self.ing_refs = self._view[pos:pos + 4 * ref_count].cast("I")
+
+    def string(self, sid: int) -> str:
+        return bytes(self._blob[self.string_offsets[sid]:self.string_offsets[sid + 1]]).decode("utf-8")
+
+    def strings(self) -> list:
+        """문자열 표 전체를 디코딩한 리스트 (노드를 많이 읽을 때 한 번만 디코딩하기 위함)."""
+        return [self.string(sid) for sid in range(self.string_count)]
+
+    def name_id(self, i: int) -> int:
+        return self.nodes[i * NODE_FIELDS + NAME]
+
+    def name(self, i: int) -> str:
+        return self.string(self.name_id(i))
+
+    def parent(self, i: int) -> int:
+        return self.nodes[i * NODE_FIELDS + PARENT]
+
+    def subtree_end(self, i: int) -> int:
+        return self.nodes[i * NODE_FIELDS + SUBTREE_END]
+
+    def ingredient_ids(self, i: int):
+        start = self.nodes[i * NODE_FIELDS + ING_START]
+        return self.ing_refs[start:start + self.nodes[i * NODE_FIELDS + ING_COUNT]]
+
+    def ingredients(self, i: int) -> list:
+        return [self.string(sid) for sid in self.ingredient_ids(i)]
+
+    def children(self, i: int) -> list:
+        """노드 i의 자식 번호들. 자식은 i+1부터 시작하고 서브트리 끝 번호로 다음 형제로 건너뛴다."""
+        result = []
+        child = i + 1
+        end = self.subtree_end(i)
+        while child < end:
+            result.append(child)
+            child = self.subtree_end(child)
+        return result
+
+    def close(self):
+        # mmap을 닫기 전에 파일 위의 memoryview들을 먼저 놓아야 한다.
+        for attr in ("nodes", "ing_refs", "string_offsets", "_blob", "_view"):
+            view = self.__dict__.pop(attr, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,99 @@
+# CatalogCache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from CocktailTree import CocktailTree
+
+
+class CatalogCache:
+    """
+    카탈로그 파일(cocktails.json) → CocktailTree 캐시.
+    프로세스 전체에서 하나를 공유하며, 돌려받은 트리는 읽기 전용으로만 사용해야 한다.
+    - get(): 파일 mtime이 그대로면 캐시된 트리를 반환.
+             mtime이 바뀌면 내용 해시(sha256)를 비교해서 실제로 내용이 달라졌을 때만 다시 빌드.
+    - stats(): 빌드 횟수 / 캐시 적중 횟수 / 빌드·확인에 걸린 시간
+    - add_reload_listener(fn): 트리를 새로 빌드할 때마다 fn(새 트리)를 호출 (결과 캐시 비우기 등)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tree = None
+        self.mtime = None
+        self.digest = None
+        self.lock = threading.Lock()
+
+        self.build_count = 0
+        self.hit_count = 0
+        self.first_build_seconds = None
+        self.last_build_seconds = None
+        self.last_check_seconds = None
+        self.reload_listeners = []
+
+    def add_reload_listener(self, listener):
+        if listener not in self.reload_listeners:
+            self.reload_listeners.append(listener)
+
+    def get(self) -> CocktailTree:
+        with self.lock:
+            start = time.perf_counter()
+            mtime = os.stat(self.path).st_mtime_ns
+            if self.tree is not None and mtime == self.mtime:
+                self.hit_count += 1
+                self.last_check_seconds = time.perf_counter() - start
+                return self.tree
+
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if self.tree is not None and digest == self.digest:
+                # 파일을 다시 저장했지만 내용은 같은 경우 (touch 등)
+                self.mtime = mtime
+                self.hit_count += 1
+                self.last_check_seconds = time.perf_counter() - start
+                return self.tree
+
+            tree = CocktailTree()
+            tree.build_tree_from_dict(json.loads(raw.decode("utf-8")))
+            elapsed = time.perf_counter() - start
+
+            self.tree, self.mtime, self.digest = tree, mtime, digest
+            self.build_count += 1
+            self.last_build_seconds = elapsed
+            self.last_check_seconds = elapsed
+            if self.first_build_seconds is None:
+                self.first_build_seconds = elapsed
+            for listener in self.reload_listeners:
+                listener(tree)
+            return tree
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "build_count": self.build_count,
+            "hit_count": self.hit_count,
+            "first_build_ms": _ms(self.first_build_seconds),
+            "last_build_ms": _ms(self.last_build_seconds),
+            "last_check_ms": _ms(self.last_check_seconds),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(path: str) -> CatalogCache:
+    """경로별로 프로세스 전체에서 하나뿐인 CatalogCache를 반환한다."""
+    key = os.path.abspath(path)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = CatalogCache(path)
+        return cache
@@ -0,0 +1,303 @@
+# CatalogManager.py
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from Metrics import registry
+
+# json / hashlib / CocktailTree는 처음 빌드할 때 불러온다.
+# wait=False면 그 시간(re, _hashlib 등)까지 감시 스레드로 넘어가 시작 화면이 먼저 뜬다.
+
+
+class ReadWriteLock:
+    """
+    읽기는 여럿이 동시에, 쓰기는 혼자만. 쓰기가 기다리는 동안에는 새 읽기를 받지 않는다 (쓰기 굶주림 방지).
+    재진입은 안 된다 (read() 안에서 write()를 부르면 멈춘다).
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.readers -= 1
+                if not self.readers:
+                    self.cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self.cond:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.cond.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.writer = False
+                self.cond.notify_all()
+
+
+class CatalogManager:
+    """
+    카탈로그 파일(cocktails.json 또는 makeBinary.py의 cocktails.bin)을 지켜보다가
+    바뀌면 새 트리를 따로 만들어 두고 한 번에 바꿔 끼운다 (재시작 없이 반영).
+    - tree: 지금 트리. 교체되어도 이미 받아 둔 트리는 그대로 끝까지 쓸 수 있다.
+    - read(): with manager.read() as tree: — 그 사이에는 델타가 트리를 고치지 않는다.
+    - check(): 파일이 바뀌었는지 지금 확인하고, 바뀌었으면 이 스레드에서 빌드해 교체
+    - start() / stop(): interval초마다 check()하는 백그라운드 감시 스레드
+    - apply_delta(ops): 레시피 서브트리 추가/삭제/이동을 트리를 다시 만들지 않고 반영
+      (매처와 이름 색인만 그 자리에서 고친다. 나머지 파생 구조는 다음 조회 때 다시 만든다)
+      [{"op": "add", "parent": 부모, "recipe": {"name", "ingredients", "children"}},
+       {"op": "remove", "name": 칵테일}, {"op": "move", "name": 칵테일, "parent": 새 부모}]
+    - add_reload_listener(fn): 교체하거나 델타를 적용할 때마다 fn(트리) 호출 (결과 캐시 비우기 등)
+    - wait=False: 첫 트리도 감시 스레드에서 만든다. 그동안 tree는 None이고,
+      read() / wait()는 첫 트리가 준비될 때까지 기다린다 (로그인 화면을 먼저 띄우는 용도).
+    - snapshot=True: JSON을 감시할 때 같은 이름의 .bin(makeBinary.py의 출력)을 미리 컴파일된 스냅숏으로 쓴다.
+      스냅숏 헤더의 원본 sha256이 지금 JSON 내용과 같으면 JSON 파싱 없이 스냅숏에서 트리를 만들고,
+      JSON에서 만들었으면 스냅숏을 다시 쓴다. (mtime은 믿지 않는다: 내용만 바뀌고 mtime이 그대로인 경우도 있다)
+    파일이 쓰는 도중이라 크기/mtime이 settle초 동안 그대로가 아니거나 읽기에 실패하면(JSON 오류 등)
+    지금 트리를 그대로 두고 last_error에 남긴 뒤 다음 확인 때 다시 시도한다.
+    델타는 메모리의 트리만 고친다. 파일이 바뀌어 다시 불러오면 파일 내용이 기준이 된다.
+    """
+
+    def __init__(self, path: str, interval: float = 2.0, settle: float = 0.1,
+                 wait: bool = True, snapshot: bool = True):
+        self.path = path
+        self.interval = interval
+        self.settle = settle
+        self.snapshot_path = None
+        if snapshot and path.endswith(".json"):
+            self.snapshot_path = path[:-len(".json")] + ".bin"
+        self.lock = ReadWriteLock()
+        self.check_lock = threading.Lock()  # 빌드는 한 번에 하나씩
+        self.tree = None
+        self.signature = None
+        self.digest = None
+        self.reload_listeners = []
+
+        self.reload_count = 0
+        self.delta_count = 0
+        self.last_build_seconds = None
+        self.last_source = None
+        self.last_error = None
+        self.first_check = threading.Event()  # 첫 빌드를 마쳤거나 실패했으면 set
+
+        self.stopping = threading.Event()
+        self.thread = None
+        if wait:
+            self.wait()
+        else:
+            self.start()
+
+    def add_reload_listener(self, listener):
+        if listener not in self.reload_listeners:
+            self.reload_listeners.append(listener)
+
+    def wait(self, timeout: float = None):
+        """첫 트리가 준비될 때까지 기다렸다가 지금 트리를 돌려준다. 첫 빌드가 실패했으면 그 오류를 낸다."""
+        while self.tree is None and self.thread is None and not self.first_check.is_set():
+            self.check()  # 감시 스레드가 없으면 이 스레드에서 만든다 (쓰는 중인 파일이면 다시 시도)
+        if not self.first_check.wait(timeout):
+            raise TimeoutError(f"{self.path}: {timeout}초 안에 카탈로그를 불러오지 못했습니다.")
+        if self.tree is None:
+            raise self.last_error
+        return self.tree
+
+    @contextmanager
+    def read(self):
+        if self.tree is None:
+            self.wait()
+        with self.lock.read():
+            yield self.tree
+
+    # ─── 파일 감시 / 교체 ────────────────────────────────────────────────────────
+    def _signature(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _fresh_snapshot(self, digest: str) -> bool:
+        """스냅숏이 있고 지금 JSON 내용(sha256)에서 컴파일된 것인지 (헤더만 읽는다)"""
+        from BinaryCatalog import read_source_digest
+
+        try:
+            return read_source_digest(self.snapshot_path) == digest
+        except Exception:
+            return False  # 없거나, 예전 형식이거나, 깨진 스냅숏
+
+    def _write_snapshot(self, data: dict, digest: str):
+        from BinaryCatalog import compile_catalog
+
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            compile_catalog(data, tmp_path, source_digest=digest)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            registry.inc("catalog_manager_snapshot_errors_total")
+
+    def _build(self, raw: bytes, digest: str):
+        import json
+
+        from CocktailTree import CocktailTree
+
+        tree = CocktailTree()
+        if self.path.endswith(".bin"):
+            tree.build_tree_from_binary(self.path)
+            self.last_source = "binary"
+            return tree
+        if self.snapshot_path is not None and self._fresh_snapshot(digest):
+            try:
+                tree.build_tree_from_binary(self.snapshot_path)
+                self.last_source = "snapshot"
+                return tree
+            except Exception:
+                tree = CocktailTree()  # 깨진 스냅숏이면 JSON에서 다시 만든다
+        data = json.loads(raw.decode("utf-8"))
+        tree.build_tree_from_dict(data)
+        self.last_source = "json"
+        if self.snapshot_path is not None:
+            self._write_snapshot(data, digest)
+        return tree
+
+    def check(self) -> bool:
+        """파일이 바뀌었으면 새 트리를 만들어 교체하고 True. (빌드하는 동안에도 지금 트리로 계속 읽을 수 있다)"""
+        with self.check_lock:
+            try:
+                signature = self._signature()
+                if signature == self.signature:
+                    return False
+                # 고친 지 settle초가 안 됐으면 쓰는 중일 수 있으니 잠깐 기다렸다가 그대로인지 확인
+                if time.time_ns() - signature[0] < self.settle * 1e9:
+                    time.sleep(self.settle)
+                    if self._signature() != signature:
+                        return False
+                import hashlib
+
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if digest == self.digest:
+                    self.signature = signature  # 내용은 같고 mtime만 바뀐 경우
+                    return False
+
+                start = time.perf_counter()
+                tree = self._build(raw, digest)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                self.last_error = e
+                registry.inc("catalog_manager_reload_errors_total")
+                self.first_check.set()
+                return False
+
+            with self.lock.write():
+                self.tree = tree
+            self.signature, self.digest = signature, digest
+            self.reload_count += 1
+            self.last_build_seconds = elapsed
+            self.last_error = None
+            registry.inc("catalog_manager_reloads_total")
+            self.first_check.set()
+        for listener in self.reload_listeners:
+            listener(tree)
+        return True
+
+    def _run(self):
+        if self.tree is None:
+            self.check()
+        while not self.stopping.wait(self.interval):
+            self.check()
+
+    def start(self) -> "CatalogManager":
+        if self.thread is None or not self.thread.is_alive():
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # ─── 델타 ──────────────────────────────────────────────────────────────────
+    def apply_delta(self, ops) -> int:
+        """
+        ops를 순서대로 지금 트리에 적용하고 적용한 개수를 반환한다.
+        중간 항목이 잘못되면(없는 칵테일 등) 그 앞까지만 적용된 채로 ValueError를 낸다.
+        트리의 매처와 이름 색인은 그 부분만 고치지만, 트리 버전이 바뀌므로 RecipeDAG, 열어 둔 냉장고
+        (IncrementalFridge), 유사도용 IDF / 비트셋 캐시는 다음에 쓸 때 다시 만든다.
+        10만 레시피 기준 델타 하나는 수십~100ms, 그다음 조회는 find_possible_cocktails가 거의 그대로,
+        open_fridge 약 30ms, find_similar_cocktails 40~150ms, use_dag 조회 1초 이상 (benchmarks/bench_delta.py).
+        """
+        applied = 0
+        try:
+            with self.lock.write():
+                tree = self.tree
+                for op in ops:
+                    kind = op.get("op")
+                    if kind == "add":
+                        tree.add_recipe(op["parent"], op["recipe"])
+                    elif kind == "remove":
+                        tree.remove_recipe(op["name"])
+                    elif kind == "move":
+                        tree.move_recipe(op["name"], op["parent"])
+                    else:
+                        raise ValueError(f"알 수 없는 델타 종류입니다: {kind}")
+                    applied += 1
+        finally:
+            if applied:
+                self.delta_count += applied
+                for listener in self.reload_listeners:
+                    listener(tree)
+        return applied
+
+    def apply_delta_file(self, path: str) -> int:
+        """apply_delta와 같은 형식의 JSON 리스트 파일을 적용한다."""
+        import json
+
+        with open(path, "r", encoding="utf-8") as f:
+            return self.apply_delta(json.load(f))
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "version": None if self.tree is None else self.tree.version,
+            "source": self.last_source,
+            "reload_count": self.reload_count,
+            "delta_count": self.delta_count,
+            "last_build_ms": None if self.last_build_seconds is None else round(self.last_build_seconds * 1000, 3),
+            "last_error": repr(self.last_error) if self.last_error else None,
+        }
+
+
+_shared_managers = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_manager(path: str, interval: float = 2.0, wait: bool = True) -> CatalogManager:
+    """
+    경로별로 프로세스 전체에서 하나뿐인 CatalogManager (감시 스레드도 시작해서) 를 반환한다.
+    wait=False면 첫 트리를 백그라운드에서 만들기 시작하고 바로 돌아온다.
+    """
+    key = os.path.abspath(path)
+    with _shared_lock:
+        manager = _shared_managers.get(key)
+        if manager is None:
+            manager = _shared_managers[key] = CatalogManager(path, interval, wait=wait).start()
+        return manager
@@ -0,0 +1,529 @@
+# CocktailMatcher.py
+
+import heapq
+import math
+from bisect import bisect_left
+from collections import Counter
+
+
+def iter_bits(bits: int):
+    """
+    정수 비트셋에서 켜진 비트의 위치를 작은 번호부터 차례로 돌려준다.
+    (bin 문자열을 뒤집어 str.find로 훑으므로 큰 비트셋도 C 속도로 디코딩된다)
+    """
+    s = bin(bits)[:1:-1]
+    i = s.find("1")
+    while i != -1:
+        yield i
+        i = s.find("1", i + 1)
+
+
+def popcount(bits: int) -> int:
+    """정수 비트셋에서 켜진 비트 수. (int.bit_count는 3.10부터라 3.9에서도 되도록 bin 문자열로 센다)"""
+    return bin(bits).count("1")
+
+
+class CocktailMatcher:
+    """
+    CocktailTree를 정수 비트셋으로 컴파일한 매칭 엔진.
+    - ingredient_ids: 재료 이름 → 정수 id
+    - ingredient_names: 정수 id → 재료 이름
+    - nodes: 칵테일 번호(전위 순회 순서) → CocktailNode ("Empty Glass" 제외)
+    - recipe_masks[r]: 칵테일 r에 필요한 재료 비트마스크 (비트 i = 재료 id i)
+    - recipe_sizes[r]: 칵테일 r에 필요한 (서로 다른) 재료 개수
+    - recipe_ids[i]: 재료 i를 사용하는 칵테일 번호 리스트 (오름차순) → 역색인
+    - postings[i]: recipe_ids[i]를 비트셋으로 만든 것 (비트 r = 칵테일 r)
+    - parents[r] / subtree_ends[r]: 트리에서 부모 칵테일 번호(없으면 -1) / 서브트리가 끝나는 다음 번호
+    - version: 컴파일할 때의 트리 버전 (트리가 바뀌면 다시 컴파일해야 함)
+    - insert_subtree(node) / remove_subtree(node): 서브트리 하나가 붙거나 떨어졌을 때 다시 컴파일하지 않고 고친다
+      (version은 호출한 쪽이 새 트리 버전으로 맞춘다)
+    - rank_similar(my_ingredients, top_k, metric): 냉장고와 재료가 가장 많이 겹치는 칵테일 상위 top_k개
+      (역색인 = 희소 재료×칵테일 행렬의 열. 냉장고 재료의 열만 더하므로 겹치는 칵테일만 센다)
+
+    "이 냉장고로 만들 수 있는 칵테일" = 전체 칵테일 비트셋에서
+    냉장고에 없는 재료들의 역색인 비트셋을 OR 해서 빼는 것 → 칵테일 전체를 한 번에 검사한다.
+    """
+
+    def __init__(self, root):
+        self.version = root.version
+        self.ingredient_ids = {}
+        self.ingredient_names = []
+        self.nodes = []
+        self.names = []
+        self.recipe_masks = []
+        self.recipe_sizes = []
+        self.recipe_ids = []
+        self.parents = []
+
+        # 전위 순회(재귀 없이) → 칵테일 번호가 기존 DFS 출력 순서와 같다.
+        stack = [(root, -1)]
+        while stack:
+            node, parent_r = stack.pop()
+            if node.name != "Empty Glass":
+                r = len(self.nodes)
+                mask = 0
+                size = 0
+                for ing in node.full_ingredients:
+                    ing_id = self.ingredient_ids.get(ing)
+                    if ing_id is None:
+                        ing_id = self.intern(ing)
+                        self.recipe_ids.append([])
+                    elif mask >> ing_id & 1:
+                        continue
+                    mask |= 1 << ing_id
+                    size += 1
+                    self.recipe_ids[ing_id].append(r)
+                self.nodes.append(node)
+                self.names.append(node.name)
+                self.recipe_masks.append(mask)
+                self.recipe_sizes.append(size)
+                self.parents.append(parent_r)
+                parent_r = r
+            stack.extend((child, parent_r) for child in reversed(node.children))
+
+        self.subtree_ends = list(range(1, len(self.nodes) + 1))
+        for r in range(len(self.nodes) - 1, -1, -1):
+            p = self.parents[r]
+            if p >= 0 and self.subtree_ends[r] > self.subtree_ends[p]:
+                self.subtree_ends[p] = self.subtree_ends[r]
+
+        self.postings = [self.to_bits(ids) for ids in self.recipe_ids]
+        self.all_recipes = (1 << len(self.nodes)) - 1
+        self._idf = self._size_bits = None
+
+    # ─── 증분 갱신 (CocktailTree.add_recipe / remove_recipe / move_recipe) ──────────
+    def _recipe_id(self, node) -> int:
+        """노드의 칵테일 번호. 루트("Empty Glass")면 -1."""
+        if node.name == "Empty Glass" and node.parent is None:
+            return -1
+        return self.nodes.index(node)
+
+    def insert_subtree(self, node):
+        """
+        node(부모의 마지막 자식으로 방금 붙은 서브트리)를 다시 컴파일하지 않고 끼워 넣는다.
+        전위 순회에서 서브트리는 부모 서브트리의 끝(pos)에 들어가므로 pos 이후 번호를 k만큼 밀고,
+        역색인 비트셋은 pos에서 잘라 위쪽만 k비트 올린다. (재료 id는 새 재료만 뒤에 추가)
+        """
+        parent_r = self._recipe_id(node.parent)
+        pos = len(self.nodes) if parent_r < 0 else self.subtree_ends[parent_r]
+
+        # 새 칵테일들 (전위 순회 순서)
+        new_nodes, new_parents, new_masks, new_sizes = [], [], [], []
+        new_ids = {}  # 재료 id → 새 칵테일 번호 리스트
+        stack = [(node, parent_r)]
+        while stack:
+            n, p = stack.pop()
+            r = pos + len(new_nodes)
+            mask = 0
+            for ing in n.full_ingredients:
+                ing_id = self.ingredient_ids.get(ing)
+                if ing_id is None:
+                    ing_id = self.intern(ing)
+                    self.recipe_ids.append([])
+                    self.postings.append(0)
+                elif mask >> ing_id & 1:
+                    continue
+                mask |= 1 << ing_id
+                new_ids.setdefault(ing_id, []).append(r)
+            new_nodes.append(n)
+            new_parents.append(p)
+            new_masks.append(mask)
+            new_sizes.append(popcount(mask))
+            stack.extend((child, r) for child in reversed(n.children))
+        k = len(new_nodes)
+        new_ends = list(range(pos + 1, pos + k + 1))
+        for i in range(k - 1, -1, -1):
+            p = new_parents[i] - pos
+            if p >= 0 and new_ends[i] > new_ends[p]:
+                new_ends[p] = new_ends[i]
+
+        # 기존 번호 밀기. 끝이 pos인 서브트리 중 새 서브트리를 품는 건 부모와 그 조상뿐이다.
+        self.parents = [p + k if p >= pos else p for p in self.parents]
+        self.subtree_ends = [e + k if e > pos else e for e in self.subtree_ends]
+        a = parent_r
+        while a >= 0:
+            if self.subtree_ends[a] == pos:
+                self.subtree_ends[a] = pos + k
+            a = self.parents[a]
+
+        self.nodes[pos:pos] = new_nodes
+        self.names[pos:pos] = [n.name for n in new_nodes]
+        self.parents[pos:pos] = new_parents
+        self.subtree_ends[pos:pos] = new_ends
+        self.recipe_masks[pos:pos] = new_masks
+        self.recipe_sizes[pos:pos] = new_sizes
+
+        low = (1 << pos) - 1
+        for ing_id, ids in enumerate(self.recipe_ids):
+            added = new_ids.get(ing_id, ())
+            i = bisect_left(ids, pos)
+            if i == len(ids) and not added:
+                continue
+            ids[i:] = [*added, *(r + k for r in ids[i:])]
+            bits = self.postings[ing_id]
+            self.postings[ing_id] = (bits & low) | (bits >> pos << (pos + k)) | self.to_bits(added)
+        self.all_recipes = (1 << len(self.nodes)) - 1
+        self._idf = self._size_bits = None
+
+    def remove_subtree(self, node):
+        """
+        node 서브트리를 떼어낸다 (트리에서 떼기 전/후 어느 쪽이든 호출 가능).
+        [r, end) 범위를 지우고 그 뒤 번호를 k만큼 당긴다. 쓰이지 않게 된 재료 id도 그대로 남는다.
+        """
+        r = self.nodes.index(node)
+        end = self.subtree_ends[r]
+        k = end - r
+
+        for lst in (self.nodes, self.names, self.parents, self.subtree_ends, self.recipe_masks, self.recipe_sizes):
+            del lst[r:end]
+        self.parents = [p - k if p >= end else p for p in self.parents]
+        self.subtree_ends = [e - k if e >= end else e for e in self.subtree_ends]
+
+        low = (1 << r) - 1
+        for ing_id, ids in enumerate(self.recipe_ids):
+            i = bisect_left(ids, r)
+            if i == len(ids):
+                continue
+            j = bisect_left(ids, end, i)
+            ids[i:] = [x - k for x in ids[j:]]
+            bits = self.postings[ing_id]
+            self.postings[ing_id] = (bits & low) | (bits >> end << r)
+        self.all_recipes = (1 << len(self.nodes)) - 1
+        self._idf = self._size_bits = None
+
+    def intern(self, ingredient: str) -> int:
+        ing_id = len(self.ingredient_names)
+        self.ingredient_ids[ingredient] = ing_id
+        self.ingredient_names.append(ingredient)
+        return ing_id
+
+    def to_bits(self, recipe_ids) -> int:
+        """
+        칵테일 번호 리스트 → 비트셋.
+        (1 << r 을 하나씩 OR 하면 매번 큰 정수를 새로 만들므로 bytearray에 비트를 찍고 한 번에 변환)
+        """
+        buf = bytearray((len(self.nodes) + 7) // 8)
+        for r in recipe_ids:
+            buf[r >> 3] |= 1 << (r & 7)
+        return int.from_bytes(buf, "little")
+
+    def fridge_mask(self, my_ingredients) -> int:
+        """사용자 재료를 재료 비트마스크로 변환 (카탈로그에 없는 재료는 무시)."""
+        mask = 0
+        ids = self.ingredient_ids
+        for ing in my_ingredients:
+            ing_id = ids.get(ing)
+            if ing_id is not None:
+                mask |= 1 << ing_id
+        return mask
+
+    def missing_levels(self, my_ingredients, k: int):
+        """
+        칵테일별 "부족한 재료 개수"를 비트 슬라이스 카운터로 센다.
+        반환: (냉장고 마스크, levels)
+        - levels[j]: 부족한 재료가 j+1개 이상인 칵테일 비트셋 (j = 0..k, k+1개 이상은 포화)
+        냉장고에 없는 재료마다 역색인 비트셋을 한 단계씩 올려 더하므로,
+        노드마다 재료 리스트를 비교하지 않고 칵테일 전체를 한 번에 센다.
+        """
+        fridge = self.fridge_mask(my_ingredients)
+        levels = [0] * (k + 1)
+        for ing_id, users in enumerate(self.postings):
+            if fridge >> ing_id & 1:
+                continue
+            for j in range(k, 0, -1):
+                if levels[j - 1]:
+                    levels[j] |= levels[j - 1] & users
+            levels[0] |= users
+        return fridge, levels
+
+    def makeable_bits(self, my_ingredients) -> int:
+        """만들 수 있는 칵테일들의 비트셋 (비트 r = 칵테일 r)."""
+        _, levels = self.missing_levels(my_ingredients, 0)
+        return self.all_recipes & ~levels[0]
+
+    def find_possible_cocktails(self, my_ingredients) -> list:
+        """CocktailTree.find_possible_cocktails와 같은 결과(같은 순서)를 비트셋 연산으로 구한다."""
+        names = self.names
+        return [names[r] for r in iter_bits(self.makeable_bits(my_ingredients))]
+
+    def recommend_with_one_missing(self, my_ingredients) -> dict:
+        """CocktailTree.recommend_with_one_missing과 같은 형식 { 부족재료: [칵테일, ...] }."""
+        fridge, levels = self.missing_levels(my_ingredients, 1)
+        missing_to_cocktails = {}
+        for r in iter_bits(levels[0] & ~levels[1]):
+            missing = self.ingredient_names[(self.recipe_masks[r] & ~fridge).bit_length() - 1]
+            missing_to_cocktails.setdefault(missing, []).append(self.names[r])
+        return missing_to_cocktails
+
+    def recommend_with_k_missing(self, my_ingredients, k: int) -> dict:
+        """
+        재료를 최대 k개 더 사면 만들 수 있는 칵테일.
+        반환 형식: { 부족한 개수(1..k): [(칵테일, [부족재료, ...]), ...], ... } (트리 순서)
+        """
+        fridge, levels = self.missing_levels(my_ingredients, k)
+        needed = levels[0] & ~levels[k]
+        names = self.ingredient_names
+        by_count = {}
+        for r in iter_bits(needed):
+            missing = [names[i] for i in iter_bits(self.recipe_masks[r] & ~fridge)]
+            by_count.setdefault(len(missing), []).append((self.names[r], missing))
+        return dict(sorted(by_count.items()))
+
+    def recommend_purchases(self, my_ingredients, top_n: int = None) -> list:
+        """
+        재료 하나를 샀을 때 새로 만들 수 있게 되는 칵테일 수로 재료 순위를 매긴다.
+        반환 형식: [(재료, 늘어나는 칵테일 수, [칵테일, ...]), ...] (많은 순)
+        """
+        fridge, levels = self.missing_levels(my_ingredients, 1)
+        one_missing = levels[0] & ~levels[1]
+        ranking = []
+        if one_missing:
+            for ing_id, users in enumerate(self.postings):
+                if fridge >> ing_id & 1:
+                    continue
+                unlocked = one_missing & users
+                if unlocked:
+                    ranking.append((popcount(unlocked), ing_id, unlocked))
+        ranking.sort(key=lambda item: (-item[0], item[1]))
+        if top_n is not None:
+            ranking = ranking[:top_n]
+        return [(self.ingredient_names[ing_id], count, [self.names[r] for r in iter_bits(unlocked)])
+                for count, ing_id, unlocked in ranking]
+
+    def idf_weights(self):
+        """
+        (재료별 IDF 가중치, 칵테일별 재료 가중치 합, 카탈로그에 없는 재료의 가중치).
+        idf = log((칵테일 수 + 1) / (그 재료를 쓰는 칵테일 수 + 1)) + 1 → 흔한 재료일수록 작다.
+        처음 쓸 때 한 번 계산해 둔다 (서브트리를 끼우거나 떼면 다시 계산).
+        """
+        if self._idf is None:
+            n = len(self.nodes)
+            weights = [math.log((n + 1) / (len(ids) + 1)) + 1 for ids in self.recipe_ids]
+            recipe_weights = [0.0] * n
+            for ing_id, ids in enumerate(self.recipe_ids):
+                w = weights[ing_id]
+                for r in ids:
+                    recipe_weights[r] += w
+            self._idf = (weights, recipe_weights, math.log(n + 1) + 1)
+        return self._idf
+
+    def size_classes(self) -> dict:
+        """재료 개수 → 그 개수의 재료가 필요한 칵테일 비트셋 (처음 쓸 때 만든다)."""
+        if self._size_bits is None:
+            by_size = {}
+            for r, size in enumerate(self.recipe_sizes):
+                by_size.setdefault(size, []).append(r)
+            self._size_bits = {size: self.to_bits(rs) for size, rs in by_size.items()}
+        return self._size_bits
+
+    def rank_similar(self, my_ingredients, top_k: int = 10, metric: str = "jaccard") -> list:
+        """
+        냉장고와 가장 비슷한 칵테일 상위 top_k개: [(칵테일 번호, 점수), ...] (점수 높은 순, 같으면 트리 순서)
+        - metric="jaccard": |냉장고 ∩ 레시피| / |냉장고 ∪ 레시피|
+        - metric="idf": 같은 식을 재료 개수 대신 IDF 가중치 합으로 (희귀한 재료가 겹칠수록 높게)
+        한 재료도 겹치지 않는 칵테일은 결과에 없다.
+        """
+        ids = self.ingredient_ids
+        fridge = [ids[ing] for ing in my_ingredients if ing in ids]
+        if not fridge or top_k <= 0:
+            return []
+        if metric == "jaccard":
+            return self._rank_jaccard(fridge, len(my_ingredients), top_k)
+        if metric == "idf":
+            return self._rank_idf(fridge, len(my_ingredients) - len(fridge), top_k)
+        raise ValueError(f"알 수 없는 유사도입니다: {metric}")
+
+    def _overlap_counts(self, fridge) -> dict:
+        """
+        {겹치는 재료 수 c: 그런 칵테일 비트셋} (c = 0 포함)
+        냉장고 재료의 역색인 비트셋을 비트 슬라이스 이진 카운터(planes[b] = 겹치는 수의 b번째 비트)에
+        더해서 칵테일 전체의 겹치는 수를 한 번에 센 뒤 c별로 꺼낸다.
+        """
+        planes = []
+        for ing_id in fridge:
+            carry = self.postings[ing_id]
+            for b, plane in enumerate(planes):
+                planes[b], carry = plane ^ carry, plane & carry
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+
+        counts = {}
+        for c in range(min(len(fridge), (1 << len(planes)) - 1) + 1):
+            bits = self.all_recipes
+            for b, plane in enumerate(planes):
+                bits &= plane if c >> b & 1 else ~plane
+            if bits:
+                counts[c] = bits
+        return counts
+
+    def _rank_jaccard(self, fridge, fridge_size: int, top_k: int) -> list:
+        """점수는 (겹치는 수 c, 레시피 재료 수 s)로만 정해지므로 조합별 비트셋을 점수 순으로 꺼낸다 (같은 점수는 트리 순서)."""
+        by_score = {}
+        size_classes = self.size_classes()
+        for c, bits in self._overlap_counts(fridge).items():
+            if not c:
+                continue
+            for size, size_bits in size_classes.items():
+                both = bits & size_bits
+                if both:
+                    score = c / (fridge_size + size - c)
+                    by_score[score] = by_score.get(score, 0) | both
+
+        result = []
+        for score in sorted(by_score, reverse=True):
+            for r in iter_bits(by_score[score]):
+                result.append((r, score))
+                if len(result) == top_k:
+                    return result
+        return result
+
+    def _rank_idf(self, fridge, unknown: int, top_k: int, heavy: int = 10) -> list:
+        """
+        칵테일을 (무거운 재료 중 겹치는 조합 T, 나머지 재료 중 겹치는 수 c, 레시피 재료 수 s)로 묶고
+        묶음마다 점수의 상한을 구해, 상한이 큰 묶음부터 칵테일별 점수를 정확히 계산한다.
+        - 무거운 재료 = 냉장고에서 가중치가 가장 큰 heavy개 → T의 가중치는 정확히 안다
+        - 나머지 c개의 가중치 ≤ 나머지 중 가장 큰 c개의 합
+        - 레시피에서 냉장고에 없는 재료 s - |T| - c개의 가중치 ≥ 그 개수 × 냉장고에 없는 재료 중 가장 작은 가중치
+        다음 묶음의 상한이 지금 top_k번째 점수보다 작으면 나머지 칵테일은 볼 필요가 없다.
+        묶음의 비트셋은 그 묶음 차례가 되었을 때만 만들고, 칵테일이 batch_size개 이상 모일 때까지 합쳐서 계산한다.
+        """
+        weights, recipe_weights, unknown_weight = self.idf_weights()
+        fridge = sorted(fridge, key=lambda ing_id: -weights[ing_id])
+        fridge_weight = sum(weights[i] for i in fridge) + unknown_weight * unknown
+        heavy_ids, light_ids = fridge[:heavy], fridge[heavy:]
+        light_top = [0.0]
+        for ing_id in light_ids:
+            light_top.append(light_top[-1] + weights[ing_id])
+        in_fridge = set(fridge)
+        min_weight = min((w for i, w in enumerate(weights) if i not in in_fridge), default=0.0)
+
+        # 무거운 재료 조합별 칵테일 (정확히 그 조합만 겹치는 칵테일)
+        subsets = {(): self.all_recipes}
+        for ing_id in heavy_ids:
+            users = self.postings[ing_id]
+            split = {}
+            for subset, bits in subsets.items():
+                if bits & users:
+                    split[subset + (ing_id,)] = bits & users
+                if bits & ~users:
+                    split[subset] = bits & ~users
+            subsets = split
+        light_counts = self._overlap_counts(light_ids)
+        size_classes = self.size_classes()
+
+        groups = []
+        for subset in subsets:
+            subset_weight = sum(weights[i] for i in subset)
+            for c in light_counts:
+                shared = len(subset) + c
+                if not shared:
+                    continue
+                for size in size_classes:
+                    if size >= shared:
+                        bound = (subset_weight + light_top[c]) / (fridge_weight + (size - shared) * min_weight)
+                        groups.append((bound, subset, c, size))
+        groups.sort(key=lambda group: -group[0])
+
+        fridge_mask = 0
+        for ing_id in fridge:
+            fridge_mask |= 1 << ing_id
+        masks = self.recipe_masks
+        shared_weight = {}  # 겹치는 재료 비트마스크 → 가중치 합 (같은 조합이 많아 한 번만 더한다)
+        heap = []           # (점수, -칵테일 번호) 최소 힙, 크기 top_k
+        batch_size = max(256, top_k * 8)
+        i = 0
+        while i < len(groups):
+            if len(heap) == top_k and groups[i][0] < heap[0][0]:
+                break
+            # 비트셋을 풀어 보는 비용(카탈로그 크기에 비례)을 줄이려고 묶음 여러 개를 합쳐서 한 번에 푼다
+            batch = 0
+            count = 0
+            while i < len(groups) and count < batch_size:
+                _, subset, c, size = groups[i]
+                bits = subsets[subset] & light_counts[c] & size_classes[size]
+                batch |= bits
+                count += popcount(bits)
+                i += 1
+            for r in iter_bits(batch):
+                shared = masks[r] & fridge_mask
+                s = shared_weight.get(shared)
+                if s is None:
+                    s = shared_weight[shared] = sum(weights[i] for i in iter_bits(shared))
+                item = (s / (fridge_weight + recipe_weights[r] - s), -r)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return [(-neg_r, score) for score, neg_r in sorted(heap, reverse=True)]
+
+    def evaluate_batch(self, fridges, chunk_size: int = 1024):
+        """
+        여러 사용자의 냉장고를 한 번에 평가하는 제너레이터.
+        fridges: {키: 재료 set} 딕셔너리 또는 (키, 재료 set) 쌍들 (예: UserData.data)
+        결과: (키, 만들 수 있는 칵테일 리스트, { 부족재료: [칵테일, ...] }) 를 사용자 순서대로 하나씩 내보낸다.
+
+        chunk_size명씩 묶어서, 이번에는 비트 하나가 사용자 한 명인 비트셋으로 칵테일 트리를 한 번 훑는다.
+        - lacking[i]: 재료 i가 없는 사용자 비트셋
+        - 칵테일마다 (1개 이상 부족한 사용자, 2개 이상 부족한 사용자) 비트셋을
+          부모 칵테일 값에 자기 재료만 더해서 구한다 (모두 2개 이상 부족하면 서브트리를 건너뜀).
+        묶음 단위로 결과를 내보내므로 사용자가 아주 많아도 결과 전체를 메모리에 올리지 않는다.
+        """
+        items = fridges.items() if hasattr(fridges, "items") else fridges
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield from self._evaluate_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._evaluate_chunk(chunk)
+
+    def _evaluate_chunk(self, chunk):
+        n_users = len(chunk)
+        everyone = (1 << n_users) - 1
+        fridge_masks = [self.fridge_mask(ings) for _, ings in chunk]
+
+        # 사용자 비트셋으로 뒤집기: having[i] = 재료 i를 가진 사용자들
+        having = [0] * len(self.ingredient_names)
+        for u, fridge in enumerate(fridge_masks):
+            for i in iter_bits(fridge):
+                having[i] |= 1 << u
+        lacking = [everyone & ~users for users in having]
+
+        possible = [[] for _ in range(n_users)]
+        one_missing = [{} for _ in range(n_users)]
+        names = self.names
+        ing_names = self.ingredient_names
+
+        stack = []  # (칵테일 번호, 1개 이상 부족한 사용자, 2개 이상 부족한 사용자)
+        r = 0
+        n = len(self.nodes)
+        while r < n:
+            parent = self.parents[r]
+            while stack and stack[-1][0] != parent:
+                stack.pop()
+            if stack:
+                _, c1, c2 = stack[-1]
+                new = self.recipe_masks[r] & ~self.recipe_masks[parent]
+            else:
+                c1 = c2 = 0
+                new = self.recipe_masks[r]
+            for i in iter_bits(new):
+                c2 |= c1 & lacking[i]
+                c1 |= lacking[i]
+
+            if c2 == everyone:
+                r = self.subtree_ends[r]
+                continue
+            for u in iter_bits(everyone & ~c1):
+                possible[u].append(names[r])
+            for u in iter_bits(c1 & ~c2):
+                missing = ing_names[(self.recipe_masks[r] & ~fridge_masks[u]).bit_length() - 1]
+                one_missing[u].setdefault(missing, []).append(names[r])
+            stack.append((r, c1, c2))
+            r += 1
+
+        for u, (key, _) in enumerate(chunk):
+            yield key, possible[u], one_missing[u]
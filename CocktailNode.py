@@ -1,5 +1,11 @@
 # CocktailNode.py
 
+import itertools
+
+# 트리가 바뀔 때마다 증가하는 전역 버전 번호 (트리끼리도 겹치지 않도록 전역 카운터 사용)
+_version_counter = itertools.count(1)
+
+
 class CocktailNode:
     """
     트리의 각 노드를 나타내는 클래스.
@@ -7,17 +13,130 @@ class CocktailNode:
     - parent: 부모 노드를 가리키는 참조
     - ingredients: "이 노드(칵테일)를 만들기 위해 필요한 재료 리스트"
     - children: 자식 노드 리스트
+    - full_ingredients / full_ingredient_set: 루트부터 누적된 전체 재료 (캐시, 부모 결과를 재사용)
     """
 
     def __init__(self, name, parent=None, ingredients=None):
         self.name = name.strip()
         self.parent = parent
-        self.ingredients = ingredients or []
+        self._ingredients = ingredients or []
         self.children = []
 
+        # 누적 재료 캐시 (None이면 아직 계산되지 않았거나 무효화된 상태)
+        self._full_ingredients = None
+        self._full_ingredient_set = None
+
+        # 같은 트리에 속한 노드들은 루트 노드를 공유하고, 트리 버전은 루트에 기록한다.
+        self._root = self
+        self._version = next(_version_counter)
+
         # 부모가 있으면 자동으로 부모.children에 추가
         if parent:
-            parent.children.append(self)
+            parent.add_child(self)
+
+    # ─── 재료 / 누적 재료 캐시 ─────────────────────────────────────────────
+    @property
+    def ingredients(self):
+        return self._ingredients
+
+    @ingredients.setter
+    def ingredients(self, value):
+        # 이 노드의 재료가 바뀌면 자신과 모든 자손의 누적 재료가 달라진다.
+        self._ingredients = value
+        self.invalidate()
+
+    @property
+    def full_ingredients(self):
+        """
+        누적 재료 리스트 (읽기 전용으로 사용할 것).
+        캐시가 없으면 캐시된 가장 가까운 조상부터 아래로 내려오며 계산한다.
+        """
+        if self._full_ingredients is None:
+            pending = []
+            node = self
+            while node is not None and node._full_ingredients is None:
+                pending.append(node)
+                node = node.parent
+            while pending:
+                pending.pop().compute_full_ingredients()
+        return self._full_ingredients
+
+    @property
+    def full_ingredient_set(self):
+        if self._full_ingredient_set is None:
+            self.full_ingredients
+        return self._full_ingredient_set
+
+    def compute_full_ingredients(self):
+        """
+        부모의 누적 재료(이미 계산되어 있어야 함)에 이 노드의 재료를 덧붙여 캐시를 채운다.
+        1) 루트(Empty Glass)는 재료가 없다.
+        2) 루트 바로 아래 노드는 '기본술(예: Gin, Vodka)' 이름이 맨 앞에 온다.
+        3) 그 아래 노드는 부모의 누적 재료 뒤에 자신의 재료를 이어 붙인다.
+        """
+        parent = self.parent
+        if parent is None:
+            full = [] if self.name == "Empty Glass" else list(self._ingredients)
+        elif parent.name == "Empty Glass":
+            full = [self.name] + list(self._ingredients)
+        else:
+            full = parent._full_ingredients + list(self._ingredients)
+
+        self._full_ingredients = full
+        self._full_ingredient_set = frozenset(full)
+
+    def invalidate(self):
+        """
+        이 노드와 모든 자손의 누적 재료 캐시를 지우고 트리 버전을 올린다.
+        (다음 조회 시 다시 계산된다)
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._full_ingredients is None and node is not self:
+                # 이미 무효화된 노드의 자손은 캐시가 있을 수 없다.
+                continue
+            node._full_ingredients = None
+            node._full_ingredient_set = None
+            stack.extend(node.children)
+        self.touch()
+
+    # ─── 트리 구조 변경 ─────────────────────────────────────────────────────
+    @property
+    def version(self):
+        """이 노드가 속한 트리의 버전. 트리가 바뀔 때마다 달라진다."""
+        return self._root._version
+
+    def touch(self):
+        self._root._version = next(_version_counter)
+
+    def add_child(self, child):
+        """child를 이 노드의 마지막 자식으로 붙인다."""
+        child.parent = self
+        self.children.append(child)
+        if child.children:
+            child._set_root(self._root)
+        else:
+            child._root = self._root
+        if child._full_ingredients is not None:
+            child.invalidate()
+        else:
+            self.touch()
+
+    def remove_child(self, child):
+        """child 서브트리를 떼어내 독립된 트리로 만든다."""
+        self.children.remove(child)
+        child.parent = None
+        child._set_root(child)
+        child.invalidate()
+        self.touch()
+
+    def _set_root(self, root):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._root = root
+            stack.extend(node.children)
 
     def get_full_ingredients(self):
         """
@@ -26,41 +145,10 @@ class CocktailNode:
         2) 그다음, 이 노드를 만들기 위해 각 분기(edge)별로 추가된 재료(ingredient)를
            조상(ancestor) 노드 순서대로 (상위 → 하위) 합친다.
         → 이렇게 해서 최종 리스트: ["기본술", "Dry Vermouth", "Olive Brine", "Olive Garnish"] 같은 형태로 출력.
-        """
 
-        # 1) 기본술(Spirit) 찾기:
-        #    self에서 위로 거슬러 올라가다가 '부모가 Empty Glass'인 노드를 찍는다.
-        spirit_name = None
-        node = self
-        while node.parent:
-            if node.parent.name == "Empty Glass":
-                spirit_name = node.name
-                break
-            node = node.parent
-
-        # 2) 재료(ingredient) 합치기
-        #    가장 상위(루트 직계) 노드에서부터 내려오도록,
-        #    self를 루트 방향으로 순회하며 node.ingredients를 모았다가 뒤집는다.
-        stack = []
-        node = self
-        while node and node.name != "Empty Glass":
-            if node.ingredients:
-                # 각 노드에 붙어 있는 재료(ingredient) 리스트가 있다면,
-                # 순서를 위해 스택에 넣어두고 나중에 뒤집는다.
-                stack.append(list(node.ingredients))
-            node = node.parent
-
-        # 결과를 담을 리스트
-        full_ings = []
-        if spirit_name:
-            full_ings.append(spirit_name)
-
-        # 스택에 들어있던 ingredient 리스트들을 LIFO형으로 꺼내어 순서대로 extend
-        while stack:
-            ings = stack.pop()
-            full_ings.extend(ings)
-
-        return full_ings
+        누적 결과는 캐시되어 있으므로 조상을 다시 거슬러 올라가지 않고 복사본만 돌려준다.
+        """
+        return list(self.full_ingredients)
 
     def __repr__(self):
         return f"<CocktailNode {self.name}>"
@@ -0,0 +1,356 @@
+# CocktailServer.py
+#
+# 사용법: python CocktailServer.py [--host 127.0.0.1] [--port 8080] [--catalog cocktails.json]
+#
+# 트리를 한 번만 불러 두고 HTTP(JSON)로 조회를 받는 asyncio 서버.
+#   GET  /health                     → {"status": "ok", ...}
+#   GET  /metrics                    → Prometheus 텍스트 형식의 조회/저장소 지표
+#   GET  /cocktails/<이름>           → 칵테일 정보 (없으면 404 + 비슷한 이름)
+#   POST /makeable   {"ingredients": [...]} 또는 {"pin": 1234}  → {"possible": [...]}
+#   POST /recommend  {"ingredients": [...]} 또는 {"pin": 1234}  → {"one_missing": {...}}
+#   GET  /fridge/<pin>               → {"pin": 1234, "ingredients": [...]}
+#   POST /fridge/<pin> {"add": [...], "remove": [...]}        → 바뀐 재료 목록 (없는 pin이면 가입)
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import unquote
+
+import Metrics
+from CatalogCache import get_shared_cache
+from ResultCache import ResultCache, fridge_key
+from UserData import UserData
+
+MAX_BODY_BYTES = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, extra: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **(extra or {})}
+
+
+class QueryBatcher:
+    """
+    동시에 들어온 makeable/recommend 요청을 모아 CocktailTree.evaluate_batch 한 번으로 처리한다.
+    - 첫 요청이 들어오면 window초 동안(또는 max_batch개가 찰 때까지) 더 모은 뒤 스레드에서 평가
+    - 대기열이 max_pending개를 넘으면 submit이 바로 503을 던진다 (backpressure)
+    """
+
+    def __init__(self, tree, max_batch: int = 256, window: float = 0.002, max_pending: int = 4096):
+        self.tree = tree
+        self.max_batch = max_batch
+        self.window = window
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.batches = 0
+        self.batched_requests = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, ingredients: set):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((ingredients, future))
+        except asyncio.QueueFull:
+            raise HTTPError(503, "서버가 바쁩니다. 잠시 후 다시 시도하세요.")
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            fridges = [(i, ings) for i, (ings, _) in enumerate(batch)]
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(None, lambda: list(self.tree.evaluate_batch(fridges)))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.batched_requests += len(batch)
+            Metrics.registry.observe("cocktail_server_batch_seconds", time.perf_counter() - start)
+            Metrics.registry.observe("cocktail_server_batch_size", len(batch), Metrics.COUNT_BUCKETS)
+            for i, possible, one_missing in results:
+                future = batch[i][1]
+                if not future.done():
+                    future.set_result((possible, one_missing))
+
+
+class CocktailServer:
+    """
+    CocktailTree / UserData를 한 번만 불러 두고 여러 클라이언트의 요청을 동시에 처리한다.
+    - max_connections: 동시에 처리하는 연결 수. 넘치면 503으로 바로 응답 (backpressure)
+    - 재료 조회(makeable/recommend)는 먼저 결과 캐시를 보고, 없으면 QueryBatcher로 묶어서 처리
+    - UserData(SQLite)처럼 막히는 작업은 스레드 풀에서 실행
+    """
+
+    def __init__(self, catalog_path: str = "cocktails.json", user_data: UserData = None,
+                 max_connections: int = 1024, cache_size: int = 65536, **batch_options):
+        self.tree = get_shared_cache(catalog_path).get()
+        self.results = ResultCache(maxsize=cache_size)
+        self.user_data = user_data or UserData()
+        self.batcher = QueryBatcher(self.tree, **batch_options)
+        self.connections = asyncio.Semaphore(max_connections)
+        self.started = time.time()
+        self.request_count = 0
+        self.rejected_count = 0
+
+    # ─── 라우팅 ────────────────────────────────────────────────────────────────
+    async def handle(self, method: str, path: str, body: dict):
+        parts = [unquote(p) for p in path.split("?", 1)[0].strip("/").split("/") if p]
+
+        if method == "GET" and parts == ["health"]:
+            return {"status": "ok", "uptime": round(time.time() - self.started, 1),
+                    "requests": self.request_count, "rejected": self.rejected_count,
+                    "batches": self.batcher.batches, "batched_requests": self.batcher.batched_requests,
+                    "result_cache": self.results.stats()}
+
+        if method == "GET" and parts == ["metrics"]:
+            return Metrics.registry.to_prometheus()
+
+        if method == "GET" and len(parts) == 2 and parts[0] == "cocktails":
+            return self.lookup(parts[1])
+
+        if method == "POST" and parts in (["makeable"], ["recommend"]):
+            ingredients = await self.ingredients_from(body)
+            possible, one_missing = await self.evaluate(ingredients)
+            if parts == ["makeable"]:
+                return {"possible": possible}
+            return {"one_missing": one_missing}
+
+        if len(parts) == 2 and parts[0] == "fridge":
+            pin = _parse_pin(parts[1])
+            if method == "GET":
+                return await self.get_fridge(pin)
+            if method == "POST":
+                return await self.update_fridge(pin, body)
+
+        raise HTTPError(404, f"{method} {path} 를 찾을 수 없습니다.")
+
+    async def evaluate(self, ingredients: set):
+        """(만들 수 있는 칵테일, 하나 부족한 칵테일). 같은 재료 조합은 캐시에서 바로 돌려준다."""
+        key = ("evaluate", self.tree.version, fridge_key(ingredients), ())
+        cached = self.results.lookup(key)
+        if cached is not None:
+            return cached
+        result = await self.batcher.submit(ingredients)
+        self.results.store(key, result)
+        return result
+
+    def lookup(self, name: str):
+        node = self.tree.find_node_by_name(name)
+        if node is None:
+            similar = [n.name for n in self.tree.search_fuzzy(name)]
+            raise HTTPError(404, "해당 칵테일을 찾을 수 없습니다.", {"similar": similar})
+        path = []
+        cur = node
+        while cur:
+            path.append({"name": cur.name, "ingredients": list(cur.ingredients)})
+            cur = cur.parent
+        path.reverse()
+        return {"name": node.name, "full_ingredients": node.get_full_ingredients(), "path": path}
+
+    async def ingredients_from(self, body: dict) -> set:
+        if "ingredients" in body:
+            ingredients = body["ingredients"]
+            if not isinstance(ingredients, list) or not all(isinstance(i, str) for i in ingredients):
+                raise HTTPError(400, "ingredients는 문자열 리스트여야 합니다.")
+            return self.tree.registry.canonical_set(ingredients)
+        if "pin" in body:
+            pin = _parse_pin(body["pin"])
+            return (await self.get_fridge(pin))["ingredients"]
+        raise HTTPError(400, "ingredients 또는 pin이 필요합니다.")
+
+    async def get_fridge(self, pin: int):
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self.user_data.isValid, pin):
+            raise HTTPError(404, "유효하지 않은 PIN 번호입니다.")
+        ingredients = await loop.run_in_executor(None, self.user_data.load_data, pin)
+        return {"pin": pin, "ingredients": ingredients}
+
+    async def update_fridge(self, pin: int, body: dict):
+        add = body.get("add", [])
+        remove = body.get("remove", [])
+        for items in (add, remove):
+            if not isinstance(items, list) or not all(isinstance(i, str) and i.strip() for i in items):
+                raise HTTPError(400, "add/remove는 비어 있지 않은 문자열 리스트여야 합니다.")
+
+        def apply():
+            # 재료 한 줄씩 바꾸므로 같은 pin에 동시에 온 요청도 서로의 변경을 덮어쓰지 않는다.
+            if not self.user_data.isValid(pin):
+                self.user_data.save_data(pin, set())
+            for ing in add:
+                self.user_data.add_ingredient(pin, ing.strip())
+            for ing in remove:
+                self.user_data.remove_ingredient(pin, ing.strip())
+            return self.user_data.load_data(pin)
+
+        ingredients = await asyncio.get_running_loop().run_in_executor(None, apply)
+        return {"pin": pin, "ingredients": ingredients}
+
+    # ─── HTTP ─────────────────────────────────────────────────────────────────
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.connections.locked():
+            self.rejected_count += 1
+            await _write_response(writer, 503, {"error": "연결이 너무 많습니다."}, keep_alive=False)
+            writer.close()
+            return
+
+        async with self.connections:
+            try:
+                while True:
+                    try:
+                        request = await _read_request(reader)
+                    except HTTPError as e:
+                        await _write_response(writer, e.status, e.body, keep_alive=False)
+                        break
+                    if request is None:
+                        break
+                    method, path, headers, raw = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    self.request_count += 1
+                    try:
+                        body = json.loads(raw) if raw else {}
+                        if not isinstance(body, dict):
+                            raise HTTPError(400, "요청 본문은 JSON 객체여야 합니다.")
+                        status, payload = 200, await self.handle(method, path, body)
+                    except HTTPError as e:
+                        status, payload = e.status, e.body
+                        if e.status == 503:
+                            self.rejected_count += 1
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        # UTF-8이 아닌 본문도 클라이언트 오류 (json.loads가 UnicodeDecodeError를 낸다)
+                        status, payload = 400, {"error": "JSON 형식이 올바르지 않습니다."}
+                    except Exception:
+                        # 처리 중 예상 못 한 오류: 연결을 그냥 끊지 않고 500으로 답한다
+                        logger.exception("%s %s 처리 중 오류", method, path)
+                        status, payload = 500, {"error": "서버 내부 오류가 발생했습니다."}
+                    await _write_response(writer, status, payload, keep_alive)
+                    if not keep_alive:
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        self.batcher.start()
+        server = await asyncio.start_server(self.serve_client, host, port, backlog=1024)
+        print(f"칵테일 서버가 http://{host}:{port} 에서 실행 중입니다.")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def _parse_pin(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, "PIN 번호는 숫자만 입력하세요.")
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__}는 JSON으로 바꿀 수 없습니다.")
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "잘못된 요청입니다.")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length가 올바르지 않습니다.")
+    if length < 0:
+        raise HTTPError(400, "Content-Length가 올바르지 않습니다.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "요청 본문이 너무 큽니다.")
+    raw = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, raw
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+    # 문자열은 그대로 텍스트로 (/metrics), 나머지는 JSON으로
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+              500: "Internal Server Error", 503: "Service Unavailable"}.get(status, "Error")
+    head = (f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+    if status == 503:
+        head += "Retry-After: 1\r\n"
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+    await writer.drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--catalog", default="cocktails.json")
+    parser.add_argument("--max-connections", type=int, default=1024)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-pending", type=int, default=4096)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def main():
+        server = CocktailServer(args.catalog, max_connections=args.max_connections,
+                                max_batch=args.max_batch, max_pending=args.max_pending)
+        await server.serve(args.host, args.port)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("서버를 종료합니다.")
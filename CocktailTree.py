@@ -1,119 +1,511 @@
 # CocktailTree.py
 
 import json
+import time
 from CocktailNode import CocktailNode
+from CocktailMatcher import CocktailMatcher, iter_bits
+from IncrementalFridge import IncrementalFridge
+from IngredientRegistry import IngredientRegistry, get_registry
+from Metrics import record_visits, registry, timed
+from NameIndex import NameIndex
+from RecipeDAG import RecipeDAG
+from ShoppingPlanner import ShoppingPlan, ShoppingPlanner
 
 
 class CocktailTree:
     """
     JSON 파일(cocktails.json) 기반으로 CocktailNode 트리를 만듭니다.
     - load_from_json(json_path): JSON을 읽어서 self.root에 트리를 구성
+    - build_tree_lazy(json_path): 기본술 서브트리를 처음 필요할 때만 읽는 지연 로딩 모드
     - print_tree(): 콘솔에 계층 구조로 출력
-    - find_node_by_name(name): 이름 대소문자 무시 검색
+    - iter_nodes() / iter_tree_lines() / iter_recipe_paths(): 노드 / 출력 줄 / 레시피 경로를 하나씩 내보내는 제너레이터
+    - find_node_by_name(name): 이름 대소문자 무시 검색 (이름 색인으로 O(1))
+    - search_by_prefix(prefix) / search_fuzzy(query): 자동완성 / 오타 허용 검색
     - find_possible_cocktails(my_ingredients): 내가 가진 재료로 만들 수 있는 칵테일
     - recommend_with_one_missing(my_ingredients): 하나만 더 추가하면 만들 수 있는 칵테일 추천
+    - recommend_with_k_missing(my_ingredients, k): 최대 k개만 더 있으면 만들 수 있는 칵테일
+    - recommend_purchases(my_ingredients): 새로 만들 수 있는 칵테일이 많은 순으로 살 재료 추천
+    - find_similar_cocktails(my_ingredients, top_k, metric): 재료가 가장 많이 겹치는 칵테일 (Jaccard / IDF 가중)
+    - plan_shopping(my_ingredients, budget, costs): 예산 안에서 새로 만들 수 있는 칵테일이 가장 많아지는 재료 조합
+    - evaluate_batch(fridges): 여러 사용자의 만들 수 있는 칵테일/하나 부족한 칵테일을 한 번에 (스트리밍)
+    - get_matcher(): 트리를 비트셋으로 컴파일한 CocktailMatcher (트리가 바뀌면 다시 컴파일)
+    - open_fridge(my_ingredients): 재료를 하나씩 넣고 뺄 때 결과를 증분으로 갱신하는 IncrementalFridge
+    - get_dag(): 누적 재료가 같은 노드를 합친 RecipeDAG (재료 순서만 다른 경로가 많은 카탈로그용)
+      use_dag=True로 만들면 find_possible_cocktails / recommend_with_one_missing도 이 DAG로 조회합니다.
+    - add_recipe / remove_recipe / move_recipe: 서브트리 하나를 추가 / 삭제 / 다른 부모로 옮기고,
+      매칭 엔진과 이름 색인은 그 부분만 고칩니다. 그 밖의 파생 구조(RecipeDAG, open_fridge의 냉장고,
+      유사도용 IDF 가중치 / 재료 개수별 비트셋)는 다음에 쓸 때 처음부터 다시 만듭니다. (benchmarks/bench_delta.py)
+    공개 조회 메서드는 Metrics.registry에 호출 수 / 지연 시간 / 방문 노드 수를 기록합니다.
+    재료 이름은 IngredientRegistry로 정규화합니다. 카탈로그 재료는 불러올 때 대표 표기로 인터닝되고,
+    조회할 때 받은 사용자 재료("gin ", "Kahlua" 등)도 같은 대표 표기로 바꿔서 비교합니다.
     """
 
-    def __init__(self):
+    def __init__(self, registry: IngredientRegistry = None, use_dag: bool = False):
         # 초기에는 빈 트리. load_from_json을 호출해야 root가 채워집니다.
+        self.registry = registry or get_registry()
+        # DAG는 트리가 바뀔 때마다 처음부터 다시 만들므로(노드 수에 비례) 기본 조회 경로에는 쓰지 않는다.
+        self.use_dag = use_dag
         self.root = CocktailNode(name="Empty Glass", parent=None)
+        self._matcher = None
+        self._name_index = None
+        self._dag = None
+        self._lazy = None
+
+    @property
+    def version(self):
+        """트리 버전. 노드가 추가/삭제되거나 재료가 바뀌면 달라집니다. (캐시 키로 사용)"""
+        return self.root.version
 
     def build_tree_from_json(self, json_path: str):
 
         #JSON 파일을 읽어서 CocktailNode 트리로 변환합니다.
+        #(JSON 파싱과 트리 빌드 시간을 따로 기록)
+        start = time.perf_counter()
         with open(json_path, "r", encoding="utf-8") as f:
             data = json.load(f)
+        registry.observe("cocktail_tree_json_parse_seconds", time.perf_counter() - start)
+
+        self.build_tree_from_dict(data)
+
+    @timed("cocktail_tree_build", source="dict")
+    def build_tree_from_dict(self, data: dict):
+        """
+        cocktails.json과 같은 형식({"name", "ingredients", "children"})의 딕셔너리로 트리를 만듭니다.
+        """
 
         # 1) 최상위 노드 생성
-        self.root = CocktailNode(name=data["name"], parent=None)
         # JSON에 지정된 인크리멘털 재료(부모와 겹치지 않는 재료)를 바로 할당
-        self.root.ingredients = data.get("ingredients", [])
+        canonical = self.canonical_ingredients
+        self.root = CocktailNode(name=data["name"], parent=None,
+                                 ingredients=canonical(data.get("ingredients", [])))
+        self.root.compute_full_ingredients()
 
-        # 2) 재귀적으로 자식 노드 생성
-        def build_subtree(node: CocktailNode, node_data: dict):
+        # 2) 자식 노드 생성
+        self._build_children(self.root, data)
+
+        # 3) 트리와 함께 매칭 엔진과 이름 색인도 만든다
+        self._intern_spirits()
+        self._build_indexes()
+
+    def _build_children(self, node: CocktailNode, data: dict):
+        # 깊은 트리에서도 재귀 한도에 걸리지 않도록 스택으로 순회.
+        # 부모의 누적 재료가 먼저 계산되므로, 자식은 부모 결과에 자기 재료만 덧붙인다.
+        canonical = self.canonical_ingredients
+        stack = [(node, data)]
+        while stack:
+            node, node_data = stack.pop()
             for child_data in node_data.get("children", []):
-                # 자식 노드 생성
-                child = CocktailNode(name=child_data["name"], parent=node)
-                # 인크리멘털 재료 할당
-                child.ingredients = child_data.get("ingredients", []).copy()
-                # 자식의 자식들 생성
-                build_subtree(child, child_data)
+                # 자식 노드 생성 (인크리멘털 재료 할당)
+                child = CocktailNode(name=child_data["name"], parent=node,
+                                     ingredients=canonical(child_data.get("ingredients", [])))
+                child.compute_full_ingredients()
+                # 자식의 자식들은 나중에 생성
+                stack.append((child, child_data))
+
+    @timed("cocktail_tree_build", source="binary")
+    def build_tree_from_binary(self, bin_path: str):
+        """
+        makeBinary.py로 만든 바이너리 카탈로그(cocktails.bin)에서 트리를 만듭니다.
+        JSON 파싱 없이 mmap된 노드 배열을 전위 순회 순서대로 읽으므로
+        부모 노드가 항상 먼저 만들어져 있습니다.
+        """
+        from BinaryCatalog import MappedCatalog
 
-        build_subtree(self.root, data)
+        with MappedCatalog(bin_path) as catalog:
+            strings = catalog.strings()
+            ingredient_names = {}  # 문자열 번호 → 대표 재료 이름 (같은 문자열은 한 번만 정규화)
+            nodes = []
+            for i in range(catalog.node_count):
+                parent = catalog.parent(i)
+                node = CocktailNode(name=strings[catalog.name_id(i)],
+                                    parent=nodes[parent] if parent >= 0 else None,
+                                    ingredients=[ingredient_names.get(sid) or ingredient_names.setdefault(
+                                        sid, self.registry.intern_name(strings[sid]))
+                                        for sid in catalog.ingredient_ids(i)])
+                node.compute_full_ingredients()
+                nodes.append(node)
 
-    def print_tree(self):
+        self.root = nodes[0]
+        self._intern_spirits()
+        self._build_indexes()
+
+    def build_tree_lazy(self, json_path: str, index_path: str = None):
+        """
+        루트와 기본술 노드만 만들고, 각 기본술의 서브트리는 처음 순회/조회할 때 읽습니다.
+        - 기본술마다의 바이트 위치와 이름 → 기본술 맵은 사이드카 색인(cocktails.json.idx)에 저장해 두고
+          JSON이 바뀌었을 때만 다시 만듭니다.
+        - find_node_by_name / search_by_prefix는 해당 기본술 서브트리만 읽습니다.
+        - 트리 전체가 필요한 조회(만들 수 있는 칵테일 등)는 처음 한 번 모든 서브트리를 읽습니다.
+        """
+        from LazyCatalog import LazyCatalog
+
+        self._lazy = LazyCatalog(json_path, index_path, self.canonical_ingredients)
+        self.root = self._lazy.build_root()
+        self._intern_spirits()
+        self._lazy_version = self.root.version
+        self._matcher = None
+        self._name_index = None
+
+    def _lazy_lookup(self):
+        """지연 로딩 중이고 트리를 고치지 않았으면 LazyCatalog (이름 → 기본술 맵이 아직 맞음)."""
+        if self._lazy is not None and self._name_index is None and self._lazy_version == self.root.version:
+            return self._lazy
+        return None
+
+    def canonical_ingredients(self, ingredients) -> list:
+        """카탈로그 재료 리스트 → 레지스트리에 등록된 대표 이름 리스트 (모든 노드가 같은 문자열 객체를 공유)."""
+        intern_name = self.registry.intern_name
+        return [intern_name(ing) for ing in ingredients]
+
+    def _intern_spirits(self):
+        # 기본술 이름("Gin" 등)도 누적 재료의 첫 번째 재료이므로 레지스트리에 등록해 둔다.
+        if self.root.name == "Empty Glass":
+            for spirit in self.root.children:
+                self.registry.intern(spirit.name)
+
+    def _build_indexes(self):
+        self._matcher = CocktailMatcher(self.root)
+        self._name_index = NameIndex(self.root)
+        self._lazy = None
+
+    def get_matcher(self) -> CocktailMatcher:
+        """
+        트리를 비트셋으로 컴파일한 매칭 엔진을 반환합니다.
+        트리 버전이 컴파일 당시와 다르면(노드 추가/삭제, 재료 변경) 다시 컴파일합니다.
+        """
+        if self._matcher is None or self._matcher.version != self.root.version:
+            self._matcher = CocktailMatcher(self.root)
+        return self._matcher
+
+    def get_dag(self) -> RecipeDAG:
+        """
+        누적 재료 집합이 같은 노드를 하나의 상태로 합친 RecipeDAG를 반환합니다. (처음 필요할 때 만들고,
+        트리 버전이 바뀌면 다시 만듭니다)
+        - 같은 칵테일을 재료 순서만 바꿔 여러 경로로 적은 카탈로그에서는
+          get_dag().find_possible_cocktails(...)가 같은 상태를 한 번만 검사합니다.
+        - 만드는 데 노드 수에 비례하는 시간이 들고(10만 노드에 1초 이상), 트리가 바뀐 뒤 첫 조회에서
+          다시 만드는 비용도 같습니다. 조회 한 번은 가지치기 순회와 비슷하므로, 같은 상태가 많고
+          트리가 거의 바뀌지 않을 때만 use_dag=True로 쓰세요. (benchmarks/bench_dag.py 참고)
+        """
+        if self._dag is None or self._dag.version != self.root.version:
+            self._dag = RecipeDAG(self.root, self.registry.canonical_set)
+        return self._dag
+
+    def get_name_index(self) -> NameIndex:
+        """
+        이름 → 노드 색인을 반환합니다. 트리 버전이 바뀌었으면 다시 만듭니다.
+        """
+        if self._name_index is None or self._name_index.version != self.root.version:
+            self._name_index = NameIndex(self.root)
+        return self._name_index
+
+    # ─── 증분 변경 (CatalogManager.apply_delta) ──────────────────────────────────
+    def _require(self, name: str) -> CocktailNode:
+        node = self.find_node_by_name(name)
+        if node is None:
+            raise ValueError(f"칵테일을 찾을 수 없습니다: {name}")
+        return node
+
+    def _current_indexes(self):
+        """(매처, 이름 색인) 중 지금 트리 버전과 맞는 것만. (맞지 않는 것은 다음에 쓸 때 어차피 다시 만든다)"""
+        version = self.root.version
+        matcher = self._matcher if self._matcher is not None and self._matcher.version == version else None
+        name_index = self._name_index if self._name_index is not None and self._name_index.version == version else None
+        return matcher, name_index
+
+    def _indexes_updated(self, matcher, name_index):
+        for index in (matcher, name_index):
+            if index is not None:
+                index.version = self.root.version
+
+    @timed("cocktail_tree_delta", op="add")
+    def add_recipe(self, parent_name: str, data: dict) -> CocktailNode:
+        """
+        parent_name 칵테일의 마지막 자식으로 data({"name", "ingredients", "children"}) 서브트리를 붙입니다.
+        """
+        parent = self._require(parent_name)
+        if data["name"].strip() == "Empty Glass":
+            raise ValueError("'Empty Glass'는 루트 이름이라 레시피 이름으로 쓸 수 없습니다.")
+        matcher, name_index = self._current_indexes()
+        node = CocktailNode(name=data["name"], parent=parent,
+                            ingredients=self.canonical_ingredients(data.get("ingredients", [])))
+        node.full_ingredients  # 누적 재료 캐시를 채워 두면 자식들은 자기 재료만 덧붙인다
+        self._build_children(node, data)
+        if parent is self.root:
+            self._intern_spirits()
+
+        if matcher is not None:
+            matcher.insert_subtree(node)
+        if name_index is not None:
+            name_index.add_subtree(node)
+        self._indexes_updated(matcher, name_index)
+        return node
+
+    @timed("cocktail_tree_delta", op="remove")
+    def remove_recipe(self, name: str) -> CocktailNode:
+        """name 칵테일 서브트리를 떼어내고 떼어낸 노드를 반환합니다."""
+        node = self._require(name)
+        if node is self.root:
+            raise ValueError("루트는 삭제할 수 없습니다.")
+        matcher, name_index = self._current_indexes()
+        if matcher is not None:
+            matcher.remove_subtree(node)
+        node.parent.remove_child(node)
+        if name_index is not None:
+            name_index.remove_subtree(node, self.root)
+        self._indexes_updated(matcher, name_index)
+        return node
+
+    @timed("cocktail_tree_delta", op="move")
+    def move_recipe(self, name: str, new_parent_name: str) -> CocktailNode:
+        """name 칵테일 서브트리를 new_parent_name의 마지막 자식으로 옮깁니다. (누적 재료는 새 부모 기준)"""
+        node = self._require(name)
+        new_parent = self._require(new_parent_name)
+        ancestor = new_parent
+        while ancestor is not None:
+            if ancestor is node:
+                raise ValueError(f"'{name}'을(를) 자기 서브트리 아래로 옮길 수 없습니다.")
+            ancestor = ancestor.parent
+        matcher, name_index = self._current_indexes()
+        if matcher is not None:
+            matcher.remove_subtree(node)
+        node.parent.remove_child(node)
+        if name_index is not None:
+            name_index.remove_subtree(node, self.root)
+        new_parent.add_child(node)
+        if new_parent is self.root:
+            self._intern_spirits()
+        if matcher is not None:
+            matcher.insert_subtree(node)
+        if name_index is not None:
+            name_index.add_subtree(node)
+        self._indexes_updated(matcher, name_index)
+        return node
+
+    def iter_nodes(self, node: CocktailNode = None):
         """
-        트리를 ├──, └── 기호로 계층 구조 출력합니다.
+        node(기본값: 루트)부터 전위 순회 순서로 노드를 하나씩 내보내는 제너레이터.
+        재귀 없이 스택으로 돌기 때문에 깊은 트리에서도 안전하고, 중간에 멈추면 나머지는 방문하지 않습니다.
         """
+        stack = [node or self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
 
-        def dfs(node: CocktailNode, prefix: str = "", is_last: bool = True):
+    def iter_tree_lines(self, node: CocktailNode = None, max_depth: int = None):
+        """
+        print_tree가 출력하는 줄(├──, └── 기호 포함)을 한 줄씩 내보내는 제너레이터.
+        - node: 이 노드의 서브트리만 (기본값: 루트)
+        - max_depth: node에서 이 깊이까지만 펼치고, 더 깊은 자식이 있는 노드는 이름 뒤에 " …"를 붙입니다.
+        """
+        stack = [(node or self.root, "", True, 0)]
+        while stack:
+            node, prefix, is_last, depth = stack.pop()
+            children = node.children
+            collapsed = max_depth is not None and depth >= max_depth
             if node.name != "Empty Glass":
-                connector = "└── " if is_last else "├── "
-                print(prefix + connector + node.name)
+                line = prefix + ("└── " if is_last else "├── ") + node.name
+                yield line + " …" if collapsed and children else line
                 prefix += "    " if is_last else "│   "
+            if collapsed:
+                continue
+            for idx in range(len(children) - 1, -1, -1):
+                stack.append((children[idx], prefix, idx == len(children) - 1, depth + 1))
 
-            for idx, child in enumerate(node.children):
-                dfs(child, prefix, idx == len(node.children) - 1)
+    def iter_recipe_paths(self, node: CocktailNode = None):
+        """
+        (노드, 루트 → 노드 경로 튜플) 을 전위 순회 순서로 내보내는 제너레이터. (내보내기/리포트용)
+        경로는 부모의 경로 튜플에 자기 자신만 덧붙여 만듭니다.
+        """
+        start = node or self.root
+        stack = [(start, ())]
+        while stack:
+            node, parent_path = stack.pop()
+            path = parent_path + (node,)
+            yield node, path
+            stack.extend((child, path) for child in reversed(node.children))
 
-        dfs(self.root, "", True)
+    def print_tree(self):
+        """
+        트리를 ├──, └── 기호로 계층 구조 출력합니다. (iter_tree_lines를 한 줄씩 출력)
+        """
+        for line in self.iter_tree_lines():
+            print(line)
 
+    @timed("cocktail_tree_query", query="find_node_by_name")
     def find_node_by_name(self, target_name: str):
         """
         이름 대소문자 구분 없이 트리 전체에서 해당 노드를 찾아 반환.
         없으면 None 반환.
         """
+        lazy = self._lazy_lookup()
+        if lazy is not None:
+            return lazy.find(self.root, target_name)
+        return self.get_name_index().find(target_name)
 
-        def dfs(node: CocktailNode):
-            if node.name.strip().lower() == target_name.strip().lower():
-                return node
-            for c in node.children:
-                res = dfs(c)
-                if res:
-                    return res
-            return None
+    @timed("cocktail_tree_query", query="search_by_prefix")
+    def search_by_prefix(self, prefix: str, limit: int = 10):
+        """
+        이름이 prefix로 시작하는 노드 리스트 (대소문자 무시, 최대 limit개). 자동완성용.
+        """
+        lazy = self._lazy_lookup()
+        if lazy is not None:
+            return lazy.search_prefix(self.root, prefix, limit)
+        return self.get_name_index().search_prefix(prefix, limit)
 
-        return dfs(self.root)
+    @timed("cocktail_tree_query", query="search_fuzzy")
+    def search_fuzzy(self, query: str, limit: int = 5):
+        """
+        오타가 있어도 비슷한 이름의 노드 리스트를 비슷한 순서로 반환 (최대 limit개).
+        """
+        return self.get_name_index().search_fuzzy(query, limit)
 
-    def find_possible_cocktails(self, my_ingredients: set):
+    @timed("cocktail_tree_query", query="find_possible_cocktails")
+    def find_possible_cocktails(self, my_ingredients: set, prune: bool = True):
         """
         my_ingredients: 사용자가 가진 재료 세트 (예: {"Gin", "Dry Vermouth", "Olive Brine", "Olive Garnish"})
-        - 트리의 모든 노드를 순회하며 node.get_full_ingredients() 결과가 my_ingredients에 모두 포함되면
+        - 트리의 노드를 순회하며 node.get_full_ingredients() 결과가 my_ingredients에 모두 포함되면
           해당 노드를 만들 수 있다고 간주하고 리스트로 반환.
+        - prune=True: 자식의 누적 재료는 항상 부모 누적 재료의 상위집합이므로,
+          만들 수 없는 노드를 만나면 그 아래 서브트리 전체를 건너뛴다. (결과는 prune=False와 같다)
+        - 재귀 없이 스택으로 전위 순회하므로 깊은 트리에서도 재귀 한도에 걸리지 않는다.
+        - use_dag=True로 만든 트리면 prune=True일 때 RecipeDAG의 상태 단위로 찾는다. (결과와 순서는 같다)
         """
 
+        my_ingredients = self.registry.canonical_set(my_ingredients)
+        if prune and self.use_dag:
+            possible, visited = self.get_dag().scan_possible(my_ingredients)
+            record_visits("find_possible_cocktails", visited)
+            return possible
         possible = []
+        visited = 0
 
-        def dfs(node: CocktailNode):
-            # get_full_ingredients()는 부모부터 누적된 재료를 모두 합쳐서 반환합니다.
-            full_list = node.get_full_ingredients()
-            if node.name != "Empty Glass" and all(ing in my_ingredients for ing in full_list):
-                possible.append(node.name)
-            for c in node.children:
-                dfs(c)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            visited += 1
+            # full_ingredient_set은 부모부터 누적된 재료가 미리 계산된 집합입니다.
+            if node.name != "Empty Glass":
+                if node.full_ingredient_set <= my_ingredients:
+                    possible.append(node.name)
+                elif prune:
+                    continue
+            # 왼쪽 자식부터 꺼내도록 거꾸로 넣는다 (재귀 DFS와 같은 출력 순서)
+            stack.extend(reversed(node.children))
 
-        dfs(self.root)
+        record_visits("find_possible_cocktails", visited)
         return possible
 
-    def recommend_with_one_missing(self, my_ingredients: set):
+    @timed("cocktail_tree_query", query="recommend_with_one_missing")
+    def recommend_with_one_missing(self, my_ingredients: set, prune: bool = True):
         """
         my_ingredients: 사용자가 가진 재료 세트 (예: {"Gin", "Dry Vermouth", "Olive Brine"})
         - 하나만 더 추가하면 만들 수 있는 칵테일 목록을 추천합니다.
         - 반환 형식: { 부족재료: [칵테일1, 칵테일2, ...], ... }
+        - prune=True: 부족한 재료가 2개 이상인 노드의 서브트리는 건너뜁니다. (자식은 더 많이 부족하므로)
+        - use_dag=True로 만든 트리면 prune=True일 때 RecipeDAG의 상태 단위로 찾습니다.
         """
 
+        my_ingredients = self.registry.canonical_set(my_ingredients)
+        if prune and self.use_dag:
+            missing_to_cocktails, visited = self.get_dag().scan_one_missing(my_ingredients)
+            record_visits("recommend_with_one_missing", visited)
+            return missing_to_cocktails
         missing_to_cocktails = {}
+        visited = 0
 
-        def dfs(node: CocktailNode):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            visited += 1
             if node.name != "Empty Glass":
-                full_list = node.get_full_ingredients()
-                # 내가 가진 재료를 제외한 부족한 재료 리스트
-                diff = [ing for ing in full_list if ing not in my_ingredients]
+                # 내가 가진 재료를 제외한 부족한 재료 집합 (미리 계산된 누적 재료 사용)
+                # (정규화 후 같은 재료가 경로에 두 번 나올 수 있으므로 집합으로 센다)
+                diff = node.full_ingredient_set - my_ingredients
                 if len(diff) == 1:
-                    missing = diff[0]
+                    missing = next(iter(diff))
                     missing_to_cocktails.setdefault(missing, []).append(node.name)
+                elif len(diff) > 1 and prune:
+                    continue
 
-            for c in node.children:
-                dfs(c)
+            stack.extend(reversed(node.children))
 
-        dfs(self.root)
+        record_visits("recommend_with_one_missing", visited)
         return missing_to_cocktails
+
+    @timed("cocktail_tree_query", query="recommend_with_k_missing")
+    def recommend_with_k_missing(self, my_ingredients: set, k: int = 1):
+        """
+        재료를 최대 k개 더 추가하면 만들 수 있는 칵테일을 부족한 개수별로 반환합니다.
+        - 반환 형식: { 부족한 개수: [(칵테일, [부족재료, ...]), ...], ... }
+        """
+        return self.get_matcher().recommend_with_k_missing(self.registry.canonical_set(my_ingredients), k)
+
+    @timed("cocktail_tree_query", query="recommend_purchases")
+    def recommend_purchases(self, my_ingredients: set, top_n: int = None):
+        """
+        재료 하나만 사면 새로 만들 수 있는 칵테일이 많은 순서대로 재료를 추천합니다.
+        - 반환 형식: [(재료, 칵테일 수, [칵테일1, 칵테일2, ...]), ...]
+        """
+        return self.get_matcher().recommend_purchases(self.registry.canonical_set(my_ingredients), top_n)
+
+    @timed("cocktail_tree_query", query="find_similar_cocktails")
+    def find_similar_cocktails(self, my_ingredients: set, top_k: int = 10, metric: str = "jaccard"):
+        """
+        내 재료와 가장 비슷한 칵테일 top_k개를 점수가 높은 순서대로 반환합니다.
+        - metric="jaccard": 겹치는 재료 수 / 합친 재료 수
+        - metric="idf": 흔한 재료보다 희귀한 재료가 겹칠 때 점수를 더 주는 가중 Jaccard
+        - 반환 형식: [(칵테일, 점수, [부족재료, ...]), ...] (재료가 하나도 겹치지 않는 칵테일은 제외)
+        """
+        my_ingredients = self.registry.canonical_set(my_ingredients)
+        matcher = self.get_matcher()
+        fridge = matcher.fridge_mask(my_ingredients)
+        names = matcher.ingredient_names
+        return [(matcher.names[r], score, [names[i] for i in iter_bits(matcher.recipe_masks[r] & ~fridge)])
+                for r, score in matcher.rank_similar(my_ingredients, top_k, metric)]
+
+    @timed("cocktail_tree_query", query="plan_shopping")
+    def plan_shopping(self, my_ingredients: set, budget: float, costs: dict = None,
+                      exact: bool = None) -> ShoppingPlan:
+        """
+        재료를 예산(budget)만큼 더 살 때, 새로 만들 수 있는 칵테일이 가장 많아지는 재료 조합을 고릅니다.
+        - costs: {재료: 비용} (없는 재료는 1) → 비용을 안 주면 "재료 budget개까지 구매"
+        - exact: True면 분기 한정으로 최적 조합, False면 지연 탐욕 근사, None이면 적게 살 때만 최적 조합
+        - recommend_purchases는 재료 하나씩만 보지만, 여기서는 둘 이상 함께 사야 열리는 칵테일도 셉니다.
+        """
+        if costs:
+            canonical = self.registry.canonical
+            costs = {canonical(name): cost for name, cost in costs.items()}
+        return ShoppingPlanner(self.get_matcher()).plan(self.registry.canonical_set(my_ingredients),
+                                                        budget, costs, exact)
+
+    def open_fridge(self, my_ingredients=()) -> IncrementalFridge:
+        """
+        사용자 한 명의 냉장고를 IncrementalFridge로 엽니다.
+        - 재료를 add/remove 할 때마다 그 재료를 쓰는 칵테일만 다시 계산하므로
+          한 세션에서 재료를 하나씩 바꾸며 조회할 때는 매번 트리 전체를 훑지 않습니다.
+        - 트리가 바뀌면(fridge.version != tree.version) 다시 열어야 합니다.
+        """
+        return IncrementalFridge(self.get_matcher(), my_ingredients, self.registry.canonical)
+
+    def evaluate_batch(self, fridges, chunk_size: int = 1024):
+        """
+        fridges: {pin: 재료 set} (예: UserData.data) 또는 (pin, 재료 set) 쌍들
+        - 사용자마다 find_possible_cocktails / recommend_with_one_missing을 부르는 대신
+          chunk_size명씩 묶어 트리를 한 번만 훑습니다.
+        - (pin, 만들 수 있는 칵테일 리스트, { 부족재료: [칵테일, ...] }) 를 하나씩 내보내는 제너레이터
+        """
+        items = fridges.items() if hasattr(fridges, "items") else fridges
+        canonical_set = self.registry.canonical_set
+        return self.get_matcher().evaluate_batch(((key, canonical_set(ings)) for key, ings in items), chunk_size)
+
+    @timed("cocktail_tree_query", query="find_possible_cocktails_batch")
+    def find_possible_cocktails_batch(self, fridges) -> dict:
+        """{pin: 만들 수 있는 칵테일 리스트} (evaluate_batch 결과를 모은 것)"""
+        return {key: possible for key, possible, _ in self.evaluate_batch(fridges)}
+
+    @timed("cocktail_tree_query", query="recommend_with_one_missing_batch")
+    def recommend_with_one_missing_batch(self, fridges) -> dict:
+        """{pin: { 부족재료: [칵테일, ...] }} (evaluate_batch 결과를 모은 것)"""
+        return {key: one_missing for key, _, one_missing in self.evaluate_batch(fridges)}
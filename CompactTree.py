@@ -0,0 +1,389 @@
+# CompactTree.py
+
+import json
+from array import array
+
+from CocktailNode import _version_counter
+from CocktailMatcher import CocktailMatcher
+from IncrementalFridge import IncrementalFridge
+from IngredientRegistry import IngredientRegistry, get_registry
+from NameIndex import NameIndex
+
+
+class CompactNode:
+    """
+    CompactCocktailTree의 노드 하나를 가리키는 가벼운 뷰 (트리와 노드 번호만 가진다).
+    CocktailNode와 같은 속성(name, parent, ingredients, children, get_full_ingredients)을 제공하므로
+    main.py / app.py의 출력 코드에 그대로 넘길 수 있다.
+    """
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree, index: int):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self.tree.name(self.index)
+
+    @property
+    def parent(self):
+        p = self.tree.parent[self.index]
+        return CompactNode(self.tree, p) if p >= 0 else None
+
+    @property
+    def ingredients(self) -> list:
+        return self.tree.ingredients(self.index)
+
+    @property
+    def children(self) -> list:
+        return [CompactNode(self.tree, c) for c in self.tree.children(self.index)]
+
+    @property
+    def full_ingredients(self) -> list:
+        return self.tree.get_full_ingredients(self.index)
+
+    @property
+    def full_ingredient_set(self) -> frozenset:
+        return frozenset(self.full_ingredients)
+
+    @property
+    def version(self):
+        return self.tree.version
+
+    def get_full_ingredients(self):
+        return self.tree.get_full_ingredients(self.index)
+
+    def __eq__(self, other):
+        return isinstance(other, CompactNode) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self):
+        return f"<CompactNode {self.name}>"
+
+
+class CompactCocktailTree:
+    """
+    CocktailNode 객체 대신 평행 배열(structure of arrays)로 저장한 읽기 전용 칵테일 트리.
+    노드는 전위 순회 번호 i로 가리키며 (0 = 루트),
+    - parent[i]: 부모 번호 (루트는 -1)
+    - subtree_end[i]: i의 서브트리가 끝나는 다음 번호 → 첫 자식은 i+1, 다음 형제는 subtree_end[i]
+    - name_ids[i]: 이름 문자열 id (strings 표)
+    - ing_offsets[i] ~ ing_offsets[i+1]: ing_ids 안에서 노드 i의 인크리멘털 재료 범위
+    문자열은 strings 표에 한 번씩만 저장되므로 재료 이름이 노드마다 중복되지 않는다.
+    재료는 CocktailTree와 같은 레지스트리로 정규화해 대표 이름으로 저장하고,
+    사용자 재료도 대표 이름으로 바꿔서 찾으므로 표기("dry  vermouth ")가 달라도 결과가 같다.
+
+    CocktailTree와 같은 조회 메서드를 제공한다.
+    만들 수 없는 노드를 만나면 subtree_end로 서브트리 전체를 한 번에 건너뛰므로 스택도 필요 없다.
+    """
+
+    def __init__(self, registry: IngredientRegistry = None):
+        self.registry = registry or get_registry()
+        self.strings = []
+        self.string_ids = {}
+        self.parent = array("i")
+        self.subtree_end = array("i")
+        self.name_ids = array("I")
+        self.ing_offsets = array("I", [0])
+        self.ing_ids = array("I")
+        self.version = next(_version_counter)
+        self._matcher = None
+        self._name_index = None
+
+    # ─── 불러오기 ─────────────────────────────────────────────────────────────
+    @classmethod
+    def from_json(cls, json_path: str, registry: IngredientRegistry = None):
+        with open(json_path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), registry)
+
+    @classmethod
+    def from_dict(cls, data: dict, registry: IngredientRegistry = None):
+        """cocktails.json 형식의 딕셔너리로 트리를 만든다."""
+        tree = cls(registry)
+        intern_name = tree.registry.intern_name
+        stack = [(data, -1, False)]
+        open_nodes = []
+        while stack:
+            node_data, parent, closing = stack.pop()
+            if closing:
+                tree.subtree_end[open_nodes.pop()] = len(tree.parent)
+                continue
+            index = len(tree.parent)
+            tree.parent.append(parent)
+            tree.subtree_end.append(0)
+            tree.name_ids.append(tree._intern(node_data["name"].strip()))
+            tree.ing_ids.extend(tree._intern(intern_name(ing)) for ing in node_data.get("ingredients", []))
+            tree.ing_offsets.append(len(tree.ing_ids))
+            open_nodes.append(index)
+            stack.append((None, None, True))
+            for child_data in reversed(node_data.get("children", [])):
+                stack.append((child_data, index, False))
+        tree._intern_spirits()
+        return tree
+
+    @classmethod
+    def from_binary(cls, bin_path: str, registry: IngredientRegistry = None):
+        """바이너리 카탈로그(cocktails.bin)의 배열을 그대로 복사해서 트리를 만든다 (JSON 파싱 없음)."""
+        from BinaryCatalog import MappedCatalog, NODE_FIELDS, PARENT, NAME, ING_START, ING_COUNT, SUBTREE_END
+
+        tree = cls(registry)
+        with MappedCatalog(bin_path) as catalog:
+            tree.strings = catalog.strings()
+            tree.string_ids = {s: sid for sid, s in enumerate(tree.strings)}
+            nodes = catalog.nodes
+            tree.parent = array("i", nodes[PARENT::NODE_FIELDS])
+            tree.subtree_end = array("i", nodes[SUBTREE_END::NODE_FIELDS])
+            tree.name_ids = array("I", nodes[NAME::NODE_FIELDS])
+            # 전위 순회 순서로 저장되어 있으므로 재료 참조 배열은 노드 순서대로 이어져 있다.
+            if catalog.node_count:
+                tree.ing_offsets = array("I", nodes[ING_START::NODE_FIELDS])
+                last = (catalog.node_count - 1) * NODE_FIELDS
+                tree.ing_offsets.append(nodes[last + ING_START] + nodes[last + ING_COUNT])
+            # 재료 참조는 대표 이름의 문자열 id로 바꿔 둔다 (같은 문자열은 한 번만 정규화)
+            intern_name = tree.registry.intern_name
+            canonical_ids = {}
+            tree.ing_ids = array("I", (canonical_ids.get(sid) or canonical_ids.setdefault(
+                sid, tree._intern(intern_name(tree.strings[sid]))) for sid in catalog.ing_refs))
+            del nodes
+        tree._intern_spirits()
+        return tree
+
+    def _intern(self, s: str) -> int:
+        sid = self.string_ids.get(s)
+        if sid is None:
+            sid = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def _intern_spirits(self):
+        # CocktailTree._intern_spirits와 같이 기본술 이름도 누적 재료이므로 레지스트리에 등록해 둔다.
+        if len(self) and self.name(0) == "Empty Glass":
+            for i in self.children(0):
+                self.registry.intern(self.name(i))
+
+    # ─── 노드 정보 ────────────────────────────────────────────────────────────
+    @property
+    def root(self) -> CompactNode:
+        return CompactNode(self, 0)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def string(self, sid: int) -> str:
+        return self.strings[sid]
+
+    def name(self, i: int) -> str:
+        return self.string(self.name_ids[i])
+
+    def _ing_slice(self, i: int):
+        return self.ing_ids[self.ing_offsets[i]:self.ing_offsets[i + 1]]
+
+    def ingredients(self, i: int) -> list:
+        return [self.string(sid) for sid in self._ing_slice(i)]
+
+    def children(self, i: int) -> list:
+        result = []
+        child = i + 1
+        end = self.subtree_end[i]
+        while child < end:
+            result.append(child)
+            child = self.subtree_end[child]
+        return result
+
+    def _requirement_ids(self, i: int):
+        """
+        노드 i가 부모에 더해 새로 요구하는 재료 id들.
+        CocktailNode.get_full_ingredients와 같은 규칙: Empty Glass 바로 아래 노드는 기본술 이름도 재료.
+        """
+        ids = self._ing_slice(i)
+        p = self.parent[i]
+        if p < 0:
+            return () if self.name(i) == "Empty Glass" else ids
+        if p == 0 and self.name(0) == "Empty Glass":
+            return [self.name_ids[i]] + list(ids)
+        return ids
+
+    def get_full_ingredients(self, i: int) -> list:
+        """노드 i의 누적 재료 (조상 방향으로 올라가며 모은 뒤 뒤집는다)."""
+        chunks = []
+        while i >= 0:
+            chunks.append(self._requirement_ids(i))
+            i = self.parent[i]
+        return [self.string(sid) for ids in reversed(chunks) for sid in ids]
+
+    # ─── CocktailTree와 같은 조회 메서드 ───────────────────────────────────────
+    def iter_nodes(self, i: int = 0):
+        """노드 i의 서브트리를 전위 순회 순서로 CompactNode 뷰로 내보낸다 (번호가 연속이므로 범위만 돈다)."""
+        if i < len(self):
+            for j in range(i, self.subtree_end[i]):
+                yield CompactNode(self, j)
+
+    def iter_tree_lines(self, i: int = 0, max_depth: int = None):
+        """CocktailTree.iter_tree_lines와 같은 줄을 하나씩 내보낸다."""
+        if not len(self):
+            return
+        stack = [(i, "", True, 0)]
+        while stack:
+            i, prefix, is_last, depth = stack.pop()
+            kids = self.children(i)
+            collapsed = max_depth is not None and depth >= max_depth
+            if self.name(i) != "Empty Glass":
+                line = prefix + ("└── " if is_last else "├── ") + self.name(i)
+                yield line + " …" if collapsed and kids else line
+                prefix += "    " if is_last else "│   "
+            if collapsed:
+                continue
+            for idx in range(len(kids) - 1, -1, -1):
+                stack.append((kids[idx], prefix, idx == len(kids) - 1, depth + 1))
+
+    def print_tree(self):
+        """트리를 ├──, └── 기호로 계층 구조 출력합니다. (CocktailTree.print_tree와 같은 출력)"""
+        for line in self.iter_tree_lines():
+            print(line)
+
+    def _fridge_ids(self, my_ingredients) -> set:
+        """사용자 재료 → 문자열 id 집합 (레지스트리의 대표 이름으로 바꿔서 찾는다)."""
+        ids = self.string_ids
+        return {ids[ing] for ing in self.registry.canonical_set(my_ingredients) if ing in ids}
+
+    def scan_possible(self, fridge_ids: set, start: int = 0, end: int = None) -> list:
+        """
+        노드 번호 start ~ end 범위(루트 또는 루트의 자식 서브트리들)에서 만들 수 있는 노드 번호들.
+        전위 순회 순서로 훑으면서, 새로 요구하는 재료가 없으면 그 노드를 담고,
+        있으면 subtree_end로 서브트리 전체를 건너뛴다.
+        (조상이 모두 통과했을 때만 노드에 도달하므로 자기 재료만 확인하면 된다)
+        """
+        result = []
+        i = start
+        end = len(self) if end is None else end
+        while i < end:
+            if all(sid in fridge_ids for sid in self._requirement_ids(i)):
+                result.append(i)
+                i += 1
+            else:
+                i = self.subtree_end[i]
+        return result
+
+    def scan_one_missing(self, fridge_ids: set, start: int = 0, end: int = None) -> list:
+        """
+        노드 번호 start ~ end 범위에서 재료가 정확히 하나 부족한 노드들의 (부족한 재료 id, 노드 번호).
+        조상들에서 이미 부족한 재료를 스택으로 들고 내려가며, 2개 이상 부족하면 서브트리를 건너뛴다.
+        """
+        result = []
+        stack = []  # (서브트리 끝, 지금까지 부족한 재료 id 튜플)
+        i = start
+        end = len(self) if end is None else end
+        while i < end:
+            while stack and i >= stack[-1][0]:
+                stack.pop()
+            missing = stack[-1][1] if stack else ()
+            for sid in self._requirement_ids(i):
+                if sid not in fridge_ids and sid not in missing:
+                    missing += (sid,)
+            if len(missing) > 1:
+                i = self.subtree_end[i]
+                continue
+            if len(missing) == 1:
+                result.append((missing[0], i))
+            stack.append((self.subtree_end[i], missing))
+            i += 1
+        return result
+
+    def find_possible_cocktails(self, my_ingredients: set):
+        """CocktailTree.find_possible_cocktails와 같은 결과 (scan_possible 참고)."""
+        names = [self.name(i) for i in self.scan_possible(self._fridge_ids(my_ingredients))]
+        return [name for name in names if name != "Empty Glass"]
+
+    def recommend_with_one_missing(self, my_ingredients: set):
+        """CocktailTree.recommend_with_one_missing과 같은 형식 { 부족재료: [칵테일, ...] } (scan_one_missing 참고)."""
+        missing_to_cocktails = {}
+        for sid, i in self.scan_one_missing(self._fridge_ids(my_ingredients)):
+            if self.name(i) != "Empty Glass":
+                missing_to_cocktails.setdefault(self.string(sid), []).append(self.name(i))
+        return missing_to_cocktails
+
+    def find_node_by_name(self, target_name: str):
+        return self.get_name_index().find(target_name)
+
+    def search_by_prefix(self, prefix: str, limit: int = 10):
+        return self.get_name_index().search_prefix(prefix, limit)
+
+    def search_fuzzy(self, query: str, limit: int = 5):
+        return self.get_name_index().search_fuzzy(query, limit)
+
+    def recommend_with_k_missing(self, my_ingredients: set, k: int = 1):
+        return self.get_matcher().recommend_with_k_missing(self.registry.canonical_set(my_ingredients), k)
+
+    def recommend_purchases(self, my_ingredients: set, top_n: int = None):
+        return self.get_matcher().recommend_purchases(self.registry.canonical_set(my_ingredients), top_n)
+
+    def open_fridge(self, my_ingredients=()) -> IncrementalFridge:
+        return IncrementalFridge(self.get_matcher(), my_ingredients, self.registry.canonical)
+
+    def get_matcher(self) -> CocktailMatcher:
+        """비트셋 매칭 엔진 (처음 필요할 때 노드 뷰를 통해 컴파일한다)."""
+        if self._matcher is None:
+            self._matcher = CocktailMatcher(self.root)
+        return self._matcher
+
+    def get_name_index(self) -> NameIndex:
+        """이름 색인 (처음 필요할 때 만든다)."""
+        if self._name_index is None:
+            self._name_index = NameIndex(self.root)
+        return self._name_index
+
+
+class MappedCompactTree(CompactCocktailTree):
+    """
+    mmap으로 연 바이너리 카탈로그(MappedCatalog) 위에서 복사 없이 동작하는 CompactCocktailTree.
+    노드 배열은 파일 페이지를 그대로 가리키므로, 같은 파일을 연 여러 프로세스가
+    운영체제의 페이지 캐시를 공유한다. 문자열은 필요할 때만 디코딩한다.
+    """
+
+    def __init__(self, catalog, registry: IngredientRegistry = None):
+        from BinaryCatalog import NODE_FIELDS, PARENT, NAME, ING_START, ING_COUNT, SUBTREE_END
+
+        super().__init__(registry)
+        self.catalog = catalog
+        nodes = catalog.nodes
+        self.parent = nodes[PARENT::NODE_FIELDS]
+        self.subtree_end = nodes[SUBTREE_END::NODE_FIELDS]
+        self.name_ids = nodes[NAME::NODE_FIELDS]
+        self.ing_starts = nodes[ING_START::NODE_FIELDS]
+        self.ing_counts = nodes[ING_COUNT::NODE_FIELDS]
+        self.ing_ids = catalog.ing_refs
+        self.strings = None
+        self.string_ids = None
+
+    def string(self, sid: int) -> str:
+        return self.catalog.string(sid)
+
+    def _ing_slice(self, i: int):
+        start = self.ing_starts[i]
+        return self.ing_ids[start:start + self.ing_counts[i]]
+
+    def _fridge_ids(self, my_ingredients) -> set:
+        if self.string_ids is None:
+            # 파일의 재료 문자열(과 기본술 이름)을 레지스트리에 등록해 대표 이름 → 문자열 id들로 묶는다.
+            # (정규화 없이 컴파일된 예전 파일에는 같은 재료의 표기가 여러 개 있을 수 있다)
+            self._intern_spirits()
+            intern_name = self.registry.intern_name
+            strings = self.catalog.strings()
+            self.string_ids = {}
+            sids = set(self.ing_ids)
+            if len(self) and self.name(0) == "Empty Glass":
+                sids.update(self.name_ids[i] for i in self.children(0))
+            for sid in sids:
+                self.string_ids.setdefault(intern_name(strings[sid]), set()).add(sid)
+        ids = self.string_ids
+        return {sid for ing in self.registry.canonical_set(my_ingredients) for sid in ids.get(ing, ())}
+
+    def close(self):
+        for attr in ("parent", "subtree_end", "name_ids", "ing_starts", "ing_counts"):
+            getattr(self, attr).release()
+        self.ing_ids = None
+        self.catalog.close()
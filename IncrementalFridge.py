@@ -0,0 +1,106 @@
+# IncrementalFridge.py
+
+from CocktailMatcher import CocktailMatcher
+
+
+class IncrementalFridge:
+    """
+    로그인한 사용자 한 명의 냉장고를 들고 있으면서 칵테일별 "부족한 재료 개수"를 유지한다.
+    - add(ing) / remove(ing): 그 재료를 쓰는 칵테일들(matcher.recipe_ids 역색인)의 개수만 고친다.
+      → 재료 하나를 바꿀 때 드는 비용이 카탈로그 크기가 아니라 그 재료를 쓰는 칵테일 수에 비례
+    - makeable / one_missing: 부족한 재료가 0개 / 1개인 칵테일 번호 집합
+    - find_possible_cocktails() / recommend_with_one_missing() / recommend_purchases():
+      CocktailTree의 같은 이름 메서드와 같은 결과(같은 순서)를 유지 중인 집합에서 바로 만든다.
+    - version: 만들 때 쓴 매처(트리) 버전. 트리가 바뀌면 새로 만들어야 한다.
+    - canonical: 재료 이름 정규화 함수 (CocktailTree.open_fridge는 IngredientRegistry.canonical을 넘긴다)
+    """
+
+    def __init__(self, matcher: CocktailMatcher, my_ingredients=(), canonical=None):
+        self.matcher = matcher
+        self.canonical = canonical
+        self.version = matcher.version
+        self.ingredients = set()
+        self.fridge = 0  # 카탈로그에 있는 내 재료의 비트마스크
+        self.missing = list(matcher.recipe_sizes)
+        self.makeable = {r for r, count in enumerate(self.missing) if count == 0}
+        self.one_missing = {r for r, count in enumerate(self.missing) if count == 1}
+        for ing in my_ingredients:
+            self.add(ing)
+
+    def __contains__(self, ingredient):
+        if self.canonical is not None:
+            ingredient = self.canonical(ingredient)
+        return ingredient in self.ingredients
+
+    def __len__(self):
+        return len(self.ingredients)
+
+    def add(self, ingredient: str) -> bool:
+        """재료를 추가한다. 이미 있던 재료면 False."""
+        if self.canonical is not None:
+            ingredient = self.canonical(ingredient)
+        if ingredient in self.ingredients:
+            return False
+        self.ingredients.add(ingredient)
+        ing_id = self.matcher.ingredient_ids.get(ingredient)
+        if ing_id is None:
+            return True  # 어떤 칵테일에도 쓰이지 않는 재료
+        self.fridge |= 1 << ing_id
+
+        missing, makeable, one_missing = self.missing, self.makeable, self.one_missing
+        for r in self.matcher.recipe_ids[ing_id]:
+            count = missing[r] - 1
+            missing[r] = count
+            if count == 0:
+                one_missing.discard(r)
+                makeable.add(r)
+            elif count == 1:
+                one_missing.add(r)
+        return True
+
+    def remove(self, ingredient: str) -> bool:
+        """재료를 뺀다. 없던 재료면 False."""
+        if self.canonical is not None:
+            ingredient = self.canonical(ingredient)
+        if ingredient not in self.ingredients:
+            return False
+        self.ingredients.discard(ingredient)
+        ing_id = self.matcher.ingredient_ids.get(ingredient)
+        if ing_id is None:
+            return True
+        self.fridge &= ~(1 << ing_id)
+
+        missing, makeable, one_missing = self.missing, self.makeable, self.one_missing
+        for r in self.matcher.recipe_ids[ing_id]:
+            count = missing[r] + 1
+            missing[r] = count
+            if count == 1:
+                makeable.discard(r)
+                one_missing.add(r)
+            elif count == 2:
+                one_missing.discard(r)
+        return True
+
+    def _missing_ingredient(self, r: int) -> str:
+        matcher = self.matcher
+        return matcher.ingredient_names[(matcher.recipe_masks[r] & ~self.fridge).bit_length() - 1]
+
+    def find_possible_cocktails(self) -> list:
+        names = self.matcher.names
+        return [names[r] for r in sorted(self.makeable)]
+
+    def recommend_with_one_missing(self) -> dict:
+        names = self.matcher.names
+        missing_to_cocktails = {}
+        for r in sorted(self.one_missing):
+            missing_to_cocktails.setdefault(self._missing_ingredient(r), []).append(names[r])
+        return missing_to_cocktails
+
+    def recommend_purchases(self, top_n: int = None) -> list:
+        """[(재료, 늘어나는 칵테일 수, [칵테일, ...]), ...] (많은 순, 같으면 재료 id 순)"""
+        ids = self.matcher.ingredient_ids
+        ranking = sorted(self.recommend_with_one_missing().items(),
+                         key=lambda item: (-len(item[1]), ids[item[0]]))
+        if top_n is not None:
+            ranking = ranking[:top_n]
+        return [(ing, len(cocktails), cocktails) for ing, cocktails in ranking]
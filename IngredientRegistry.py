@@ -0,0 +1,119 @@
+# IngredientRegistry.py
+
+import json
+import os
+import sys
+import threading
+
+
+def ingredient_key(name: str) -> str:
+    """비교용 키: 앞뒤 공백 제거, 연속 공백은 하나로, 대소문자 무시. ("Dry  vermouth " → "dry vermouth")"""
+    return " ".join(name.split()).casefold()
+
+
+class IngredientRegistry:
+    """
+    재료 이름 정규화 + 인터닝.
+    - 같은 키(ingredient_key)의 재료는 모두 같은 정수 id와 같은 표시 이름(처음 등록된 표기)을 갖는다.
+      표시 이름은 sys.intern으로 한 번만 만들어 트리의 모든 노드가 같은 문자열 객체를 공유한다.
+    - add_alias("Kahlua", "Coffee Liqueur"): 동의어를 대표 재료로 연결
+    - canonical(name): 등록된 재료(또는 동의어)면 대표 표시 이름, 모르는 재료면 공백만 정리한 이름
+      동의어와 동의어의 대표 재료는 카탈로그에 아직 등록되지 않았어도 동의어 파일의 표기로 바꾼다.
+      (대표 재료를 등록할 때도 동의어 파일의 표기를 쓰므로 트리를 먼저 만들었는지와 상관없이 결과가 같다)
+    - canonical_set(names): 사용자 재료 집합을 대표 이름 집합으로
+    - intern(name) / id_of(name): 카탈로그 재료를 등록하고 id를 받는다 / id 조회 (모르면 None)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = {}      # 키 → id
+        self.names = []    # id → 표시 이름
+        self.aliases = {}  # 동의어 키 → (대표 재료 키, 대표 재료 표시 이름)
+        self.targets = {}  # 대표 재료 키 → 동의어 파일의 표시 이름
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_alias(self, alias: str, target: str):
+        target_key = ingredient_key(target)
+        with self.lock:
+            display = self.targets.setdefault(target_key, " ".join(target.split()))
+            self.aliases[ingredient_key(alias)] = (target_key, display)
+            # 이미 등록된 동의어 표기도 대표 재료를 가리키게 한다
+            if target_key in self.ids:
+                self.ids.setdefault(ingredient_key(alias), self.ids[target_key])
+
+    def load_aliases(self, path: str) -> int:
+        """{"동의어": "대표 재료", ...} 형식의 JSON 파일을 읽는다. 파일이 없으면 0."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            aliases = json.load(f)
+        for alias, target in aliases.items():
+            self.add_alias(alias, target)
+        return len(aliases)
+
+    def intern(self, name: str) -> int:
+        """재료를 등록하고 id를 돌려준다 (이미 있으면 그 id). 동의어면 대표 재료로 등록한다."""
+        key = ingredient_key(name)
+        ing_id = self.ids.get(key)
+        if ing_id is not None:
+            return ing_id
+        with self.lock:
+            ing_id = self.ids.get(key)
+            if ing_id is not None:
+                return ing_id
+            # 동의어가 먼저 나오면 대표 재료 표기로 등록한다
+            target, display = self.aliases.get(key, (key, self.targets.get(key) or " ".join(name.split())))
+            ing_id = self.ids.get(target)
+            if ing_id is None:
+                ing_id = len(self.names)
+                self.names.append(sys.intern(display))
+                self.ids[target] = ing_id
+            self.ids[key] = ing_id
+            return ing_id
+
+    def intern_name(self, name: str) -> str:
+        """등록하고 대표 표시 이름을 돌려준다 (트리 로더용)."""
+        return self.names[self.intern(name)]
+
+    def id_of(self, name: str):
+        key = ingredient_key(name)
+        ing_id = self.ids.get(key)
+        if ing_id is None and key in self.aliases:
+            ing_id = self.ids.get(self.aliases[key][0])
+        return ing_id
+
+    def canonical(self, name: str) -> str:
+        ing_id = self.id_of(name)
+        if ing_id is not None:
+            return self.names[ing_id]
+        key = ingredient_key(name)
+        if key in self.aliases:
+            return self.aliases[key][1]
+        if key in self.targets:
+            return self.targets[key]
+        return " ".join(name.split())
+
+    def canonical_set(self, names) -> set:
+        return {self.canonical(name) for name in names}
+
+    def same(self, a: str, b: str) -> bool:
+        return self.canonical(a) == self.canonical(b)
+
+
+# 트리 로더와 사용자 저장소가 함께 쓰는 프로세스 전체 레지스트리
+ALIASES_PATH = "ingredientAliases.json"
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_registry() -> IngredientRegistry:
+    """공유 레지스트리. 처음 만들 때 ingredientAliases.json(있으면)의 동의어를 불러온다."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            registry = IngredientRegistry()
+            registry.load_aliases(ALIASES_PATH)
+            _shared = registry
+        return _shared
@@ -0,0 +1,229 @@
+# LazyCatalog.py
+
+import hashlib
+import json
+import os
+from bisect import bisect_left
+
+from CocktailNode import CocktailNode
+from NameIndex import normalize_name
+
+INDEX_VERSION = 2
+
+
+def index_path_for(json_path: str) -> str:
+    return json_path + ".idx"
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def build_offset_index(json_path: str) -> dict:
+    """
+    카탈로그 JSON을 한 번 훑어서 기본술(루트의 자식)마다 파일 안의 바이트 위치를 기록한다.
+    반환 형식:
+      {"version", "source_size", "source_sha256",
+       "root": {"name", "ingredients"},
+       "spirits": [{"name", "ingredients", "offset", "length"}, ...],
+       "names": {정규화된 이름: 기본술 번호 (루트 자체는 -1)}}
+    루트 객체의 키는 raw_decode로 값 하나씩 읽어 넘기고, "children" 배열만 원소 단위로 잘라낸다.
+    """
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    text = raw.decode("utf-8")
+    decoder = json.JSONDecoder()
+
+    root = {"name": None, "ingredients": []}
+    spirits = []
+    names = {}
+
+    pos = _skip_ws(text, 0)
+    if text[pos] != "{":
+        raise ValueError(f"{json_path}: 최상위 값이 객체가 아닙니다.")
+    pos = _skip_ws(text, pos + 1)
+    # 문자 위치 → 바이트 위치 (한글 등 멀티바이트 문자가 있어도 seek할 수 있도록 이어서 센다)
+    char_pos, byte_pos = 0, 0
+
+    while text[pos] != "}":
+        key, pos = decoder.raw_decode(text, pos)
+        pos = _skip_ws(text, pos)
+        pos = _skip_ws(text, pos + 1)  # ':'
+        if key == "children":
+            pos = _skip_ws(text, pos + 1)  # '['
+            while text[pos] != "]":
+                spirit, end = decoder.raw_decode(text, pos)
+                byte_pos += len(text[char_pos:pos].encode("utf-8"))
+                length = len(text[pos:end].encode("utf-8"))
+                char_pos = pos
+                spirit_id = len(spirits)
+                spirits.append({"name": spirit["name"], "ingredients": spirit.get("ingredients", []),
+                                "offset": byte_pos, "length": length})
+                # 서브트리 전체의 이름 → 기본술 번호 (전위 순회에서 먼저 나오는 것 우선)
+                stack = [spirit]
+                while stack:
+                    node = stack.pop()
+                    names.setdefault(normalize_name(node["name"]), spirit_id)
+                    stack.extend(reversed(node.get("children", [])))
+                pos = _skip_ws(text, end)
+                if text[pos] == ",":
+                    pos = _skip_ws(text, pos + 1)
+            pos += 1
+        else:
+            value, pos = decoder.raw_decode(text, pos)
+            if key in root:
+                root[key] = value
+        pos = _skip_ws(text, pos)
+        if text[pos] == ",":
+            pos = _skip_ws(text, pos + 1)
+
+    # 루트 이름은 기본술 이름보다 우선 (find_node_by_name과 같은 전위 순회 규칙)
+    names[normalize_name(root["name"])] = -1
+    return {"version": INDEX_VERSION, "source_size": len(raw), "source_sha256": hashlib.sha256(raw).hexdigest(),
+            "root": root, "spirits": spirits, "names": names}
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_offset_index(json_path: str, index_path: str = None) -> dict:
+    """
+    사이드카 색인(cocktails.json.idx)을 읽는다.
+    없거나 원본 JSON의 크기/내용(sha256)이 달라졌으면 다시 만들어 저장한다.
+    (수정 시각은 믿지 않는다: 오래된 색인이면 엉뚱한 바이트 위치를 읽게 된다)
+    색인을 저장할 수 없으면(읽기 전용 디렉터리 등) 만든 색인을 저장하지 않고 그대로 쓴다.
+    """
+    index_path = index_path or index_path_for(json_path)
+    stat = os.stat(json_path)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if (index.get("version") == INDEX_VERSION and index["source_size"] == stat.st_size
+                and index["source_sha256"] == _file_digest(json_path)):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = build_offset_index(json_path)
+    tmp_path = index_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return index
+
+
+class LazySpiritNode(CocktailNode):
+    """
+    기본술 노드. children을 처음 읽을 때 loader()로 서브트리를 읽어와 만든다.
+    (만드는 것은 트리 내용이 바뀌는 것이 아니므로 트리 버전은 그대로 둔다)
+    """
+
+    def __init__(self, name, parent=None, ingredients=None, loader=None, canonical=list):
+        self._loader = None
+        super().__init__(name, parent, ingredients)
+        self._loader = loader
+        self._canonical = canonical
+
+    @property
+    def loaded(self):
+        return self._loader is None
+
+    @property
+    def children(self):
+        if self._loader is not None:
+            self._load()
+        return self._children
+
+    @children.setter
+    def children(self, value):
+        self._children = value
+
+    def _load(self):
+        loader, self._loader = self._loader, None
+        version = self._root._version
+        stack = [(self, {"children": loader()})]
+        while stack:
+            node, node_data = stack.pop()
+            for child_data in node_data.get("children", []):
+                child = CocktailNode(name=child_data["name"], parent=node,
+                                     ingredients=self._canonical(child_data.get("ingredients", [])))
+                if node._full_ingredients is not None:
+                    child.compute_full_ingredients()
+                stack.append((child, child_data))
+        self._root._version = version
+
+
+class LazyCatalog:
+    """
+    카탈로그 JSON + 바이트 위치 색인으로, 기본술 서브트리를 처음 필요할 때만 읽는다.
+    - build_root(): 루트와 기본술 노드만 만든다 (자식은 LazySpiritNode.children을 처음 읽을 때)
+    - find(root, name): 이름 → 기본술 번호 맵으로 해당 기본술 서브트리만 읽고 찾는다
+    - search_prefix(root, prefix): 정렬된 이름 목록에서 bisect → 찾은 이름의 서브트리만 읽는다
+    - canonical: 재료 리스트 → 정규화된 재료 리스트 (CocktailTree.canonical_ingredients)
+    """
+
+    def __init__(self, json_path: str, index_path: str = None, canonical=list):
+        self.json_path = json_path
+        self.canonical = canonical
+        self.index = load_offset_index(json_path, index_path)
+        self.names = self.index["names"]
+        self.keys = sorted(self.names)
+        self.loads = 0
+
+    def read_spirit(self, spirit_id: int) -> list:
+        """기본술 하나의 자식 목록(JSON 그대로)을 파일에서 그 부분만 읽어 파싱한다."""
+        spirit = self.index["spirits"][spirit_id]
+        with open(self.json_path, "rb") as f:
+            f.seek(spirit["offset"])
+            data = json.loads(f.read(spirit["length"]).decode("utf-8"))
+        self.loads += 1
+        return data.get("children", [])
+
+    def build_root(self) -> CocktailNode:
+        info = self.index["root"]
+        root = CocktailNode(name=info["name"], parent=None, ingredients=self.canonical(info["ingredients"]))
+        root.compute_full_ingredients()
+        for spirit_id, spirit in enumerate(self.index["spirits"]):
+            node = LazySpiritNode(name=spirit["name"], parent=root,
+                                  ingredients=self.canonical(spirit["ingredients"]),
+                                  loader=lambda spirit_id=spirit_id: self.read_spirit(spirit_id),
+                                  canonical=self.canonical)
+            node.compute_full_ingredients()
+        return root
+
+    def find(self, root: CocktailNode, name: str):
+        key = normalize_name(name)
+        spirit_id = self.names.get(key)
+        if spirit_id is None:
+            return None
+        if spirit_id < 0:
+            return root
+        stack = [root.children[spirit_id]]
+        while stack:
+            node = stack.pop()
+            if normalize_name(node.name) == key:
+                return node
+            stack.extend(reversed(node.children))
+        return None
+
+    def search_prefix(self, root: CocktailNode, prefix: str, limit: int = 10) -> list:
+        prefix = normalize_name(prefix)
+        result = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(result) < limit and self.keys[i].startswith(prefix):
+            result.append(self.find(root, self.keys[i]))
+            i += 1
+        return result
@@ -0,0 +1,202 @@
+# Metrics.py
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 구간 (초). 마지막 구간은 +Inf
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# 방문 노드 수 히스토그램 구간
+COUNT_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class Histogram:
+    """
+    고정 구간 히스토그램. observe는 bisect 한 번 + 덧셈 몇 번이라 핫패스에 넣어도 부담이 적다.
+    - counts[i]: buckets[i] 이하인 값 중 buckets[i-1]보다 큰 값의 개수 (마지막은 나머지 전부)
+    - quantile(q): 구간 경계로 근사한 분위수
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    프로세스 전체에서 공유하는 카운터 / 히스토그램 모음.
+    - 이름과 라벨(예: query="find_possible_cocktails")의 조합마다 값을 따로 센다.
+    - snapshot(): 화면 표시용 딕셔너리 리스트
+    - to_prometheus(): 스크레이퍼가 읽는 Prometheus 텍스트 형식
+    - enabled = False로 두면 timed로 감싼 함수도 시간을 재지 않는다.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self.record(metric_key(name, labels), value)
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        self.record(None, 0, metric_key(name, labels), value, buckets)
+
+    def record(self, counter_key, increment, histogram_key=None, value=None, buckets=LATENCY_BUCKETS):
+        """
+        카운터 하나와 히스토그램 하나를 잠금 한 번으로 갱신한다. (핫패스용, 키는 metric_key로 미리 만들어 둘 것)
+        """
+        with self.lock:
+            if counter_key is not None:
+                self.counters[counter_key] = self.counters.get(counter_key, 0) + increment
+            if histogram_key is not None:
+                histogram = self.histograms.get(histogram_key)
+                if histogram is None:
+                    histogram = self.histograms[histogram_key] = Histogram(buckets)
+                histogram.observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            counters = [{"name": name, **dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{"name": name, **dict(labels), "count": h.count, "sum": h.sum,
+                           "mean": h.sum / h.count if h.count else None,
+                           "p50": h.quantile(0.5), "p99": h.quantile(0.99), "max": h.max}
+                          for (name, labels), h in sorted(self.histograms.items())]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{name}{_labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets + ("+Inf",), h.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def metric_key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+# 프로세스 전체에서 쓰는 기본 레지스트리
+registry = MetricsRegistry()
+
+
+def timed(name: str, **labels):
+    """
+    함수 호출 횟수 / 예외 횟수 / 지연 시간 히스토그램을 기록하는 데코레이터.
+    - {name}_calls_total, {name}_errors_total, {name}_seconds 에 labels를 붙여 기록
+    """
+
+    calls_key = metric_key(name + "_calls_total", labels)
+    errors_key = metric_key(name + "_errors_total", labels)
+    seconds_key = metric_key(name + "_seconds", labels)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                registry.record(errors_key, 1)
+                raise
+            finally:
+                registry.record(calls_key, 1, seconds_key, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+_visit_keys = {}
+
+
+def record_visits(query: str, visited: int):
+    """트리 순회 한 번에서 방문한 노드 수를 기록한다 (누적 카운터 + 조회당 히스토그램)."""
+    if registry.enabled:
+        keys = _visit_keys.get(query)
+        if keys is None:
+            keys = _visit_keys[query] = (metric_key("cocktail_tree_nodes_visited_total", {"query": query}),
+                                         metric_key("cocktail_tree_nodes_visited", {"query": query}))
+        registry.record(keys[0], visited, keys[1], visited, COUNT_BUCKETS)
+
+
+class ProfileResult:
+    """profile() 블록이 끝난 뒤 채워지는 결과 (text: 누적 시간 순 상위 함수 표)."""
+
+    def __init__(self):
+        self.text = ""
+        self.stats = None
+
+
+@contextmanager
+def profile(enabled: bool = True, limit: int = 25, sort: str = "cumulative"):
+    """
+    요청 하나를 cProfile로 감싸는 스위치. enabled=False면 아무것도 하지 않는다.
+        with Metrics.profile(want_profile) as prof:
+            ...
+        print(prof.text)
+    """
+    result = ProfileResult()
+    if not enabled:
+        yield result
+        return
+    # 프로파일링을 켤 때만 불러온다 (pstats는 불러오는 데만 수십 ms가 걸려 시작 시간을 늘린다)
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        result.stats = pstats.Stats(profiler, stream=out).sort_stats(sort)
+        result.stats.print_stats(limit)
+        result.text = out.getvalue()
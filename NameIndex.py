@@ -0,0 +1,150 @@
+# NameIndex.py
+
+from bisect import bisect_left, insort
+
+
+def normalize_name(name: str) -> str:
+    """이름 비교용 키: 앞뒤 공백 제거 + 소문자 (find_node_by_name과 같은 규칙)."""
+    return name.strip().lower()
+
+
+def trigrams(key: str) -> set:
+    """앞뒤에 공백을 붙인 3글자 조각 집합 (오타에 강한 검색용)."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    칵테일 이름 → 노드 색인.
+    - exact: 정규화된 이름 → 노드 (같은 이름이 여러 개면 전위 순회에서 먼저 나오는 노드)
+    - keys: 정규화된 이름 정렬 리스트 → 접두어 검색은 bisect로 범위만 찾는다
+    - grams: 3글자 조각 → keys 번호 리스트 → 오타가 있어도 후보를 빠르게 좁힌다
+             (처음 오타 검색을 할 때 만든다)
+    - shared: 두 노드 이상이 같은 이름을 쓰는 키 (서브트리를 뗄 때 대신할 노드를 찾아야 함)
+    - version: 색인을 만들 때의 트리 버전
+    - add_subtree(node) / remove_subtree(node, root): 서브트리 하나가 붙거나 떨어졌을 때 색인을 고친다
+      (version은 호출한 쪽이 새 트리 버전으로 맞춘다)
+    """
+
+    def __init__(self, root):
+        self.version = root.version
+        self.exact = {}
+        self.shared = set()
+
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            key = normalize_name(node.name)
+            if key in self.exact:
+                self.shared.add(key)
+            else:
+                self.exact[key] = node
+            stack.extend(reversed(node.children))
+
+        self.keys = sorted(self.exact)
+        self.grams = None
+
+    def add_subtree(self, node):
+        """방금 붙은 서브트리의 이름들을 넣는다. 같은 이름이 있으면 전위 순회에서 앞선 노드를 남긴다."""
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            key = normalize_name(n.name)
+            current = self.exact.get(key)
+            if current is None:
+                self.exact[key] = n
+                insort(self.keys, key)
+                self.grams = None  # 키 번호가 바뀌므로 오타 검색 색인은 다음에 다시 만든다
+            else:
+                self.shared.add(key)
+                if _preorder_path(n) < _preorder_path(current):
+                    self.exact[key] = n
+            stack.extend(reversed(n.children))
+
+    def remove_subtree(self, node, root):
+        """떼어낸 서브트리의 이름들을 뺀다. 같은 이름의 다른 노드가 남아 있으면 root에서 찾아 대신 넣는다."""
+        lost = set()
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            key = normalize_name(n.name)
+            if self.exact.get(key) is n:
+                del self.exact[key]
+                lost.add(key)
+            stack.extend(n.children)
+
+        replace = lost & self.shared
+        if replace:
+            stack = [root]
+            while stack and replace:
+                n = stack.pop()
+                key = normalize_name(n.name)
+                if key in replace:
+                    self.exact[key] = n
+                    replace.discard(key)
+                stack.extend(reversed(n.children))
+        for key in lost:
+            if key not in self.exact:
+                del self.keys[bisect_left(self.keys, key)]
+                self.shared.discard(key)
+                self.grams = None
+
+    def _build_grams(self):
+        grams = {}
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                grams.setdefault(gram, []).append(key_id)
+        self.grams = grams
+
+    def find(self, name: str):
+        return self.exact.get(normalize_name(name))
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> list:
+        """이름이 prefix로 시작하는 노드들 (이름 알파벳 순, 최대 limit개)."""
+        prefix = normalize_name(prefix)
+        result = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(result) < limit and self.keys[i].startswith(prefix):
+            result.append(self.exact[self.keys[i]])
+            i += 1
+        return result
+
+    def search_fuzzy(self, query: str, limit: int = 5, cutoff: float = 0.6) -> list:
+        """
+        오타를 허용하는 검색. 3글자 조각이 많이 겹치는 이름만 후보로 골라
+        difflib 유사도로 다시 점수를 매긴다. (비슷한 순, 최대 limit개)
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        if self.grams is None:
+            self._build_grams()
+
+        shared = {}
+        for gram in trigrams(query):
+            for key_id in self.grams.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+
+        import difflib  # 오타 검색을 처음 할 때만 불러온다 (re 등을 함께 불러와 시작이 느려짐)
+
+        candidates = sorted(shared, key=lambda key_id: -shared[key_id])[:limit * 10]
+        scored = []
+        for key_id in candidates:
+            key = self.keys[key_id]
+            score = difflib.SequenceMatcher(None, query, key).ratio()
+            if score >= cutoff:
+                scored.append((-score, key))
+        scored.sort()
+        return [self.exact[key] for _, key in scored[:limit]]
+
+
+def _preorder_path(node) -> list:
+    """루트에서 node까지 각 단계의 자식 번호 → 두 노드의 전위 순회 순서를 리스트 비교로 알 수 있다."""
+    path = []
+    while node.parent is not None:
+        path.append(node.parent.children.index(node))
+        node = node.parent
+    path.reverse()
+    return path
@@ -0,0 +1,39 @@
+# Preload.py
+
+import threading
+
+
+class Preload:
+    """
+    시간이 걸리는 초기화(사용자 저장소 열기 등)를 백그라운드 스레드에서 미리 해 두는 값.
+    - 만들자마자 factory()를 다른 스레드에서 실행하므로, 그동안 화면(로그인 등)을 먼저 그릴 수 있다.
+    - get(): 끝날 때까지 기다렸다가 결과를 돌려준다. factory가 실패했으면 그 예외를 다시 낸다.
+    - done(): 이미 끝났는지 (기다리지 않음)
+    factory 안에서 import하면 무거운 모듈을 불러오는 시간도 백그라운드로 넘어간다.
+    """
+
+    def __init__(self, factory, name: str = "preload"):
+        self.factory = factory
+        self.value = None
+        self.error = None
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            self.value = self.factory()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def get(self, timeout: float = None):
+        if not self.finished.wait(timeout):
+            raise TimeoutError(f"{self.thread.name}: {timeout}초 안에 준비되지 않았습니다.")
+        if self.error is not None:
+            raise self.error
+        return self.value
@@ -0,0 +1,137 @@
+# RecipeDAG.py
+
+
+class RecipeDAG:
+    """
+    누적 재료 집합이 같은 노드(상태)를 하나로 합친 DAG.
+    같은 칵테일을 재료 넣는 순서만 다르게 여러 경로로 적어 둔 카탈로그
+    (예: Olive Brine → Olive Garnish / Olive Garnish → Olive Brine)에서는
+    트리 노드 수보다 상태 수가 훨씬 적으므로, 조회할 때 상태마다 한 번만 검사한다.
+    - states[s]: 상태 s의 누적 재료 집합 (frozenset). 상태 0은 루트(빈 집합)
+    - members[s]: 상태 s에 해당하는 (전위 순회 번호, 칵테일 이름) 리스트
+    - children[s] / parents[s]: 트리의 부모-자식 관계를 상태 사이의 간선으로 옮긴 것 (중복 제거)
+    - added[s][i]: 간선 s → children[s][i]에서 새로 더해지는 재료 (frozenset). 조회는 부모 상태의 결과에
+      이 재료들만 더 확인하므로, 상태마다 전체 집합을 다시 비교하지 않는다.
+    - version: 만들 때의 트리 버전
+    결과는 CocktailTree의 같은 이름 메서드와 같은 형식·순서로 돌려준다 (전위 순회 번호로 정렬).
+    CocktailTree(use_dag=True)의 find_possible_cocktails / recommend_with_one_missing은
+    scan_possible / scan_one_missing을 불러 상태 단위로 검사한다.
+    만드는 비용(노드 수에 비례)이 크고 트리가 바뀌면 처음부터 다시 만들므로 기본값은 아니다.
+    """
+
+    def __init__(self, root, canonical_set=None):
+        self.version = root.version
+        self.canonical_set = canonical_set
+        self.states = []
+        self.state_ids = {}
+        self.members = []
+        self.children = []
+        self.parents = []
+        self.added = []
+        self.node_count = 0
+
+        stack = [(root, -1)]
+        order = 0
+        while stack:
+            node, parent_state = stack.pop()
+            s = self._state(node.full_ingredient_set)
+            if node.name != "Empty Glass":
+                self.members[s].append((order, node.name))
+                self.node_count += 1
+            order += 1
+            if parent_state >= 0 and parent_state != s and s not in self.children[parent_state]:
+                self.children[parent_state].append(s)
+                self.added[parent_state].append(self.states[s] - self.states[parent_state])
+                self.parents[s].append(parent_state)
+            stack.extend((child, s) for child in reversed(node.children))
+
+        self.roots = [s for s in range(len(self.states)) if not self.parents[s]]
+
+    def _state(self, ingredient_set: frozenset) -> int:
+        s = self.state_ids.get(ingredient_set)
+        if s is None:
+            s = self.state_ids[ingredient_set] = len(self.states)
+            self.states.append(ingredient_set)
+            self.members.append([])
+            self.children.append([])
+            self.parents.append([])
+            self.added.append([])
+        return s
+
+    def stats(self) -> dict:
+        """노드 수 / 상태 수 / 간선 수 / 합쳐진 노드 수"""
+        return {"nodes": self.node_count, "states": len(self.states),
+                "edges": sum(len(c) for c in self.children),
+                "merged": self.node_count - sum(1 for m in self.members if m)}
+
+    def _prepare(self, my_ingredients):
+        if self.canonical_set is not None:
+            return self.canonical_set(my_ingredients)
+        if not isinstance(my_ingredients, (set, frozenset)):
+            return set(my_ingredients)
+        return my_ingredients
+
+    def find_possible_cocktails(self, my_ingredients) -> list:
+        """만들 수 있는 칵테일 (CocktailTree.find_possible_cocktails와 같은 순서)."""
+        return self.scan_possible(self._prepare(my_ingredients))[0]
+
+    def recommend_with_one_missing(self, my_ingredients) -> dict:
+        """하나만 더 있으면 만들 수 있는 칵테일 { 부족재료: [칵테일, ...] } (CocktailTree와 같은 순서)."""
+        return self.scan_one_missing(self._prepare(my_ingredients))[0]
+
+    def scan_possible(self, my_ingredients):
+        """
+        (만들 수 있는 칵테일 리스트, 검사한 상태 수). my_ingredients는 이미 정규화된 집합.
+        만들 수 있는 상태의 자식 상태만 검사한다 (만들 수 없는 상태의 자식은 상위집합이라 역시 만들 수 없음).
+        여러 부모에서 이어지는 상태도 seen으로 한 번만 검사한다.
+        """
+        members, children, added = self.members, self.children, self.added
+        found = []
+        seen = set(self.roots)
+        stack = [s for s in self.roots if self.states[s] <= my_ingredients]
+        visited = len(self.roots)
+        while stack:
+            s = stack.pop()
+            found.extend(members[s])
+            visited += len(children[s])
+            for c, new in zip(children[s], added[s]):
+                if new <= my_ingredients and c not in seen:
+                    seen.add(c)
+                    stack.append(c)
+        found.sort()
+        return [name for _, name in found], visited
+
+    def scan_one_missing(self, my_ingredients):
+        """({ 부족재료: [칵테일, ...] }, 검사한 상태 수). my_ingredients는 이미 정규화된 집합."""
+        members, children, added = self.members, self.children, self.added
+        found = []
+        seen = set(self.roots)
+        visited = len(self.roots)
+        # (상태, 부족한 재료 또는 None) — 부족한 재료가 2개 이상인 상태는 넣지 않는다
+        stack = []
+        for s in self.roots:
+            missing = self.states[s] - my_ingredients
+            if len(missing) <= 1:
+                stack.append((s, next(iter(missing)) if missing else None))
+        while stack:
+            s, ing = stack.pop()
+            if ing is not None:
+                found.extend((order, ing, name) for order, name in members[s])
+            visited += len(children[s])
+            for c, new in zip(children[s], added[s]):
+                if c in seen:
+                    continue
+                child_ing = ing
+                for n in new:
+                    if n not in my_ingredients:
+                        if child_ing is not None:
+                            break
+                        child_ing = n
+                else:
+                    seen.add(c)
+                    stack.append((c, child_ing))
+        found.sort()
+        missing_to_cocktails = {}
+        for _, ing, name in found:
+            missing_to_cocktails.setdefault(ing, []).append(name)
+        return missing_to_cocktails, visited
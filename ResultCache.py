@@ -0,0 +1,93 @@
+# ResultCache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def fridge_key(ingredients) -> str:
+    """
+    재료 집합의 정규화된 해시. 순서/중복과 상관없이 같은 재료 집합이면 같은 키가 나온다.
+    """
+    joined = "\x1f".join(sorted(set(ingredients)))
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    (조회 종류, 트리 버전, 냉장고 해시, 추가 인자) → 조회 결과 메모이제이션.
+    - maxsize: 최대 항목 수. 넘치면 가장 오래 쓰이지 않은 항목부터 지운다 (LRU)
+    - ttl: 항목 유효 시간(초). None이면 만료 없음
+    - 트리 버전이 키에 들어가므로 트리가 바뀌면 예전 결과는 자연히 쓰이지 않는다.
+      카탈로그를 다시 불러올 때는 invalidate()로 한 번에 비울 수 있다.
+    - hits / misses / evictions / expirations: 적중/실패/LRU 삭제/만료 횟수
+    돌려받은 결과는 여러 호출자가 공유하므로 읽기 전용으로만 사용해야 한다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_compute(self, kind: str, tree, ingredients, compute, *args):
+        """
+        캐시에 있으면 그 결과를, 없으면 compute(ingredients, *args)를 계산해 저장하고 반환한다.
+        tree는 버전(tree.version)을 얻는 데만 쓴다.
+        """
+        key = (kind, tree.version, fridge_key(ingredients), args)
+        result = self.lookup(key)
+        if result is None:
+            # 계산은 잠금 밖에서 (같은 키를 동시에 계산할 수는 있지만 결과는 같다)
+            result = compute(ingredients, *args)
+            self.store(key, result)
+        return result
+
+    def lookup(self, key):
+        """키에 해당하는 결과. 없거나 만료됐으면 None."""
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if self.ttl is None or now - stored_at < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def store(self, key, result):
+        with self.lock:
+            self.entries[key] = (self.clock(), result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *_):
+        """모든 항목을 지운다 (카탈로그를 다시 불러왔을 때)."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,80 @@
+# ShardedEvaluator.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from BinaryCatalog import MappedCatalog
+from CompactTree import MappedCompactTree
+
+# 작업 프로세스마다 한 번만 여는 카탈로그 (프로세스 풀 initializer에서 채움)
+_worker_tree = None
+
+
+def _init_worker(bin_path: str):
+    global _worker_tree
+    _worker_tree = MappedCompactTree(MappedCatalog(bin_path))
+
+
+def _scan_shard(start: int, end: int, fridge_ids: frozenset, want_possible: bool, want_missing: bool):
+    """작업 프로세스: 서브트리 범위 하나에서 (만들 수 있는 노드 번호들, (부족재료 id, 노드 번호)들)."""
+    return (_worker_tree.scan_possible(fridge_ids, start, end) if want_possible else [],
+            _worker_tree.scan_one_missing(fridge_ids, start, end) if want_missing else [])
+
+
+class ShardedEvaluator:
+    """
+    바이너리 카탈로그(cocktails.bin)를 기본술 서브트리("Empty Glass"의 자식) 단위로 나눠
+    여러 프로세스에서 동시에 평가한다.
+    - 작업 프로세스는 같은 파일을 mmap으로 열기 때문에 트리를 pickle로 보내지 않고
+      운영체제 페이지 캐시를 읽기 전용으로 공유한다. 작업마다 오가는 것은 노드 번호 범위와 재료 id뿐.
+    - 서브트리는 전위 순회 번호가 연속된 구간이므로, 결과를 서브트리 순서대로 합치면
+      CocktailTree의 결과와 순서까지 같다.
+    """
+
+    def __init__(self, bin_path: str, processes: int = None):
+        self.tree = MappedCompactTree(MappedCatalog(bin_path))
+        self.processes = processes or os.cpu_count() or 1
+
+        n = len(self.tree)
+        if n and self.tree.name(0) == "Empty Glass":
+            self.shards = [(c, self.tree.subtree_end[c]) for c in self.tree.children(0)]
+        else:
+            # 루트 자체가 칵테일인 카탈로그는 나눌 수 없으므로 통째로 한 조각
+            self.shards = [(0, n)]
+
+        self.pool = ProcessPoolExecutor(max_workers=self.processes,
+                                        initializer=_init_worker, initargs=(bin_path,))
+
+    def evaluate(self, my_ingredients, want_possible: bool = True, want_missing: bool = True):
+        """(만들 수 있는 칵테일 리스트, { 부족재료: [칵테일, ...] }) 를 한 번의 분산 실행으로 구한다."""
+        tree = self.tree
+        fridge_ids = frozenset(tree._fridge_ids(my_ingredients))
+        count = len(self.shards)
+        results = self.pool.map(_scan_shard,
+                                [start for start, _ in self.shards], [end for _, end in self.shards],
+                                [fridge_ids] * count, [want_possible] * count, [want_missing] * count)
+
+        possible = []
+        missing_to_cocktails = {}
+        for shard_possible, shard_missing in results:
+            possible.extend(tree.name(i) for i in shard_possible)
+            for sid, i in shard_missing:
+                missing_to_cocktails.setdefault(tree.string(sid), []).append(tree.name(i))
+        return possible, missing_to_cocktails
+
+    def find_possible_cocktails(self, my_ingredients: set):
+        return self.evaluate(my_ingredients, want_missing=False)[0]
+
+    def recommend_with_one_missing(self, my_ingredients: set):
+        return self.evaluate(my_ingredients, want_possible=False)[1]
+
+    def close(self):
+        self.pool.shutdown()
+        self.tree.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
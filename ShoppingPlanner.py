@@ -0,0 +1,258 @@
+# ShoppingPlanner.py
+
+import heapq
+
+from CocktailMatcher import CocktailMatcher, iter_bits, popcount
+
+# 이 개수 이하를 살 때는 기본으로 정확한 분기 한정 탐색을 한다
+EXACT_MAX_PURCHASES = 3
+# 산 재료가 이 개수 이하이면 열리는 수를 부분집합 사전 조회로 센다 (2**개수 번)
+SUBMASK_LIMIT = 12
+
+
+class ShoppingPlan:
+    """
+    plan()의 결과.
+    - ingredients: 살 재료 (탐욕은 고른 순서, 분기 한정은 재료 id 순) / cost: 총비용
+    - unlocked: 새로 만들 수 있게 되는 칵테일 (트리 순서)
+    - method: "exact"(분기 한정) 또는 "greedy"(지연 탐욕)
+    - optimal: 분기 한정 탐색이 끝까지 돌아 최적임이 확인되었으면 True
+    """
+
+    def __init__(self, ingredients, cost, unlocked, method, optimal):
+        self.ingredients = ingredients
+        self.cost = cost
+        self.unlocked = unlocked
+        self.method = method
+        self.optimal = optimal
+
+    def __repr__(self):
+        return (f"<ShoppingPlan {self.ingredients} cost={self.cost} unlocked={len(self.unlocked)} "
+                f"{self.method}{' optimal' if self.optimal else ''}>")
+
+
+class ShoppingPlanner:
+    """
+    예산 안에서 살 재료 조합을 골라 새로 만들 수 있는 칵테일 수를 최대로 만든다.
+    - 후보: 부족한 재료가 1개 이상이고 예산 안에서 다 살 수 있는 칵테일.
+      부족한 재료 조합(비트마스크)이 같은 칵테일은 묶어서 개수만 센다.
+    - 목적함수 f(S) = 부족한 재료가 모두 S에 들어 있는 칵테일 수.
+      재료끼리 보완 관계(둘 다 있어야 열리는 칵테일)가 있어 submodular가 아니므로,
+      지연 탐욕(CELF)은 근사일 뿐 보장이 없다. 그래서 탐욕도 재료 하나가 아니라
+      "어떤 칵테일의 남은 부족 재료 전부"를 한 번에 사는 묶음 단위로 고르고 (비용 대비 효과 순),
+      적게 살 때는 분기 한정으로 최적해를 찾는다.
+    - costs: {재료: 비용} (없으면 1). 예산은 비용 합의 상한 → 비용이 모두 1이면 "k개까지 구매".
+    """
+
+    def __init__(self, matcher: CocktailMatcher):
+        self.matcher = matcher
+
+    def plan(self, my_ingredients, budget: float, costs: dict = None, exact: bool = None,
+             max_nodes: int = 200_000) -> ShoppingPlan:
+        """
+        exact=None이면 최대 구매 개수가 EXACT_MAX_PURCHASES 이하일 때만 분기 한정 탐색.
+        분기 한정은 max_nodes개 노드를 넘으면 그때까지 찾은 가장 좋은 조합을 돌려준다 (optimal=False).
+        """
+        m = self.matcher
+        names = m.ingredient_names
+        costs = costs or {}
+        cost_of = []
+        for name in names:
+            c = costs.get(name, 1)
+            if c <= 0:
+                raise ValueError(f"재료 비용은 0보다 커야 합니다: {name}")
+            cost_of.append(c)
+        self.cost_of = cost_of
+        self._mask_costs = {}
+        # 비용이 모두 같으면(기본값 1) 묶음 비용은 재료 수 × 비용
+        self.uniform_cost = cost_of[0] if cost_of and len(set(cost_of)) == 1 else None
+
+        # 예산으로 살 수 있는 최대 개수만큼만 부족한 칵테일을 센다
+        cheapest = min(cost_of, default=1)
+        max_buys = int(budget // cheapest) if budget >= cheapest else 0
+        max_buys = min(max_buys, len(names))
+        if max_buys == 0:
+            return ShoppingPlan([], 0, [], "greedy", True)
+        fridge, levels = m.missing_levels(my_ingredients, max_buys)
+        candidates = levels[0] & ~levels[max_buys]  # 부족한 재료가 1 ~ max_buys개
+
+        weights = {}
+        self.recipes = []  # (칵테일 번호, 부족 재료 마스크)
+        for r in iter_bits(candidates):
+            need = m.recipe_masks[r] & ~fridge
+            if self.mask_cost(need) <= budget:
+                weights[need] = weights.get(need, 0) + 1
+                self.recipes.append((r, need))
+        self.by_mask = weights
+        self.masks = list(weights)
+        self.weights = [weights[need] for need in self.masks]
+        # 재료 → 그 재료가 부족한 묶음 번호 (이 재료를 사면 열릴 수 있는 묶음만 본다)
+        self.users = {}
+        for j, need in enumerate(self.masks):
+            for i in iter_bits(need):
+                self.users.setdefault(i, []).append(j)
+
+        if exact is None:
+            exact = max_buys <= EXACT_MAX_PURCHASES
+        chosen = self._greedy(budget)
+        method, optimal = "greedy", False
+        if exact:
+            chosen, optimal = self._branch_and_bound(budget, chosen, max_nodes)
+            method = "exact"
+
+        bought = 0
+        for i in chosen:
+            bought |= 1 << i
+        unlocked = [m.names[r] for r, need in self.recipes if not need & ~bought]
+        return ShoppingPlan([names[i] for i in chosen], sum(cost_of[i] for i in chosen), unlocked, method, optimal)
+
+    # ─── 공통 ──────────────────────────────────────────────────────────────────
+    def mask_cost(self, mask: int):
+        if self.uniform_cost is not None:
+            return self.uniform_cost * popcount(mask)
+        c = self._mask_costs.get(mask)
+        if c is None:
+            c = self._mask_costs[mask] = sum(self.cost_of[i] for i in iter_bits(mask))
+        return c
+
+    def value(self, bought: int) -> int:
+        """bought를 샀을 때 열리는 칵테일 수."""
+        if popcount(bought) <= SUBMASK_LIMIT:
+            # 열리는 묶음 = bought의 부분집합 → 부분집합을 전부 만들어 사전에서 찾는다
+            subsets = [0]
+            for i in iter_bits(bought):
+                bit = 1 << i
+                subsets += [sub | bit for sub in subsets]
+            return sum(filter(None, map(self.by_mask.get, subsets)))
+        seen = set()
+        total = 0
+        for i in iter_bits(bought):
+            for j in self.users.get(i, ()):
+                if j not in seen:
+                    seen.add(j)
+                    if not self.masks[j] & ~bought:
+                        total += self.weights[j]
+        return total
+
+    # ─── 지연 탐욕 (CELF) ────────────────────────────────────────────────────────
+    def _greedy(self, budget) -> list:
+        """
+        묶음(어떤 칵테일의 남은 부족 재료 전부)을 (새로 열리는 수 / 추가 비용)이 큰 순서로 산다.
+        힙의 값은 예전에 계산한 값이라, 꺼냈을 때 다시 계산해서 여전히 다음 후보 이상일 때만 산다.
+        (목적함수가 submodular가 아니라 예전 값이 상한이라는 보장은 없다 → 근사)
+        비용 대비 탐욕이 나쁠 수 있어, 한 번에 살 수 있는 가장 좋은 묶음 하나와도 비교한다.
+        """
+        values = [self.value(need) for need in self.masks]
+        bought, bought_value, spent, chosen = 0, 0, 0, []
+        # 아무것도 사지 않았을 때 묶음을 사면 얻는 수 = 묶음 값이므로 첫 회차의 값은 정확하다
+        heap = [(-values[j] / self.mask_cost(need), self.mask_cost(need), j, 0)
+                for j, need in enumerate(self.masks)]
+        heapq.heapify(heap)
+        round_no = 0
+        deferred = {}
+        while heap:
+            entry = heapq.heappop(heap)
+            _, _, j, stamp = entry
+            add = self.masks[j] & ~bought
+            if not add:
+                continue
+            add_cost = self.mask_cost(add)
+            if spent + add_cost > budget:
+                # 남은 예산은 줄기만 하므로, 이 묶음의 재료를 사서 남은 비용이 줄 때만 다시 본다
+                deferred[j] = entry
+                continue
+            if stamp != round_no:
+                ratio = (self.value(bought | add) - bought_value) / add_cost
+                heapq.heappush(heap, (-ratio, add_cost, j, round_no))
+                continue
+            bought |= add
+            bought_value = self.value(bought)
+            spent += add_cost
+            chosen.extend(iter_bits(add))
+            round_no += 1
+            for i in iter_bits(add):
+                for other in self.users[i]:
+                    entry = deferred.pop(other, None)
+                    if entry is not None:
+                        heapq.heappush(heap, entry)
+
+        best = max(range(len(values)), key=values.__getitem__, default=None)
+        if best is not None and values[best] > bought_value:
+            return list(iter_bits(self.masks[best]))
+        return chosen
+
+    # ─── 분기 한정 ───────────────────────────────────────────────────────────────
+    def _upper_bound(self, alive: list, bought: int, left):
+        """
+        alive 묶음으로 얻을 수 있는 추가 칵테일 수의 상한과, 다음에 나눌 재료.
+        새로 열리는 묶음은 새로 산 재료를 적어도 하나 포함하므로
+        추가 수 <= sum(g[i] for 새로 산 i), g[i] = i를 포함하는 살아 있는 묶음의 칵테일 수.
+        남은 예산 안에서 이 합의 최댓값을 분할 배낭(비용 대비 g가 큰 순서)으로 어림한다.
+        """
+        g = {}
+        for j in alive:
+            w = self.weights[j]
+            for i in iter_bits(self.masks[j] & ~bought):
+                g[i] = g.get(i, 0) + w
+        if not g:
+            return 0, None
+        cost_of = self.cost_of
+        bound = 0
+        for i in sorted(g, key=lambda i: -g[i] / cost_of[i]):
+            if cost_of[i] <= left:
+                bound += g[i]
+                left -= cost_of[i]
+            else:
+                bound += g[i] * left / cost_of[i]
+                break
+        pivot = max(g, key=lambda i: (g[i], -cost_of[i], -i))
+        return bound, pivot
+
+    def _branch_and_bound(self, budget, incumbent: list, max_nodes: int):
+        """
+        재료를 하나씩 "산다 / 안 산다"로 나누는 깊이 우선 탐색.
+        노드마다 "살아 있는" 묶음(안 사기로 한 재료가 없고 남은 부족 재료를 남은 예산으로 살 수 있는 것)만
+        들고 다니며, 나눌 재료는 살아 있는 묶음에서 가장 많이 쓰이는 재료로 고른다.
+        지금 열린 수 + _upper_bound가 지금까지의 최선 이하이면 그 가지는 버린다. 탐욕 결과를 초기 최선으로 쓴다.
+        """
+        best_mask = 0
+        for i in incumbent:
+            best_mask |= 1 << i
+        best = [self.value(best_mask), best_mask]
+        nodes = 0
+        complete = True
+        masks, weights, cost_of = self.masks, self.weights, self.cost_of
+
+        # (산 재료, 쓴 비용, 지금 열린 수, 살아 있는 묶음)
+        stack = [(0, 0, 0, list(range(len(masks))))]
+        while stack:
+            nodes += 1
+            if nodes > max_nodes:
+                complete = False
+                break
+            bought, spent, value, alive = stack.pop()
+            if value > best[0]:
+                best[:] = [value, bought]
+            left = budget - spent
+            bound, i = self._upper_bound(alive, bought, left)
+            if i is None or value + bound <= best[0]:
+                continue
+            bit = 1 << i
+            # 안 사는 가지를 먼저 쌓아서 사는 가지를 먼저 탐색
+            stack.append((bought, spent, value, [j for j in alive if not masks[j] & bit]))
+            if cost_of[i] <= left:
+                bought_i, left_i, value_i, alive_i = bought | bit, left - cost_of[i], value, []
+                for j in alive:
+                    rest = masks[j] & ~bought_i
+                    if not rest:
+                        value_i += weights[j]
+                    elif self.mask_cost(rest) <= left_i:
+                        alive_i.append(j)
+                stack.append((bought_i, spent + cost_of[i], value_i, alive_i))
+
+        # 산 재료 중 아무 칵테일도 열지 않는 재료는 뺀다
+        useful = 0
+        for need in masks:
+            if not need & ~best[1]:
+                useful |= need
+        return list(iter_bits(best[1] & useful)), complete
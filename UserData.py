@@ -1,25 +1,275 @@
+import os
 import pickle
+import sqlite3
+import threading
+
+from IngredientRegistry import IngredientRegistry, get_registry
+from Metrics import timed
+
+
+class SQLiteUserStore:
+    """
+    사용자별 재료를 SQLite(WAL 모드)에 한 줄씩 저장하는 저장소.
+    - users(pin): 가입한 사용자
+    - user_ingredients(pin, ingredient): 사용자가 가진 재료 (한 재료당 한 줄)
+    사용자 한 명이 재료 하나를 바꾸면 그 줄만 쓰므로 전체 사용자 수와 무관하고,
+    여러 프로세스/스레드가 동시에 써도 SQLite 잠금으로 서로의 기록을 덮어쓰지 않는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS users (pin INTEGER PRIMARY KEY)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_ingredients ("
+                " pin INTEGER NOT NULL, ingredient TEXT NOT NULL,"
+                " PRIMARY KEY (pin, ingredient)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드끼리 공유하지 않는다 (Streamlit 세션은 각자 스레드에서 실행됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def contains(self, pin: int) -> bool:
+        row = self._conn().execute("SELECT 1 FROM users WHERE pin = ?", (pin,)).fetchone()
+        return row is not None
+
+    def load(self, pin: int) -> set:
+        rows = self._conn().execute(
+            "SELECT ingredient FROM user_ingredients WHERE pin = ?", (pin,)
+        ).fetchall()
+        return {ing for (ing,) in rows}
+
+    def load_all(self) -> dict:
+        data = {pin: set() for (pin,) in self._conn().execute("SELECT pin FROM users")}
+        for pin, ing in self._conn().execute("SELECT pin, ingredient FROM user_ingredients"):
+            data[pin].add(ing)
+        return data
+
+    def save(self, pin: int, ings: set) -> None:
+        """pin의 재료를 ings로 바꾼다. 실제로 달라진 재료 줄만 추가/삭제한다."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (pin) VALUES (?)", (pin,))
+            current = {ing for (ing,) in conn.execute(
+                "SELECT ingredient FROM user_ingredients WHERE pin = ?", (pin,))}
+            conn.executemany(
+                "DELETE FROM user_ingredients WHERE pin = ? AND ingredient = ?",
+                [(pin, ing) for ing in current - set(ings)],
+            )
+            conn.executemany(
+                "INSERT INTO user_ingredients (pin, ingredient) VALUES (?, ?)",
+                [(pin, ing) for ing in set(ings) - current],
+            )
+
+    def add(self, pin: int, ing: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (pin) VALUES (?)", (pin,))
+            conn.execute("INSERT OR IGNORE INTO user_ingredients (pin, ingredient) VALUES (?, ?)", (pin, ing))
+
+    def remove(self, pin: int, ing: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM user_ingredients WHERE pin = ? AND ingredient = ?", (pin, ing))
+
+    def apply(self, changes, canonical=None) -> None:
+        """
+        여러 사용자의 변경을 트랜잭션 하나로 기록한다 (쓰기 지연 저장의 일괄 기록용).
+        - changes: [(pin, replace, adds, removes), ...]
+          replace가 None이 아니면 그 집합으로 바꾸고, 그 다음 adds를 추가 / removes를 삭제
+        - canonical: 주어지면 저장된 표기를 정규화한 값이 removes에 있는 줄도 지운다
+        """
+        with self._transaction() as conn:
+            for pin, replace, adds, removes in changes:
+                conn.execute("INSERT OR IGNORE INTO users (pin) VALUES (?)", (pin,))
+                current = {ing for (ing,) in conn.execute(
+                    "SELECT ingredient FROM user_ingredients WHERE pin = ?", (pin,))}
+                target = set(current if replace is None else replace)
+                if canonical is not None:
+                    target = {ing for ing in target if canonical(ing) not in removes}
+                target = (target - removes) | adds
+                conn.executemany(
+                    "DELETE FROM user_ingredients WHERE pin = ? AND ingredient = ?",
+                    [(pin, ing) for ing in current - target],
+                )
+                conn.executemany(
+                    "INSERT INTO user_ingredients (pin, ingredient) VALUES (?, ?)",
+                    [(pin, ing) for ing in target - current],
+                )
+
+    def migrate_from_pickle(self, pickle_path: str) -> bool:
+        """
+        기존 userData.pickle의 내용을 한 번만 가져온다. (가져온 적이 있으면 다시 하지 않음)
+        여러 프로세스가 동시에 시작해도 쓰기 잠금 안에서 확인하므로 한 번만 실행된다.
+        """
+        if not os.path.exists(pickle_path):
+            return False
+        with self._transaction() as conn:
+            done = conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_pickle'").fetchone()
+            if done:
+                return False
+            with open(pickle_path, "rb") as fr:
+                data = pickle.load(fr)
+            for pin, ings in data.items():
+                conn.execute("INSERT OR IGNORE INTO users (pin) VALUES (?)", (pin,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO user_ingredients (pin, ingredient) VALUES (?, ?)",
+                    [(pin, ing) for ing in ings],
+                )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_pickle', ?)", (pickle_path,))
+        return True
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ~ COMMIT (예외가 나면 ROLLBACK). 시작할 때 쓰기 잠금을 잡는다."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class PickleUserStore:
+    """
+    {pin: 재료 set} 딕셔너리 전체를 pickle 파일 하나에 저장하는 저장소 (SQLiteUserStore와 같은 메서드).
+    - 바뀔 때마다 같은 디렉터리의 임시 파일에 쓰고 fsync한 뒤 os.replace로 바꿔치기하므로,
+      쓰는 도중 프로세스가 죽어도 파일은 이전 내용이나 새 내용 중 하나로 남는다.
+    - 전체 파일을 다시 쓰므로 WriteBehind로 변경을 모아서 apply로 한 번에 쓰는 것을 권장.
+    - 한 프로세스 안에서만 안전하다 (여러 프로세스가 함께 쓰려면 SQLiteUserStore 사용).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.users = {}
+        if os.path.exists(path):
+            with open(path, "rb") as fr:
+                self.users = {pin: set(ings) for pin, ings in pickle.load(fr).items()}
+
+    def _write(self) -> None:
+        import tempfile  # pickle 저장소를 쓸 때만 필요 (shutil, random까지 불러옴)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as fw:
+                pickle.dump(self.users, fw, protocol=pickle.HIGHEST_PROTOCOL)
+                fw.flush()
+                os.fsync(fw.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def contains(self, pin: int) -> bool:
+        return pin in self.users
+
+    def load(self, pin: int) -> set:
+        with self.lock:
+            return set(self.users.get(pin, ()))
+
+    def load_all(self) -> dict:
+        with self.lock:
+            return {pin: set(ings) for pin, ings in self.users.items()}
+
+    def save(self, pin: int, ings: set) -> None:
+        self.apply([(pin, set(ings), set(), set())])
+
+    def add(self, pin: int, ing: str) -> None:
+        self.apply([(pin, None, {ing}, set())])
+
+    def remove(self, pin: int, ing: str) -> None:
+        self.apply([(pin, None, set(), {ing})])
+
+    def apply(self, changes, canonical=None) -> None:
+        """SQLiteUserStore.apply와 같은 형식의 변경 목록을 반영하고 파일을 한 번만 다시 쓴다."""
+        with self.lock:
+            for pin, replace, adds, removes in changes:
+                target = set(self.users.get(pin, ()) if replace is None else replace)
+                if canonical is not None:
+                    target = {ing for ing in target if canonical(ing) not in removes}
+                self.users[pin] = (target - removes) | adds
+            self._write()
+
+    def migrate_from_pickle(self, pickle_path: str) -> bool:
+        return False
+
 
 class UserData:
     """
-    userData.pickle 파일에서 모든 사용자의 재료 정보를 딕셔너리 자료형으로 불러오는 클래스
-    - save_data(pin, ings): pin 번호를 key 값, ings를 value로 딕셔너리에 저장
-    - isValid(pin): pin 번호가 이미 key값으로 사용되면 True, 아니면 False 리턴
-    - load_data(pin): key가 pin 번호인 value(set) 리턴
+    모든 사용자의 재료 정보를 저장소(SQLite, userData.db)에서 읽고 쓰는 클래스
+    - save_data(pin, ings): pin 번호의 재료를 ings로 저장 (바뀐 재료만 기록)
+    - add_ingredient(pin, ing) / remove_ingredient(pin, ing): 재료 하나만 추가/삭제
+    - isValid(pin): pin 번호가 이미 사용되면 True, 아니면 False 리턴
+    - load_data(pin): pin 번호의 재료(set) 리턴
+    - data: {pin: 재료 set} 전체 딕셔너리 (일괄 작업용)
+    - apply_changes(changes): 여러 사용자의 변경을 한 번에 기록 (WriteBehind가 사용)
+    처음 실행할 때 예전 userData.pickle이 있으면 그 내용을 저장소로 옮긴다.
+    backend="pickle"이면 SQLite 대신 path의 pickle 파일 하나에 저장한다 (PickleUserStore).
+    각 작업의 호출 수 / 지연 시간은 Metrics.registry에 기록된다.
+    재료 이름은 트리와 같은 IngredientRegistry로 정규화해서 저장/반환한다. ("gin " → "Gin")
     """
-    def __init__(self):
-        with open("userData.pickle", "rb") as fr:
-            self.data = pickle.load(fr)
-    
+    def __init__(self, path: str = "userData.db", legacy_path: str = "userData.pickle",
+                 registry: IngredientRegistry = None, backend: str = "sqlite"):
+        self.registry = registry or get_registry()
+        if backend == "sqlite":
+            self.store = SQLiteUserStore(path)
+        elif backend == "pickle":
+            self.store = PickleUserStore(path)
+        else:
+            raise ValueError(f"알 수 없는 저장소입니다: {backend}")
+        if legacy_path and backend == "sqlite":
+            self.store.migrate_from_pickle(legacy_path)
+
+    @property
+    @timed("user_data_operation", op="data")
+    def data(self) -> dict:
+        canonical_set = self.registry.canonical_set
+        return {pin: canonical_set(ings) for pin, ings in self.store.load_all().items()}
+
+    @timed("user_data_operation", op="save_data")
     def save_data(self, pin:int, ings:set) -> None:
-        self.data[pin] = ings
-        with open("userData.pickle", "wb") as fw:
-            pickle.dump(self.data, fw)
-            
+        self.store.save(pin, self.registry.canonical_set(ings))
+
+    @timed("user_data_operation", op="add_ingredient")
+    def add_ingredient(self, pin:int, ing:str) -> None:
+        self.store.add(pin, self.registry.canonical(ing))
+
+    @timed("user_data_operation", op="remove_ingredient")
+    def remove_ingredient(self, pin:int, ing:str) -> None:
+        # 정규화 전에 저장된 표기("gin" 등)도 같은 재료면 함께 지운다
+        same = self.registry.same
+        for stored in self.store.load(pin):
+            if same(stored, ing):
+                self.store.remove(pin, stored)
+
+    @timed("user_data_operation", op="apply_changes")
+    def apply_changes(self, changes) -> None:
+        """[(pin, replace, adds, removes), ...] — 재료 이름을 정규화해서 트랜잭션 하나로 기록"""
+        canonical, canonical_set = self.registry.canonical, self.registry.canonical_set
+        self.store.apply([(pin, None if replace is None else canonical_set(replace),
+                           canonical_set(adds), canonical_set(removes))
+                          for pin, replace, adds, removes in changes], canonical)
+
+    @timed("user_data_operation", op="isValid")
     def isValid(self, pin:int) -> bool:
-        return pin in self.data
-    
+        return self.store.contains(pin)
+
+    @timed("user_data_operation", op="load_data")
     def load_data(self, pin:int) -> set:
-        return self.data[pin]
-    
-    
\ No newline at end of file
+        return self.registry.canonical_set(self.store.load(pin))
@@ -0,0 +1,214 @@
+# WriteBehind.py
+
+import atexit
+import threading
+import time
+
+from UserData import UserData
+
+MAX_RETRY_DELAY = 30.0  # 기록에 계속 실패할 때 다시 시도하는 간격의 상한 (초)
+
+
+class PendingEdit:
+    """
+    아직 저장하지 않은 사용자 한 명의 변경. 같은 PIN의 연속된 수정은 여기에 합쳐진다.
+    - replace: save_data로 통째로 바꾼 재료 집합 (없으면 None)
+    - adds / removes: 그 뒤에 추가 / 삭제한 재료 (같은 재료를 넣었다 빼면 마지막 것만 남음)
+    """
+
+    def __init__(self):
+        self.replace = None
+        self.adds = set()
+        self.removes = set()
+        self.ops = 0
+
+    def save(self, ings):
+        self.replace = set(ings)
+        self.adds.clear()
+        self.removes.clear()
+        self.ops += 1
+
+    def add(self, ing):
+        self.removes.discard(ing)
+        self.adds.add(ing)
+        self.ops += 1
+
+    def remove(self, ing):
+        self.adds.discard(ing)
+        self.removes.add(ing)
+        self.ops += 1
+
+    def then(self, newer: "PendingEdit") -> "PendingEdit":
+        """이 변경 뒤에 newer를 적용한 것과 같은 변경 (기록 실패 후 다시 합칠 때)"""
+        if newer.replace is not None:
+            return newer
+        # newer의 adds와 removes는 서로 겹치지 않으므로 순서와 무관하다
+        self.adds = (self.adds - newer.removes) | newer.adds
+        self.removes = (self.removes - newer.adds) | newer.removes
+        self.ops += newer.ops
+        return self
+
+    def copy(self) -> "PendingEdit":
+        edit = PendingEdit()
+        edit.replace = None if self.replace is None else set(self.replace)
+        edit.adds = set(self.adds)
+        edit.removes = set(self.removes)
+        edit.ops = self.ops
+        return edit
+
+    def apply_to(self, ings: set) -> set:
+        result = set(ings if self.replace is None else self.replace)
+        return (result - self.removes) | self.adds
+
+    def change(self, pin: int) -> tuple:
+        return pin, self.replace, set(self.adds), set(self.removes)
+
+
+class WriteBehind:
+    """
+    UserData 앞에 두는 쓰기 지연(write-behind) 저장 계층. UserData와 같은 메서드를 제공한다.
+    - save_data / add_ingredient / remove_ingredient는 PIN별 PendingEdit에 합치기만 하고 바로 돌아온다.
+    - 백그라운드 스레드가 interval초마다, 또는 쌓인 수정이 max_pending개를 넘으면
+      모인 변경을 UserData.apply_changes로 트랜잭션 한 번에 기록한다.
+    - 읽기(load_data / isValid / data)는 저장소 내용에 아직 기록되지 않은 변경을 덧붙여 돌려준다.
+    - flush(): 지금까지의 변경을 바로 기록 / close(): 마지막으로 기록하고 스레드를 멈춤 (atexit에도 등록)
+    기록에 실패하면 변경을 버리지 않고 다음 기록 때 다시 시도한다. 실패한 뒤에는 쌓인 수정 수와 상관없이
+    interval초부터 실패할 때마다 두 배로(최대 MAX_RETRY_DELAY초) 기다렸다가 다시 시도한다.
+    """
+
+    def __init__(self, user_data: UserData = None, interval: float = 1.0, max_pending: int = 256):
+        self.user_data = user_data or UserData()
+        self.registry = self.user_data.registry
+        self.interval = interval
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()   # 기록은 한 번에 하나씩
+        self.wakeup = threading.Condition(self.lock)
+        self.pending = {}    # pin → PendingEdit (아직 기록 시작 전)
+        self.flushing = {}   # pin → PendingEdit (기록 중)
+        self.pending_ops = 0
+        self.flushes = 0
+        self.last_error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="user-data-write-behind", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # ─── 쓰기 ──────────────────────────────────────────────────────────────────
+    def _edit(self, pin: int) -> PendingEdit:
+        edit = self.pending.get(pin)
+        if edit is None:
+            edit = self.pending[pin] = PendingEdit()
+        self.pending_ops += 1
+        if self.pending_ops >= self.max_pending:
+            self.wakeup.notify()
+        return edit
+
+    def save_data(self, pin: int, ings: set) -> None:
+        ings = self.registry.canonical_set(ings)
+        with self.lock:
+            self._edit(pin).save(ings)
+
+    def add_ingredient(self, pin: int, ing: str) -> None:
+        ing = self.registry.canonical(ing)
+        with self.lock:
+            self._edit(pin).add(ing)
+
+    def remove_ingredient(self, pin: int, ing: str) -> None:
+        ing = self.registry.canonical(ing)
+        with self.lock:
+            self._edit(pin).remove(ing)
+
+    # ─── 읽기 (기록 전 변경 포함) ───────────────────────────────────────────────
+    def _unsaved(self, pin: int) -> list:
+        # 다른 스레드가 같은 PIN을 고치는 중일 수 있으므로 잠금 안에서 복사해 둔다
+        with self.lock:
+            return [edit.copy() for edit in (self.flushing.get(pin), self.pending.get(pin)) if edit is not None]
+
+    def isValid(self, pin: int) -> bool:
+        return bool(self._unsaved(pin)) or self.user_data.isValid(pin)
+
+    def load_data(self, pin: int) -> set:
+        unsaved = self._unsaved(pin)
+        ings = self.user_data.load_data(pin)
+        # 기록 중이던 변경이 그 사이 저장됐어도 다시 적용해도 결과는 같다
+        for edit in unsaved:
+            ings = edit.apply_to(ings)
+        return ings
+
+    @property
+    def data(self) -> dict:
+        with self.lock:
+            unsaved = [{pin: edit.copy() for pin, edit in edits.items()} for edits in (self.flushing, self.pending)]
+        data = self.user_data.data
+        for edits in unsaved:
+            for pin, edit in edits.items():
+                data[pin] = edit.apply_to(data.get(pin, set()))
+        return data
+
+    # ─── 기록 ──────────────────────────────────────────────────────────────────
+    def flush(self) -> int:
+        """지금까지 모인 변경을 기록하고, 기록한 사용자 수를 돌려준다."""
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return 0
+                self.flushing, self.pending = self.pending, {}
+                self.pending_ops = 0
+            batch = self.flushing
+            try:
+                self.user_data.apply_changes([edit.change(pin) for pin, edit in batch.items()])
+            except Exception as e:
+                # 실패한 변경 뒤에 그 사이 들어온 변경을 이어 붙여 다음에 다시 기록
+                with self.lock:
+                    for pin, edit in self.pending.items():
+                        batch[pin] = batch[pin].then(edit) if pin in batch else edit
+                    self.pending = batch
+                    self.pending_ops = sum(edit.ops for edit in batch.values())
+                    self.flushing = {}
+                self.last_error = e
+                raise
+            with self.lock:
+                self.flushing = {}
+            self.flushes += 1
+            self.last_error = None
+            return len(batch)
+
+    def _run(self):
+        retry_delay = None  # 마지막 기록이 실패했으면 다음 시도까지 기다릴 시간
+        while True:
+            with self.lock:
+                if retry_delay is not None:
+                    # 실패한 뒤에는 수정이 쌓여 깨워도 기다린 시간을 채운다 (닫을 때만 바로 나감)
+                    deadline = time.monotonic() + retry_delay
+                    while not self.closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.wakeup.wait(remaining)
+                elif not self.closed and self.pending_ops < self.max_pending:
+                    self.wakeup.wait(self.interval)
+                if self.closed:
+                    return
+            try:
+                self.flush()
+                retry_delay = None
+            except Exception:
+                # last_error에 남기고, 기다리는 시간을 늘려 가며 다시 시도
+                retry_delay = min(retry_delay * 2 if retry_delay else max(self.interval, 0.1), MAX_RETRY_DELAY)
+
+    def close(self) -> None:
+        """스레드를 멈추고 남은 변경을 기록한다. (여러 번 불러도 됨)"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.wakeup.notify()
+        self.thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"pending_users": len(self.pending), "pending_ops": self.pending_ops,
+                    "flushes": self.flushes, "last_error": repr(self.last_error) if self.last_error else None}
@@ -1,10 +1,13 @@
 # app.py
 
+from itertools import islice
+
 import streamlit as st
-from click import clear
 
-from CocktailTree import CocktailTree
-from UserData import UserData
+import Metrics
+from CatalogManager import get_shared_manager
+from Preload import Preload
+from ResultCache import ResultCache
 
 # ─── 세션 상태 초기화 ───────────────────────────────────────────────────────────
 if "logged_in" not in st.session_state:
@@ -13,10 +16,52 @@ if "logged_in" not in st.session_state:
     st.session_state.my_ingredients = set()
 
 # ─── 백엔드 객체 로드 ───────────────────────────────────────────────────────────
-tree = CocktailTree()
-tree.build_tree_from_json("cocktails.json")  # JSON 파일 이름을 cocktails.json 으로 사용
+# Streamlit은 클릭할 때마다 이 스크립트를 다시 실행하므로,
+# 트리와 사용자 데이터는 프로세스 전체에서 한 번만 만들어 모든 세션이 공유합니다.
+# 재료 추가/삭제는 다시 그리기 전에 기다리지 않도록 백그라운드 스레드가 모아서 기록합니다.
+def load_user_data(catalog):
+    # sqlite3 등을 불러오는 시간까지 백그라운드 스레드에서 (로그인 화면은 먼저 그림)
+    from UserData import UserData
+    from WriteBehind import WriteBehind
+
+    user_data = WriteBehind(UserData())
+    # 저장된 재료 표기는 카탈로그 재료가 인터닝된 뒤에야 대표 표기로 바뀌므로,
+    # 첫 트리가 준비된 다음에 사용자 데이터를 내준다 (login_page의 load_data가 트리보다 먼저 돌지 않게)
+    catalog.wait()
+    return user_data
+
+
+@st.cache_resource
+def get_user_loader(_catalog):
+    return Preload(lambda: load_user_data(_catalog), name="user-data-loader")
+
+
+# 같은 재료 조합의 조회 결과는 모든 세션이 함께 재사용합니다 (카탈로그가 바뀌면 비움)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(maxsize=4096, ttl=600)
+
+
+# JSON 파일 이름을 cocktails.json 으로 사용. 파일이 바뀌면 감시 스레드가 백그라운드에서
+# 새 트리를 만들어 바꿔 끼우므로, 다시 실행될 때 빌드를 기다리지 않습니다.
+# 첫 트리도 백그라운드에서 만들고(미리 컴파일된 cocktails.bin이 있으면 그것으로), 로그인 화면은 기다리지 않습니다.
+catalog = get_shared_manager("cocktails.json", wait=False)
+results = get_result_cache()
+catalog.add_reload_listener(results.invalidate)
+
+users = get_user_loader(catalog)
 
-userData = UserData()
+
+def get_fridge():
+    """
+    이 세션의 IncrementalFridge. 재료를 추가/삭제할 때 증분으로 갱신하므로
+    만들 수 있는 칵테일/추천을 볼 때마다 트리 전체를 다시 훑지 않습니다.
+    (카탈로그가 바뀌어 트리 버전이 달라지면 새로 엽니다)
+    """
+    fridge = st.session_state.get("fridge")
+    if fridge is None or fridge.version != tree.version:
+        fridge = st.session_state.fridge = tree.open_fridge(st.session_state.my_ingredients)
+    return fridge
 
 
 # ─── 로그인/회원가입 화면 ─────────────────────────────────────────────────────────
@@ -33,11 +78,13 @@ def login_page():
         if login_btn:
             try:
                 pin = int(pin_input)
+                userData = users.get()
                 if userData.isValid(pin):
                     # 로그인 성공 → 세션 상태 업데이트
                     st.session_state.logged_in = True
                     st.session_state.pin = pin
                     st.session_state.my_ingredients = userData.load_data(pin)
+                    st.session_state.fridge = None
                     st.success("로그인 성공! 메인 메뉴로 이동합니다.")
                     # 자동 rerun
                     st.rerun()
@@ -57,6 +104,7 @@ def login_page():
         if signup_btn:
             try:
                 pin2 = int(pin_signup)
+                userData = users.get()
                 if userData.isValid(pin2):
                     st.error("이미 사용 중인 PIN 번호입니다.")
                 else:
@@ -79,35 +127,59 @@ def main_menu():
             "3. 🍸 만들 수 있는 칵테일",
             "4. 🗄️ my 냉장고",
             "5. 😎 cocktail expert가 추천하는 재료",
-            "6. 로그아웃"
+            "6. 🔎 내 재료와 비슷한 칵테일",
+            "7. 로그아웃"
         ),
     )
 
+    # 카탈로그 상태 (마지막 빌드 시간, 다시 불러온 횟수, 읽기 실패)
+    stats = catalog.stats()
+    st.sidebar.caption(
+        f"카탈로그 빌드 {stats['last_build_ms']} ms (불러오기 {stats['reload_count']}회, 델타 {stats['delta_count']}개)"
+        + (f" · 마지막 오류 {stats['last_error']}" if stats["last_error"] else "")
+    )
+    cache_stats = results.stats()
+    st.sidebar.caption(
+        f"조회 결과 캐시 {cache_stats['size']}개 · 적중 {cache_stats['hits']} / 실패 {cache_stats['misses']}"
+    )
+    write_stats = userData.stats()
+    st.sidebar.caption(
+        f"저장 대기 {write_stats['pending_users']}명 · 기록 {write_stats['flushes']}회"
+        + (f" · 마지막 오류 {write_stats['last_error']}" if write_stats["last_error"] else "")
+    )
+
     # ───────────────────────────────────────────────────────────────────────────────
     # 1. 트리 전체 구조 보기
     if menu == "1. 🍹 전체 칵테일 보기":
-        # 1) 트리 구조를 문자열 리스트에 모아서
-        lines = []
-
-        def dfs(node, prefix=""):
-            for i, child in enumerate(node.children):
-                connector = "└── " if i == len(node.children) - 1 else "├── "
-                lines.append(f"{prefix}{connector}{child.name}")
-                new_prefix = prefix + ("    " if i == len(node.children) - 1 else "│   ")
-                dfs(child, new_prefix)
-
-        # 루트(Empty Glass)부터 DFS로 줄 단위 문자열 생성
-        lines.insert(0, "Empty Glass")
-        dfs(tree.root)
-
-        # 2) 줄 단위 리스트를 단일 문자열로 결합
-        tree_str = "\n".join(lines)
-
-        # 3) st.code()를 사용해 “코드 블록”으로 출력
         st.header("📋 칵테일 트리 전체 구조")
         st.write("")  # 줄 바꿈
         st.write("")  # 줄 바꿈
-        st.code(tree_str, language="")  # language="" 로 하면 언어 하이라이트 없이 고정폭 폰트로 보여줌
+
+        # 1) 볼 범위(전체 / 기본술 하나)와 펼칠 깊이, 한 페이지 줄 수 선택
+        spirits = tree.root.children
+        scope = st.selectbox("보기 범위", ["전체"] + [s.name for s in spirits])
+        col1, col2 = st.columns(2)
+        depth = col1.select_slider("펼칠 깊이", options=[1, 2, 3, 4, 5, 6, "전체"], value="전체")
+        page_size = col2.selectbox("한 페이지 줄 수", [100, 300, 1000], index=1)
+        page = st.number_input("페이지", min_value=1, value=1, step=1)
+
+        # 2) 트리 전체를 문자열로 만들지 않고, 제너레이터에서 이번 페이지 줄만 꺼냅니다
+        #    (다음 페이지가 있는지 보려고 한 줄 더 꺼냄)
+        start_node = tree.root if scope == "전체" else spirits[[s.name for s in spirits].index(scope)]
+        max_depth = None if depth == "전체" else depth
+        lines = list(islice(tree.iter_tree_lines(start_node, max_depth),
+                            (page - 1) * page_size, page * page_size + 1))
+        has_next = len(lines) > page_size
+        lines = lines[:page_size]
+        if page == 1 and start_node is tree.root:
+            lines.insert(0, tree.root.name)
+
+        # 3) st.code()를 사용해 “코드 블록”으로 출력
+        if lines:
+            st.code("\n".join(lines), language="")  # language="" 로 하면 언어 하이라이트 없이 고정폭 폰트로 보여줌
+        else:
+            st.write("이 페이지에는 내용이 없습니다.")
+        st.caption(f"{page} 페이지 · " + ("다음 페이지가 있습니다." if has_next else "마지막 페이지입니다."))
 
     # ───────────────────────────────────────────────────────────────────────────────
     # 2. 칵테일 정보 조회
@@ -116,10 +188,18 @@ def main_menu():
         st.write("")  # 줄 바꿈
         st.write("")  # 줄 바꿈
         name = st.text_input("조회할 칵테일 이름을 입력하세요")
+        if name.strip():
+            # 입력한 글자로 시작하는 칵테일 이름 자동완성
+            suggestions = tree.search_by_prefix(name.strip())
+            if suggestions:
+                st.caption("추천 이름: " + ", ".join(n.name for n in suggestions))
         if st.button("검색"):
             node = tree.find_node_by_name(name.strip())
             if not node:
                 st.error("해당 칵테일을 찾을 수 없습니다.")
+                similar = tree.search_fuzzy(name.strip())
+                if similar:
+                    st.write("혹시 이 칵테일을 찾으셨나요? " + ", ".join(n.name for n in similar))
             else:
                 st.subheader(f"🍸 '{node.name}'에 필요한 전체 재료")
                 for ing in node.get_full_ingredients():
@@ -150,7 +230,7 @@ def main_menu():
         st.write("")  # 줄 바꿈
         st.write("")  # 줄 바꿈
         if st.session_state.my_ingredients:
-            possible = tree.find_possible_cocktails(st.session_state.my_ingredients)
+            possible = get_fridge().find_possible_cocktails()
             if possible:
                 for c in possible:
                     st.write("-", c)
@@ -198,10 +278,11 @@ def main_menu():
             add_btn = st.form_submit_button("추가하기")
 
             if add_btn:
-                item = new_ing.strip()
+                item = tree.registry.canonical(new_ing)  # "gin " → "Gin", "kahlua" → "Coffee Liqueur"
                 if item:
                     st.session_state.my_ingredients.add(item)
-                    userData.save_data(st.session_state.pin, st.session_state.my_ingredients)
+                    get_fridge().add(item)
+                    userData.add_ingredient(st.session_state.pin, item)
                     st.success(f"'{item}' 재료가 추가되었습니다.")
                     # “다음에 렌더링할 때 입력칸 비우기” 플래그 설정
                     st.session_state["add_submitted"] = True
@@ -222,10 +303,13 @@ def main_menu():
             del_btn = st.form_submit_button("삭제하기")
 
             if del_btn:
-                item = del_ing.strip()
-                if item:
+                item = tree.registry.canonical(del_ing)
+                if item and item not in st.session_state.my_ingredients:
+                    st.error(f"'{item}' 재료는 냉장고에 없습니다.")
+                elif item:
                     st.session_state.my_ingredients.remove(item)
-                    userData.save_data(st.session_state.pin, st.session_state.my_ingredients)
+                    get_fridge().remove(item)
+                    userData.remove_ingredient(st.session_state.pin, item)
                     st.success(f"'{item}' 재료가 삭제되었습니다.")
                     st.session_state["del_submitted"] = True
                     st.rerun()
@@ -242,28 +326,106 @@ def main_menu():
         st.write("")  # 줄 바꿈
 
         if st.session_state.my_ingredients:
-            recs = tree.recommend_with_one_missing(st.session_state.my_ingredients)
+            # 새로 만들 수 있는 칵테일이 많은 재료부터 보여줍니다.
+            recs = get_fridge().recommend_purchases()
             if recs:
-                for missing, cock_list in recs.items():
-                    st.write(f"- **'{missing}'** 만 추가하면: {', '.join(cock_list)}")
+                for missing, count, cock_list in recs:
+                    st.write(f"- **'{missing}'** 만 추가하면 ({count}개): {', '.join(cock_list)}")
             else:
                 st.write("현재 가진 재료에 하나만 추가해도 만들 수 있는 칵테일이 없습니다.")
+
+            st.markdown("---")
+            st.subheader("🛒 재료를 몇 개 더 사면?")
+            k = st.slider("추가로 살 재료 개수", min_value=1, max_value=5, value=2)
+            by_count = results.get_or_compute("k_missing", tree, st.session_state.my_ingredients,
+                                              tree.recommend_with_k_missing, k)
+            if by_count:
+                for count, items in by_count.items():
+                    with st.expander(f"{count}개 부족한 칵테일 ({len(items)}개)"):
+                        for cocktail, missing in items:
+                            st.write(f"- {cocktail}: {', '.join(missing)}")
+            else:
+                st.write(f"재료 {k}개 이내로 만들 수 있는 칵테일이 없습니다.")
+
+            # 재료 k개를 함께 샀을 때 새로 열리는 칵테일이 가장 많은 조합
+            plan = results.get_or_compute("shopping_plan", tree, st.session_state.my_ingredients,
+                                          tree.plan_shopping, k)
+            if plan.unlocked:
+                st.markdown(f"**🧾 {k}개까지 산다면:** {', '.join(plan.ingredients)} "
+                            f"→ 새로 {len(plan.unlocked)}개 ({'최적' if plan.optimal else '근사'})")
+                st.caption(", ".join(plan.unlocked))
+        else:
+            st.write("먼저 재료를 추가한 뒤, 추천 기능을 이용하세요.")
+
+    # ───────────────────────────────────────────────────────────────────────────────
+    # 6. 비슷한 칵테일 보기
+    elif menu == "6. 🔎 내 재료와 비슷한 칵테일":
+        st.header("🔎 내 재료와 가장 비슷한 칵테일")
+        if st.session_state.my_ingredients:
+            metric_label = st.radio("유사도", ("겹치는 재료 비율 (Jaccard)", "희귀한 재료에 가중치 (IDF)"),
+                                    horizontal=True)
+            metric = "jaccard" if metric_label.startswith("겹치는") else "idf"
+            top_k = st.slider("보여줄 칵테일 수", min_value=5, max_value=50, value=10, step=5)
+            similar = results.get_or_compute("similar", tree, st.session_state.my_ingredients,
+                                             tree.find_similar_cocktails, top_k, metric)
+            if similar:
+                st.dataframe(
+                    [{"칵테일": name, "유사도": round(score, 3),
+                      "부족한 재료": ", ".join(missing) if missing else "✅ 바로 만들 수 있음"}
+                     for name, score, missing in similar],
+                    hide_index=True,
+                )
+            else:
+                st.write("가진 재료가 들어가는 칵테일이 없습니다.")
         else:
             st.write("먼저 재료를 추가한 뒤, 추천 기능을 이용하세요.")
 
     # ───────────────────────────────────────────────────────────────────────────────
-    # 6. 로그아웃
-    elif menu == "6. 로그아웃":
+    # 7. 로그아웃
+    elif menu == "7. 로그아웃":
         st.session_state.logged_in = False
         st.session_state.pin = None
         st.session_state.my_ingredients = set()
+        st.session_state.fridge = None
         st.success("로그아웃되었습니다.")
         # 로그아웃 후 바로 rerun
         st.rerun()
 
 
+# ─── 성능 지표 (사이드바) ─────────────────────────────────────────────────────────
+def show_metrics():
+    with st.sidebar.expander("📈 성능 지표"):
+        rows = []
+        for h in Metrics.registry.snapshot()["histograms"]:
+            label = h.get("query") or h.get("op") or h.get("source") or ""
+            if h["name"].endswith("_seconds"):
+                rows.append({"항목": f"{h['name'][:-8]} {label}".strip(), "호출": h["count"],
+                             "평균(ms)": round(h["mean"] * 1000, 3), "p99(ms) ≤": h["p99"] * 1000})
+            else:
+                rows.append({"항목": f"{h['name']} {label}".strip(), "호출": h["count"],
+                             "평균(ms)": None, "p99(ms) ≤": None, "평균 방문 노드": round(h["mean"], 1)})
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.write("아직 기록된 지표가 없습니다.")
+
+
 # ─── 앱 실행 ───────────────────────────────────────────────────────────────────
+# 로그인 화면은 트리가 필요 없으므로 카탈로그/사용자 데이터를 불러오는 동안 먼저 그립니다.
+# 로그인한 뒤에는 이번 실행 동안 같은 트리를 보고, 그 사이 델타가 트리를 고치지 않도록 읽기 잠금을 잡습니다
 if not st.session_state.logged_in:
     login_page()
 else:
-    main_menu()
+    if catalog.tree is None:
+        with st.spinner("칵테일 카탈로그를 불러오는 중..."):
+            catalog.wait()
+    userData = users.get()
+    with catalog.read() as tree:
+        # 체크하면 이번 실행(요청) 하나만 cProfile로 감싸서 결과를 보여줍니다
+        want_profile = st.sidebar.checkbox("🔬 이번 요청 프로파일링")
+        with Metrics.profile(want_profile) as prof:
+            main_menu()
+        if want_profile:
+            with st.expander("🔬 프로파일 결과 (누적 시간 순)"):
+                st.code(prof.text, language="")
+        show_metrics()
@@ -0,0 +1,74 @@
+# benchmarks/bench_compact.py
+#
+# 사용법: python benchmarks/bench_compact.py [--sizes 10000 100000 300000] [--queries 10]
+# CocktailNode 객체 트리(CocktailTree)와 평행 배열 트리(CompactCocktailTree)의
+# 메모리 사용량(tracemalloc)과 조회 지연 시간을 비교한다.
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CocktailTree import CocktailTree
+from CompactTree import CompactCocktailTree
+from synthetic import generate_catalog, generate_fridges
+
+
+def build_object_tree(catalog):
+    tree = CocktailTree()
+    tree.build_tree_from_dict(catalog)
+    # 노드 자체의 메모리만 비교하기 위해 매칭 엔진/이름 색인은 뺀다.
+    tree._matcher = tree._name_index = None
+    return tree
+
+
+def measure_build(build, catalog):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = build(catalog)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, elapsed, current
+
+
+def time_queries(fn, args):
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--fridge-size", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>9} {'tree':>8} {'build(s)':>9} {'MiB':>8} {'B/node':>7} "
+          f"{'possible(ms)':>12} {'one_missing(ms)':>15} {'lookup(ms)':>10}")
+    for size in args.sizes:
+        catalog = generate_catalog(size)
+        fridges = generate_fridges(catalog, args.queries, args.fridge_size)
+        names = [f"cocktail {i * 7919 % size}" for i in range(args.queries)]
+
+        for label, build in (("object", build_object_tree), ("compact", CompactCocktailTree.from_dict)):
+            tree, build_s, mem = measure_build(build, catalog)
+            tree.find_node_by_name(names[0])  # 이름 색인 준비 (양쪽 모두 첫 조회에서 만든다)
+            possible_ms = time_queries(tree.find_possible_cocktails, fridges)
+            missing_ms = time_queries(tree.recommend_with_one_missing, fridges)
+            lookup_ms = time_queries(tree.find_node_by_name, names)
+            print(f"{size:>9} {label:>8} {build_s:>9.2f} {mem / 2 ** 20:>8.1f} {mem / size:>7.0f} "
+                  f"{possible_ms:>12.2f} {missing_ms:>15.2f} {lookup_ms:>10.4f}")
+            del tree
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_dag.py
+#
+# 사용법: python benchmarks/bench_dag.py [--recipes 2000] [--extra 3] [--spirits 8] [--vocab 200]
+# 칵테일마다 기본술 뒤에 재료 extra개를 넣는 순서를 모두(순열) 경로로 적은 카탈로그를 만들고,
+# 트리 DFS(find_possible_cocktails / recommend_with_one_missing)와
+# RecipeDAG(같은 누적 재료 집합을 한 상태로 합친 것)의 조회 시간을 비교한다.
+# DAG는 트리가 바뀌면 처음부터 다시 만들므로, use_dag=True일 때 처음 조회 / 노드 하나를 붙인 직후
+# 첫 조회에 드는 시간(DAG 생성 포함)도 가지치기 트리 순회와 나란히 보여 준다.
+
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import permutations
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CocktailNode import CocktailNode
+from CocktailTree import CocktailTree
+
+
+def generate_orders_catalog(num_recipes: int, extra: int, num_spirits: int, vocab_size: int, seed: int) -> dict:
+    """재료 넣는 순서만 다른 경로가 전부 들어 있는 합성 카탈로그 (cocktails.json 형식)."""
+    rng = random.Random(seed)
+    vocab = [f"Ingredient {i}" for i in range(vocab_size)]
+    root = {"name": "Empty Glass", "ingredients": [], "children": []}
+    spirits = []
+    for s in range(num_spirits):
+        spirit = {"name": f"Spirit {s}", "ingredients": [], "children": []}
+        root["children"].append(spirit)
+        spirits.append(spirit)
+
+    for r in range(num_recipes):
+        spirit = spirits[rng.randrange(num_spirits)]
+        for order in permutations(rng.sample(vocab, extra)):
+            parent = spirit
+            for depth, ing in enumerate(order, 1):
+                child = next((c for c in parent["children"] if c["ingredients"] == [ing]), None)
+                if child is None:
+                    name = f"cocktail {r}" if depth == extra else f"{parent['name']} + {ing}"
+                    child = {"name": name, "ingredients": [ing], "children": []}
+                    parent["children"].append(child)
+                parent = child
+    return root
+
+
+def bench(fn, fridges, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for my in fridges:
+            fn(my)
+        best = min(best, (time.perf_counter() - start) / len(fridges))
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--extra", type=int, default=3)
+    parser.add_argument("--spirits", type=int, default=8)
+    parser.add_argument("--vocab", type=int, default=200)
+    parser.add_argument("--fridge-size", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tree = CocktailTree()
+    tree.build_tree_from_dict(generate_orders_catalog(args.recipes, args.extra, args.spirits,
+                                                      args.vocab, args.seed))
+    start = time.perf_counter()
+    dag = tree.get_dag()
+    print(f"DAG 생성 {(time.perf_counter() - start) * 1000:.1f} ms  {dag.stats()}")
+
+    rng = random.Random(args.seed + 1)
+    vocab = tree.get_matcher().ingredient_names
+    fridges = [set(rng.sample(vocab, min(args.fridge_size, len(vocab)))) for _ in range(args.queries)]
+    for my in fridges:
+        assert dag.find_possible_cocktails(my) == tree.find_possible_cocktails(my)
+        assert dag.recommend_with_one_missing(my) == tree.recommend_with_one_missing(my)
+
+    for label, tree_fn, dag_fn in (
+            ("find_possible_cocktails", tree.find_possible_cocktails, dag.find_possible_cocktails),
+            ("recommend_with_one_missing", tree.recommend_with_one_missing, dag.recommend_with_one_missing)):
+        tree_ms = bench(tree_fn, fridges, args.repeat)
+        dag_ms = bench(dag_fn, fridges, args.repeat)
+        print(f"{label:28s} 트리 {tree_ms:8.3f} ms   DAG {dag_ms:8.3f} ms   ({tree_ms / dag_ms:.1f}배)")
+
+    # use_dag=True의 콜드 / 트리를 고친 직후 첫 조회 (DAG를 다시 만드는 시간 포함)
+    my = fridges[0]
+    walk_ms = bench(tree.find_possible_cocktails, [my], args.repeat)
+    tree.use_dag = True
+    tree._dag = None
+    cold_ms = bench(tree.find_possible_cocktails, [my], 1)
+    spirit = tree.root.children[0]
+    extra = CocktailNode(name="bench extra", ingredients=[vocab[0]])
+    spirit.add_child(extra)
+    mutated_ms = bench(tree.find_possible_cocktails, [my], 1)
+    warm_ms = bench(tree.find_possible_cocktails, [my], args.repeat)
+    spirit.remove_child(extra)
+    tree.use_dag = False
+    print(f"find_possible_cocktails 트리 {walk_ms:8.3f} ms   use_dag 콜드 {cold_ms:8.1f} ms   "
+          f"노드 추가 직후 {mutated_ms:8.1f} ms   그다음 {warm_ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_delta.py
+#
+# 사용법: python benchmarks/bench_delta.py [--size 100000] [--rounds 3]
+# 델타(add_recipe / move_recipe / remove_recipe) 하나에 드는 시간과, 그 직후 첫 조회에 드는 시간을
+# 트리를 바꾸기 전(이미 만들어 둔 색인으로 조회할 때)과 나란히 보여 준다.
+# 매처와 이름 색인은 델타가 그 자리에서 고치지만, 다음 것들은 트리 버전이 바뀌면 다음에 쓸 때 처음부터 다시 만든다:
+#   - IncrementalFridge (open_fridge: app.py / main.py가 로그인한 사용자마다 들고 있는 냉장고)
+#   - 매처의 IDF 가중치 / 재료 개수별 비트셋 (find_similar_cocktails)
+#   - RecipeDAG (use_dag=True일 때만 조회에 쓰인다)
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CocktailTree import CocktailTree
+from synthetic import generate_catalog, generate_fridges
+
+QUERIES = (
+    ("find_possible_cocktails", lambda tree, my: tree.find_possible_cocktails(my)),
+    ("recommend_with_one_missing", lambda tree, my: tree.recommend_with_one_missing(my)),
+    ("open_fridge", lambda tree, my: tree.open_fridge(my)),
+    ("find_similar(jaccard)", lambda tree, my: tree.find_similar_cocktails(my, metric="jaccard")),
+    ("find_similar(idf)", lambda tree, my: tree.find_similar_cocktails(my, metric="idf")),
+    ("get_dag().find_possible", lambda tree, my: tree.get_dag().find_possible_cocktails(my)),
+)
+
+
+def elapsed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--fridge-size", type=int, default=60)
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.size)
+    my = generate_fridges(catalog, 1, args.fridge_size)[0]
+    tree = CocktailTree()
+    tree.build_tree_from_dict(catalog)
+    spirits = [spirit.name for spirit in tree.root.children]
+
+    # 트리를 바꾸기 전: 모든 색인을 한 번 만들어 둔 뒤 잰 조회 시간
+    for _, query in QUERIES:
+        query(tree, my)
+    warm = {label: elapsed_ms(lambda: query(tree, my)) for label, query in QUERIES}
+
+    # 라운드마다 델타 하나 → 조회마다 델타 직후 첫 호출 시간 (조회 하나를 잴 때마다 델타를 새로 적용)
+    delta_ms = {"add": [], "move": [], "remove": []}
+    after = {label: [] for label, _ in QUERIES}
+    for r in range(args.rounds):
+        for label, query in QUERIES:
+            name = f"delta recipe {r} {label}"
+            recipe = {"name": name, "ingredients": ["Ingredient 1"],
+                      "children": [{"name": name + " child", "ingredients": ["Ingredient 2"]}]}
+            delta_ms["add"].append(elapsed_ms(lambda: tree.add_recipe(spirits[0], recipe)))
+            delta_ms["move"].append(elapsed_ms(lambda: tree.move_recipe(name, spirits[-1])))
+            after[label].append(elapsed_ms(lambda: query(tree, my)))
+            delta_ms["remove"].append(elapsed_ms(lambda: tree.remove_recipe(name)))
+            query(tree, my)  # 다음 조회를 위해 다시 따뜻하게
+
+    print(f"레시피 {args.size}개, 라운드 {args.rounds}번 (중앙값 ms)")
+    for op, runs in delta_ms.items():
+        print(f"  델타 {op:6s} {statistics.median(runs):10.2f}")
+    print(f"  {'조회':28s} {'바꾸기 전':>10s} {'델타 직후 첫 호출':>16s}")
+    for label, _ in QUERIES:
+        print(f"  {label:28s} {warm[label]:10.2f} {statistics.median(after[label]):16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_lazy.py
+#
+# 사용법: python benchmarks/bench_lazy.py [--sizes 10000 100000 300000] [--spirits 8]
+# build_tree_from_json(전부 만들기)과 build_tree_lazy(기본술 서브트리를 필요할 때만 읽기)의
+# 시작 시간 / 메모리(tracemalloc)와, 첫 이름 조회까지 걸린 시간·메모리를 비교한다.
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CocktailTree import CocktailTree
+from LazyCatalog import load_offset_index
+from synthetic import generate_catalog
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+
+def build_eager(path):
+    tree = CocktailTree()
+    tree.build_tree_from_json(path)
+    return tree
+
+
+def build_lazy(path):
+    tree = CocktailTree()
+    tree.build_tree_lazy(path)
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--spirits", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>9} {'mode':>6} {'start(ms)':>10} {'MiB':>7} {'+lookup(ms)':>12} {'MiB':>7} {'loaded':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"catalog_{size}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(generate_catalog(size, num_spirits=args.spirits), f, indent=4)
+            _, index_s, _ = measure(lambda: load_offset_index(path))  # 사이드카 색인은 한 번만 만든다
+            name = f"cocktail {size // 2}"
+
+            for mode, build in (("eager", build_eager), ("lazy", build_lazy)):
+                tree, start_s, start_mem = measure(lambda: build(path))
+                node, lookup_s, _ = measure(lambda: tree.find_node_by_name(name))
+                assert node is not None
+                gc.collect()
+                tracemalloc.start()
+                tree2 = build(path)
+                tree2.find_node_by_name(name)
+                total_mem, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                loaded = (sum(child.loaded for child in tree.root.children) if mode == "lazy"
+                          else len(tree.root.children))
+                print(f"{size:>9} {mode:>6} {start_s * 1000:>10.1f} {start_mem / 2 ** 20:>7.1f} "
+                      f"{lookup_s * 1000:>12.1f} {total_mem / 2 ** 20:>7.1f} "
+                      f"{loaded:>3}/{len(tree.root.children):<3}")
+                del tree, tree2
+            print(f"{'':>9} (sidecar index build: {index_s * 1000:.0f} ms, one-time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_matcher.py
+#
+# 사용법: python benchmarks/bench_matcher.py [--sizes 10000 100000 1000000] [--queries 20]
+# 기존 DFS(CocktailTree.find_possible_cocktails)와 비트셋 매칭 엔진(CocktailMatcher)을 비교한다.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CocktailTree import CocktailTree
+from synthetic import generate_catalog, generate_fridges
+
+
+def time_queries(fn, fridges):
+    start = time.perf_counter()
+    for fridge in fridges:
+        fn(fridge)
+    return (time.perf_counter() - start) / len(fridges)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--fridge-size", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>10} {'build(s)':>9} {'compile(s)':>10} {'dfs(ms)':>9} {'bitset(ms)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        catalog = generate_catalog(size)
+        fridges = generate_fridges(catalog, args.queries, args.fridge_size)
+
+        tree = CocktailTree()
+        start = time.perf_counter()
+        tree.build_tree_from_dict(catalog)
+        build_s = time.perf_counter() - start
+
+        # build_tree_from_dict 안에서 매칭 엔진도 컴파일되므로, 컴파일 시간만 따로 잰다.
+        tree._matcher = None
+        start = time.perf_counter()
+        matcher = tree.get_matcher()
+        compile_s = time.perf_counter() - start
+
+        for fridge in fridges:
+            assert matcher.find_possible_cocktails(fridge) == tree.find_possible_cocktails(fridge)
+
+        dfs_ms = time_queries(tree.find_possible_cocktails, fridges) * 1000
+        bit_ms = time_queries(matcher.find_possible_cocktails, fridges) * 1000
+        print(f"{size:>10} {build_s:>9.2f} {compile_s:>10.2f} {dfs_ms:>9.2f} {bit_ms:>10.2f} {dfs_ms / bit_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_sharded.py
+#
+# 사용법: python benchmarks/bench_sharded.py [--size 300000] [--spirits 16] [--max-processes N]
+# 합성 카탈로그를 바이너리로 컴파일한 뒤, 단일 프로세스 스캔과
+# ShardedEvaluator(프로세스 1..N개)의 조회 지연 시간을 비교한다.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BinaryCatalog import MappedCatalog, compile_catalog
+from CompactTree import MappedCompactTree
+from ShardedEvaluator import ShardedEvaluator
+from synthetic import generate_catalog, generate_fridges
+
+
+def time_queries(fn, fridges):
+    start = time.perf_counter()
+    for fridge in fridges:
+        fn(fridge)
+    return (time.perf_counter() - start) / len(fridges) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=300_000)
+    parser.add_argument("--spirits", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--fridge-size", type=int, default=120)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.size, num_spirits=args.spirits)
+    fridges = generate_fridges(catalog, args.queries, args.fridge_size)
+    bin_path = os.path.join(tempfile.mkdtemp(), "catalog.bin")
+    compile_catalog(catalog, bin_path)
+    del catalog
+
+    single = MappedCompactTree(MappedCatalog(bin_path))
+    evaluate = lambda fridge: (single.find_possible_cocktails(fridge), single.recommend_with_one_missing(fridge))
+    base_ms = time_queries(evaluate, fridges)
+    print(f"cpu={os.cpu_count()} recipes={args.size} spirits={args.spirits}")
+    print(f"{'processes':>9} {'query(ms)':>10} {'speedup':>8}")
+    print(f"{'inline':>9} {base_ms:>10.1f} {1.0:>7.2f}x")
+
+    for processes in range(1, args.max_processes + 1):
+        with ShardedEvaluator(bin_path, processes) as sharded:
+            expected = [evaluate(f) for f in fridges]
+            assert [sharded.evaluate(f) for f in fridges] == expected
+            ms = time_queries(sharded.evaluate, fridges)
+        print(f"{processes:>9} {ms:>10.1f} {base_ms / ms:>7.2f}x")
+    single.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/bench_startup.py
+#
+# 사용법: python benchmarks/bench_startup.py [--repeat 5] [--top 15] [--synthetic 0]
+#                                            [--budget-ms 150] [--output startup.json]
+# 시작 시간 보고서. 매번 새 파이썬 프로세스에서
+#  1) main.py / app.py의 최상위 import만 `-X importtime`으로 실행해 진입점별 import 시간과
+#     오래 걸린 모듈(누적 시간 순)을 보여주고,
+#  2) 로그인 화면을 띄울 수 있을 때까지 / 카탈로그 트리가 준비될 때까지 / 사용자 저장소가 열릴 때까지의
+#     시간을 JSON에서 만들 때와 미리 컴파일된 스냅숏(cocktails.bin)에서 만들 때로 나눠 잰다.
+# 설치되지 않은 모듈(예: streamlit)은 건너뛰고 표시한다. --budget-ms를 주면 진입점 import 시간이
+# 그보다 길 때 종료 코드 1로 끝난다 (시작 시간이 다시 느려지지 않게 CI 등에서 확인하는 용도).
+
+import argparse
+import ast
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ("main.py", "app.py")
+MARKER = "--- startup import begin ---"
+
+# 새 프로세스에서 실행하는 시작 과정 (main.py / app.py가 로그인 화면 전에 하는 일과 같음)
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from CatalogManager import CatalogManager
+from Preload import Preload
+
+def load_user_data():
+    from UserData import UserData
+    from WriteBehind import WriteBehind
+    user_data = WriteBehind(UserData({db!r}, {legacy!r}))
+    catalog.wait()
+    return user_data, time.perf_counter() - start
+
+catalog = CatalogManager({catalog!r}, wait=False, snapshot={snapshot!r})
+users = Preload(load_user_data)
+login = time.perf_counter() - start
+catalog.wait()
+tree_ready = time.perf_counter() - start
+user_data, users_ready = users.get()
+user_data.close()
+print({{"login": login, "catalog": tree_ready, "users": users_ready, "source": catalog.last_source}})
+"""
+
+
+def top_level_imports(path: str) -> list:
+    """파일의 최상위 import 문(함수 안, if __name__ == ... 안은 제외)을 소스 그대로."""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    return [ast.get_source_segment(source, node) for node in ast.parse(source).body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_script(statements: list) -> str:
+    """import 문을 하나씩 실행하고, 설치되지 않은 모듈은 건너뛰어 이름을 출력하는 코드."""
+    lines = ["import sys", f"sys.path.insert(0, {ROOT!r})", f"sys.stderr.write({MARKER!r} + '\\n')"]
+    for stmt in statements:
+        lines += ["try:", f"    {stmt}", "except ImportError as e:", "    print(e.name)"]
+    return "\n".join(lines)
+
+
+def parse_importtime(stderr: str) -> list:
+    """`-X importtime` 출력 중 MARKER 뒤의 줄 → [(모듈, 자기 시간 µs, 누적 µs, 깊이), ...]"""
+    rows = []
+    started = False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # 머리글 줄
+        name = parts[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def measure_imports(entry: str, repeat: int):
+    """(import 시간 중앙값 ms, 중앙값에 가장 가까운 실행의 모듈별 행, 건너뛴 모듈)"""
+    code = import_script(top_level_imports(os.path.join(ROOT, entry)))
+    runs = []
+    for i in range(repeat + 1):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        rows = parse_importtime(proc.stderr)
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+        if i:  # 첫 실행은 .pyc를 만드는 준비 실행
+            runs.append((total, rows))
+        missing = proc.stdout.split()
+    median = statistics.median(total for total, _ in runs)
+    _, rows = min(runs, key=lambda run: abs(run[0] - median))
+    return round(median, 2), rows, missing
+
+
+def measure_startup(catalog: str, snapshot: bool, repeat: int, workdir: str) -> dict:
+    """STARTUP_SCRIPT를 repeat번 실행한 단계별 시간 중앙값 (ms). 첫 실행은 준비 실행으로 버린다."""
+    results = []
+    for i in range(repeat + 1):
+        db = os.path.join(workdir, f"users{i}.db")
+        code = STARTUP_SCRIPT.format(root=ROOT, db=db, legacy=os.path.join(workdir, "none.pickle"),
+                                     catalog=catalog, snapshot=snapshot)
+        proc = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True, check=True)
+        if i:
+            results.append(ast.literal_eval(proc.stdout.strip().splitlines()[-1]))
+    summary = {key: round(statistics.median(r[key] for r in results) * 1000, 2)
+               for key in ("login", "catalog", "users")}
+    summary["source"] = results[-1]["source"]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="진입점마다 보여줄 모듈 수")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="0이 아니면 cocktails.json 대신 이 크기의 합성 카탈로그로 잰다")
+    parser.add_argument("--budget-ms", type=float, default=None, help="진입점 import 시간 상한")
+    parser.add_argument("--output", default=None, help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "imports": {}, "startup": {}}
+    over_budget = []
+    for entry in ENTRY_POINTS:
+        total, rows, missing = measure_imports(entry, args.repeat)
+        report["imports"][entry] = {"total_ms": total, "missing": missing,
+                                    "modules": [{"module": name, "self_ms": self_us / 1000,
+                                                 "cumulative_ms": cumulative_us / 1000}
+                                                for name, self_us, cumulative_us, _ in rows]}
+        print(f"\n{entry}: import {total:.1f} ms" + (f"  (설치되지 않아 건너뜀: {', '.join(missing)})" if missing else ""))
+        for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:args.top]:
+            print(f"  {cumulative_us / 1000:8.2f} ms 누적 {self_us / 1000:8.2f} ms 자기  {'  ' * depth}{name}")
+        if args.budget_ms is not None and total > args.budget_ms:
+            over_budget.append(entry)
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        catalog = os.path.join(workdir, "cocktails.json")
+        if args.synthetic:
+            sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+            from synthetic import generate_catalog
+            with open(catalog, "w", encoding="utf-8") as f:
+                json.dump(generate_catalog(args.synthetic), f)
+        else:
+            shutil.copy(os.path.join(ROOT, "cocktails.json"), catalog)
+
+        print(f"\n시작 단계별 시간 (ms, 중앙값)  카탈로그: {'합성 ' + str(args.synthetic) if args.synthetic else 'cocktails.json'}")
+        # 스냅숏 쪽은 첫 준비 실행이 JSON에서 빌드하면서 스냅숏(cocktails.bin)을 만들어 둔다
+        for label, snapshot in (("JSON", False), ("스냅숏", True)):
+            summary = measure_startup(catalog, snapshot, args.repeat, workdir)
+            report["startup"][label] = summary
+            print(f"  {label:4s} 로그인 화면 {summary['login']:8.2f}   트리 준비 {summary['catalog']:8.2f} "
+                  f"({summary['source']})   사용자 저장소 {summary['users']:8.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if over_budget:
+        print(f"\n⚠️ import 시간이 {args.budget_ms} ms를 넘었습니다: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
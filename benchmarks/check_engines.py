@@ -0,0 +1,94 @@
+# benchmarks/check_engines.py
+#
+# 사용법: python benchmarks/check_engines.py [--catalog cocktails.json] [--fridges 200] [--sharded]
+# 같은 카탈로그와 같은 냉장고에 대해 CocktailTree와 평행 배열 엔진들
+# (CompactCocktailTree.from_dict / from_binary, MappedCompactTree, --sharded면 ShardedEvaluator)이
+# 같은 결과(만들 수 있는 칵테일, 하나 부족한 칵테일)를 내는지 확인한다.
+# 냉장고 재료는 대소문자/공백을 섞은 표기("dry  vermouth ")로도 넣어 재료 정규화까지 함께 확인한다.
+# 결과가 다른 냉장고가 있으면 처음 몇 개를 보여 주고 종료 코드 1로 끝난다.
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BinaryCatalog import MappedCatalog, compile_catalog
+from CocktailTree import CocktailTree
+from CompactTree import CompactCocktailTree, MappedCompactTree
+from synthetic import catalog_vocab, generate_fridges
+
+
+def respell(name: str, rng: random.Random) -> str:
+    """같은 재료의 다른 표기: 대소문자를 바꾸고 앞뒤/단어 사이에 공백을 더한다."""
+    name = rng.choice((str.lower, str.upper, str.title, str))(name)
+    if rng.random() < 0.5:
+        name = "  ".join(name.split())
+    return name + " " * rng.randint(0, 2)
+
+
+def answer(engine, fridge: set):
+    """순서와 상관없이 비교할 수 있는 (만들 수 있는 칵테일, { 부족재료: 칵테일들 })."""
+    missing = engine.recommend_with_one_missing(fridge)
+    return (sorted(engine.find_possible_cocktails(fridge)),
+            {ing: sorted(names) for ing, names in missing.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--catalog", default="cocktails.json")
+    parser.add_argument("--fridges", type=int, default=200)
+    parser.add_argument("--fridge-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sharded", action="store_true", help="ShardedEvaluator(프로세스 2개)도 비교한다")
+    args = parser.parse_args()
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    rng = random.Random(args.seed)
+    fridges = [set(fridge) for fridge in generate_fridges(catalog, args.fridges, args.fridge_size, args.seed)]
+    fridges += [{respell(ing, rng) for ing in fridge} for fridge in fridges]
+    # 재료 하나씩만 가진 냉장고도 (기본술 이름 표기 포함)
+    fridges += [{respell(ing, rng)} for ing in catalog_vocab(catalog)]
+
+    workdir = tempfile.mkdtemp(prefix="check_engines_")
+    engines = []
+    try:
+        bin_path = os.path.join(workdir, "catalog.bin")
+        compile_catalog(catalog, bin_path)
+        tree = CocktailTree()
+        tree.build_tree_from_dict(catalog)
+        engines = [("compact", CompactCocktailTree.from_dict(catalog)),
+                   ("compact(bin)", CompactCocktailTree.from_binary(bin_path)),
+                   ("mapped", MappedCompactTree(MappedCatalog(bin_path)))]
+        if args.sharded:
+            from ShardedEvaluator import ShardedEvaluator
+            engines.append(("sharded", ShardedEvaluator(bin_path, processes=2)))
+
+        failures = []
+        for fridge in fridges:
+            expected = answer(tree, fridge)
+            for label, engine in engines:
+                got = answer(engine, fridge)
+                if got != expected:
+                    failures.append((label, fridge, expected, got))
+        print(f"냉장고 {len(fridges)}개 × 엔진 {len(engines)}개 비교: 불일치 {len(failures)}건")
+        for label, fridge, expected, got in failures[:5]:
+            print(f"\n[{label}] 냉장고 {sorted(fridge)}")
+            print(f"  tree   : {expected[0]}  {expected[1]}")
+            print(f"  {label:7s}: {got[0]}  {got[1]}")
+    finally:
+        for _, engine in engines:
+            if hasattr(engine, "close"):
+                engine.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/loadgen.py
+#
+# 사용법: (서버 실행 후) python benchmarks/loadgen.py [--url http://127.0.0.1:8080] [--concurrency 64] [--requests 5000]
+# CocktailServer에 makeable/recommend/lookup 요청을 동시에 보내고
+# 지연 시간 p50/p99와 처리량(요청/초)을 출력한다.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import quote, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CocktailTree import CocktailTree
+
+
+async def request(reader, writer, method: str, path: str, body: dict = None):
+    raw = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: loadgen\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(raw)}\r\n\r\n").encode("latin-1") + raw)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--catalog", default="cocktails.json")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--fridge-size", type=int, default=8)
+    args = parser.parse_args()
+
+    tree = CocktailTree()
+    tree.build_tree_from_json(args.catalog)
+    vocab = tree.get_matcher().ingredient_names
+    names = tree.get_matcher().names
+    url = urlparse(args.url)
+
+    latencies = []
+    statuses = {}
+    remaining = [args.requests]
+
+    async def worker(seed):
+        rng = random.Random(seed)
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                kind = rng.random()
+                start = time.perf_counter()
+                if kind < 0.45:
+                    fridge = rng.sample(vocab, min(args.fridge_size, len(vocab)))
+                    status = await request(reader, writer, "POST", "/makeable", {"ingredients": fridge})
+                elif kind < 0.9:
+                    fridge = rng.sample(vocab, min(args.fridge_size, len(vocab)))
+                    status = await request(reader, writer, "POST", "/recommend", {"ingredients": fridge})
+                else:
+                    status = await request(reader, writer, "GET", "/cocktails/" + quote(rng.choice(names)))
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"요청 {len(latencies)}개, 동시 연결 {args.concurrency}개, {elapsed:.2f}초")
+    print(f"처리량 {len(latencies) / elapsed:.0f} req/s")
+    print(f"p50 {percentile(latencies, 50) * 1000:.2f} ms · p99 {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"응답 코드 {statuses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+# benchmarks/run_suite.py
+#
+# 사용법: python benchmarks/run_suite.py [--sizes 1000 10000 100000] [--output result.json]
+#                                        [--baseline previous.json [--threshold 1.2]]
+# 합성 카탈로그 크기별로 트리 빌드 / find_node_by_name / find_possible_cocktails /
+# recommend_with_one_missing / UserData.save_data 지연 시간과 메모리(tracemalloc)를 재서
+# JSON으로 기록한다. --baseline을 주면 같은 항목끼리 비교해 threshold배 이상 느려진 항목을 알려준다.
+# 시간은 --repeat번 잰 값의 중앙값(ms), 메모리는 MiB.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from CocktailTree import CocktailTree
+from UserData import UserData
+from synthetic import generate_catalog, generate_fridges, generate_user_data
+
+
+def median_ms(fn, args, repeat: int) -> float:
+    """args 전체를 한 번 돌리는 것을 repeat번 재서, 호출 한 번당 시간의 중앙값."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            fn(arg)
+        runs.append((time.perf_counter() - start) / len(args))
+    return round(statistics.median(runs) * 1000, 4)
+
+
+def build_tree(catalog):
+    tree = CocktailTree()
+    tree.build_tree_from_dict(catalog)
+    return tree
+
+
+def measure_build(catalog, repeat: int):
+    """(트리, 빌드 중앙값 ms, 빌드 후 남은 메모리 MiB, 빌드 중 최대 메모리 MiB)"""
+    times = []
+    tree = None
+    for _ in range(repeat):
+        del tree
+        gc.collect()
+        start = time.perf_counter()
+        tree = build_tree(catalog)
+        times.append(time.perf_counter() - start)
+
+    del tree
+    gc.collect()
+    tracemalloc.start()
+    tree = build_tree(catalog)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, round(statistics.median(times) * 1000, 3), round(current / 2 ** 20, 3), round(peak / 2 ** 20, 3)
+
+
+def measure_user_data(catalog, args):
+    """
+    임시 디렉터리의 UserData(SQLite)에 합성 사용자를 저장하며 save_data 한 번당 시간(ms)을 잰다.
+    - save_new: 새 사용자 저장
+    - save_update: 기존 사용자의 재료 하나만 바꿔 다시 저장
+    """
+    users = generate_user_data(catalog, args.users, args.fridge_size, seed=args.seed, zipf=args.zipf)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserData(os.path.join(tmp, "userData.db"), os.path.join(tmp, "userData.pickle"))
+        start = time.perf_counter()
+        for pin, ings in users.items():
+            store.save_data(pin, ings)
+        save_new = (time.perf_counter() - start) / len(users)
+
+        start = time.perf_counter()
+        for pin, ings in users.items():
+            changed = set(ings)
+            changed.pop()
+            changed.add("Suite Extra")
+            store.save_data(pin, changed)
+        save_update = (time.perf_counter() - start) / len(users)
+    return round(save_new * 1000, 4), round(save_update * 1000, 4)
+
+
+def run_size(size: int, args) -> dict:
+    catalog = generate_catalog(size, num_spirits=args.spirits, vocab_size=args.vocab, max_depth=args.depth,
+                               seed=args.seed, branching=args.branching, zipf=args.zipf)
+    fridges = generate_fridges(catalog, args.queries, args.fridge_size, seed=args.seed, zipf=args.zipf)
+    # 있는 이름 절반 + 없는 이름 절반
+    names = [f"cocktail {(i * 7919) % size}" if i % 2 == 0 else f"missing cocktail {i}"
+             for i in range(args.lookups)]
+
+    tree, build_ms, mem_mib, peak_mib = measure_build(catalog, args.repeat)
+    tree.find_node_by_name(names[0])  # 이름 색인 준비
+
+    result = {
+        "recipes": size,
+        "build_ms": build_ms,
+        "memory_mib": mem_mib,
+        "build_peak_mib": peak_mib,
+        "lookup_ms": median_ms(tree.find_node_by_name, names, args.repeat),
+        "possible_ms": median_ms(tree.find_possible_cocktails, fridges, args.repeat),
+        "one_missing_ms": median_ms(tree.recommend_with_one_missing, fridges, args.repeat),
+    }
+    result["save_new_ms"], result["save_update_ms"] = measure_user_data(catalog, args)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """baseline보다 threshold배 이상 커진 (크기, 항목, 이전 값, 지금 값) 리스트."""
+    previous = {row["recipes"]: row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        old = previous.get(row["recipes"])
+        if old is None:
+            continue
+        for metric, value in row.items():
+            before = old.get(metric)
+            if metric == "recipes" or not before:
+                continue
+            if value / before >= threshold:
+                regressions.append((row["recipes"], metric, before, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--spirits", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--branching", type=int, default=None)
+    parser.add_argument("--vocab", type=int, default=500)
+    parser.add_argument("--zipf", type=float, default=1.0)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--fridge-size", type=int, default=30)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="-", help='결과 JSON 파일 ("-"이면 표준 출력)')
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        row = run_size(size, args)
+        results.append(row)
+        print("  ".join(f"{key}={value}" for key, value in row.items()), file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "params": {key: value for key, value in vars(args).items()
+                       if key not in ("output", "baseline", "threshold")},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for size, metric, before, after in regressions:
+            print(f"느려짐: recipes={size} {metric} {before} → {after} ({after / before:.2f}배)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/synthetic.py
+
+import random
+from itertools import accumulate
+
+
+def zipf_weights(n: int, s: float) -> list:
+    """순위 k(1..n)의 인기도가 1 / k^s 인 누적 가중치 (s = 0이면 모두 같은 인기도)."""
+    return list(accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+
+def generate_catalog(num_recipes: int, num_spirits: int = 8, vocab_size: int = 500,
+                     max_depth: int = 8, seed: int = 0, branching: int = None,
+                     zipf: float = 0.0) -> dict:
+    """
+    cocktails.json과 같은 형식의 합성 카탈로그 딕셔너리를 만든다.
+    - 루트("Empty Glass") 아래에 기본술 num_spirits개
+    - 새 노드는 깊이가 max_depth 미만인 기존 노드 중 하나를 무작위로 골라 부모로 삼고,
+      부모까지의 재료와 겹치지 않는 재료 1개를 추가한다.
+    - branching: 노드 하나가 가질 수 있는 최대 자식 수 (None이면 제한 없음)
+    - zipf: 재료 인기도의 Zipf 지수. 0이면 모든 재료가 같은 확률,
+            클수록 "Ingredient 0", "Ingredient 1" ... 같은 앞쪽 재료가 많이 쓰인다.
+    - 칵테일(노드) 수는 기본술을 포함해 num_recipes개
+    같은 인자와 seed면 항상 같은 카탈로그가 나온다.
+    """
+    rng = random.Random(seed)
+    vocab = [f"Ingredient {i}" for i in range(vocab_size)]
+    if zipf:
+        cum_weights = zipf_weights(vocab_size, zipf)
+        pick = lambda: rng.choices(vocab, cum_weights=cum_weights)[0]
+    else:
+        pick = lambda: vocab[rng.randrange(vocab_size)]
+
+    root = {"name": "Empty Glass", "ingredients": [], "children": []}
+    # (노드 딕셔너리, 깊이, 누적 재료 집합)
+    nodes = []
+    for s in range(min(num_spirits, num_recipes)):
+        spirit = {"name": f"Spirit {s}", "ingredients": [], "children": []}
+        root["children"].append(spirit)
+        nodes.append((spirit, 1, frozenset([spirit["name"]])))
+
+    if branching is None:
+        while len(nodes) < num_recipes:
+            parent, depth, used = nodes[rng.randrange(len(nodes))]
+            if depth >= max_depth:
+                continue
+            ing = pick()
+            if ing in used:
+                continue
+            child = {"name": f"Cocktail {len(nodes)}", "ingredients": [ing], "children": []}
+            parent["children"].append(child)
+            nodes.append((child, depth + 1, used | {ing}))
+        return root
+
+    # 자식을 더 붙일 수 있는 노드 번호들 (가득 차면 맨 끝 원소와 바꿔서 뺀다)
+    open_ids = [i for i, (_, depth, _) in enumerate(nodes) if depth < max_depth]
+    while len(nodes) < num_recipes:
+        if not open_ids:
+            raise ValueError(f"max_depth={max_depth}, branching={branching}로는 "
+                             f"칵테일 {num_recipes}개를 만들 수 없습니다.")
+        slot = rng.randrange(len(open_ids))
+        parent, depth, used = nodes[open_ids[slot]]
+        ing = pick()
+        if ing in used:
+            continue
+        child = {"name": f"Cocktail {len(nodes)}", "ingredients": [ing], "children": []}
+        parent["children"].append(child)
+        if len(parent["children"]) >= branching:
+            open_ids[slot] = open_ids[-1]
+            open_ids.pop()
+        if depth + 1 < max_depth:
+            open_ids.append(len(nodes))
+        nodes.append((child, depth + 1, used | {ing}))
+    return root
+
+
+def catalog_vocab(catalog: dict) -> list:
+    """카탈로그에 등장하는 재료(기본술 포함) 정렬 리스트."""
+    vocab = set()
+    stack = [catalog]
+    while stack:
+        node = stack.pop()
+        vocab.update(node.get("ingredients", []))
+        stack.extend(node.get("children", []))
+    vocab.update(spirit["name"] for spirit in catalog.get("children", []))
+    return sorted(vocab)
+
+
+def generate_fridges(catalog: dict, count: int, size: int = 20, seed: int = 0,
+                     zipf: float = 0.0) -> list:
+    """
+    카탈로그에 등장하는 재료(기본술 포함) 중에서 size개씩 뽑은 냉장고 count개.
+    zipf > 0이면 카탈로그와 같은 규칙(앞쪽 재료일수록 인기)으로 인기 있는 재료를 더 자주 갖고 있다.
+    """
+    rng = random.Random(seed)
+    vocab = catalog_vocab(catalog)
+    size = min(size, len(vocab))
+    if not zipf:
+        return [set(rng.sample(vocab, size)) for _ in range(count)]
+
+    # "Ingredient 12" → 12 순위, 기본술은 가장 인기 있는 쪽에 둔다
+    ranked = sorted(vocab, key=lambda ing: int(ing.rsplit(" ", 1)[1]) if ing.startswith("Ingredient ") else -1)
+    cum_weights = zipf_weights(len(ranked), zipf)
+    fridges = []
+    for _ in range(count):
+        fridge = set()
+        while len(fridge) < size:
+            fridge.update(rng.choices(ranked, cum_weights=cum_weights, k=size - len(fridge)))
+        fridges.append(fridge)
+    return fridges
+
+
+def generate_user_data(catalog: dict, count: int, size: int = 20, seed: int = 0,
+                       zipf: float = 0.0, first_pin: int = 1000) -> dict:
+    """UserData.data와 같은 형식 {pin: 재료 set} 의 합성 사용자 count명."""
+    fridges = generate_fridges(catalog, count, size, seed, zipf)
+    return {first_pin + i: fridge for i, fridge in enumerate(fridges)}
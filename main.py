@@ -2,14 +2,13 @@
 
 import os
 import sys
-from typing import Union
 
 
 # 현재 파일과 동일한 디렉터리에 CocktailTree.py, CocktailNode.py가 있다고 가정
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from CocktailTree import CocktailTree
-from UserData import UserData
+from CatalogManager import CatalogManager
+from Preload import Preload
 
 
 def print_recipe_path(node):
@@ -39,6 +38,18 @@ def print_recipe_path(node):
             print(f"{indent}└── {display}")
 
 
+def load_user_data(catalog):
+    # sqlite3 등을 불러오는 시간까지 백그라운드 스레드에서 (로그인 메뉴는 먼저 출력)
+    from UserData import UserData
+    from WriteBehind import WriteBehind
+
+    user_data = WriteBehind(UserData())
+    # 저장된 재료 표기는 카탈로그 재료가 인터닝된 뒤에야 대표 표기로 바뀌므로,
+    # 첫 트리가 준비된 다음에 사용자 데이터를 내준다 (login()의 load_data가 트리보다 먼저 돌지 않게)
+    catalog.wait()
+    return user_data
+
+
 def printMenu():
     print("")
     print("┌───────── <프로그램 기능> ────────────┐")
@@ -72,7 +83,7 @@ def getPin() -> int:
     return pin
 
 
-def login() -> Union[int, set]:
+def login() -> tuple:
     isRestart = True
     while True:
         if isRestart:
@@ -89,6 +100,7 @@ def login() -> Union[int, set]:
 
         if command == 1:    # 로그인
             pin = getPin()
+            userData = users.get()
             if userData.isValid(pin):
                 my_ingredients = userData.load_data(pin)
                 return pin, my_ingredients
@@ -98,6 +110,7 @@ def login() -> Union[int, set]:
 
         elif command == 2:  # 회원가입
             pin = getPin()
+            userData = users.get()
             if userData.isValid(pin):
                 print("  이미 사용중인 핀번호입니다.")
             else:
@@ -119,9 +132,12 @@ def login() -> Union[int, set]:
 
 if __name__ == "__main__":
 
-    tree = CocktailTree()
-    tree.build_tree_from_json("cocktails.json")
-    userData = UserData()
+    # cocktails.json이 바뀌면 감시 스레드가 새 트리로 바꿔 끼운다 (재시작할 필요 없음)
+    # 첫 트리도 감시 스레드에서 만들므로 (cocktails.bin 스냅숏이 새로우면 그것으로) 로그인 메뉴를 바로 띄운다
+    catalog = CatalogManager("cocktails.json", wait=False)
+    tree = None
+    # 재료 추가/삭제는 모아 두었다가 백그라운드에서 기록 (종료할 때 남은 변경도 기록됨)
+    users = Preload(lambda: load_user_data(catalog), name="user-data-loader")
 
     my_ingredients = set()
     isRestart = True
@@ -133,10 +149,20 @@ if __name__ == "__main__":
         if not islogin:
             pin, my_ingredients = login()
             islogin = True
+            if not shutdown:
+                userData = users.get()
+                tree = catalog.wait()
+                # 재료를 추가할 때마다 결과를 증분으로 갱신 (조회할 때 트리 전체를 다시 훑지 않음)
+                fridge = tree.open_fridge(my_ingredients)
 
         if shutdown:
             break
 
+        if catalog.tree is not tree or fridge.version != tree.version:
+            # 카탈로그가 다시 로드되었거나 바뀌었으면 새 트리로 냉장고를 다시 연다
+            tree = catalog.tree
+            fridge = tree.open_fridge(my_ingredients)
+
         if isRestart:
             printMenu()
         else:
@@ -166,6 +192,9 @@ if __name__ == "__main__":
                     print("-", ing)
             else:
                 print("해당 칵테일을 찾을 수 없습니다.")
+                similar = tree.search_fuzzy(cocktail_name)
+                if similar:
+                    print("혹시 이 칵테일을 찾으셨나요?", ", ".join(n.name for n in similar))
 
             if node:
                 print(f"\n🌳 '{cocktail_name}' 레시피 트리:")
@@ -174,7 +203,7 @@ if __name__ == "__main__":
         elif command == 3:
             # 현재 만들 수 있는 칵테일 조회하기
             print("\n✅ 내가 가진 재료로 만들 수 있는 칵테일:")
-            possible_list = tree.find_possible_cocktails(my_ingredients)
+            possible_list = fridge.find_possible_cocktails()
             if possible_list:
                 for name in possible_list:
                     print("-", name)
@@ -192,9 +221,11 @@ if __name__ == "__main__":
 
         elif command == 5:
             # 재료 추가하기
-            cocktail_name = input("▶ 추가할 재료를 입력하세요: ").strip()
+            # 대소문자/공백/동의어를 정리한 대표 이름으로 저장 ("gin " → "Gin")
+            cocktail_name = tree.registry.canonical(input("▶ 추가할 재료를 입력하세요: "))
             my_ingredients.add(cocktail_name)
-            userData.save_data(pin, my_ingredients)
+            fridge.add(cocktail_name)
+            userData.add_ingredient(pin, cocktail_name)
 
         elif command == 6:
             # 로그아웃
@@ -209,7 +240,7 @@ if __name__ == "__main__":
         elif command == 8:
             # 추천 재료 보기
             print("\n🎯 하나만 더 추가하면 만들 수 있는 칵테일 추천:")
-            recs = tree.recommend_with_one_missing(my_ingredients)
+            recs = fridge.recommend_with_one_missing()
             if not recs:
                 print("현재 가진 재료에 하나만 추가해도 만들 수 있는 칵테일이 없습니다.")
             else:
@@ -221,3 +252,5 @@ if __name__ == "__main__":
             isRestart = False
             print("  번호를 다시 입력해주세요.")
             continue
+
+    users.get().close()  # 남은 재료 변경을 기록하고 종료
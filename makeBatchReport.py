@@ -0,0 +1,33 @@
+import json
+import sys
+import time
+
+from CocktailTree import CocktailTree
+from UserData import UserData
+
+# 1) 카탈로그와 사용자 저장소
+CATALOG_PATH = "cocktails.json"
+
+# 2) 결과를 저장할 파일명 (한 줄에 사용자 한 명, JSON Lines). "-"이면 표준 출력
+OUTPUT_PATH = sys.argv[1] if len(sys.argv) > 1 else "batchReport.jsonl"
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+
+    # 3) 트리 생성
+    tree = CocktailTree()
+    tree.build_tree_from_json(CATALOG_PATH)
+
+    # 4) 모든 사용자를 한 번에 평가하면서, 결과가 나오는 대로 한 줄씩 기록
+    out = sys.stdout if OUTPUT_PATH == "-" else open(OUTPUT_PATH, "w", encoding="utf-8")
+    count = 0
+    for pin, possible, one_missing in tree.evaluate_batch(UserData().data):
+        out.write(json.dumps({"pin": pin, "possible": possible, "one_missing": one_missing},
+                             ensure_ascii=False) + "\n")
+        count += 1
+    if out is not sys.stdout:
+        out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"사용자 {count}명의 결과를 기록했습니다. ({elapsed:.2f}초)", file=sys.stderr)
@@ -0,0 +1,28 @@
+import hashlib
+import json
+import time
+
+from BinaryCatalog import compile_catalog
+
+# 1) 원본 JSON 카탈로그
+INPUT_JSON_PATH = "cocktails.json"
+
+# 2) 바이너리 카탈로그로 저장할 파일명 (CocktailTree.build_tree_from_binary가 이를 읽습니다.
+#    헤더에 원본 JSON의 sha256을 적어 두므로, CatalogManager는 cocktails.json 내용이 그대로일 때만
+#    cocktails.bin을 미리 컴파일된 스냅숏으로 씁니다)
+OUTPUT_BIN_PATH = "cocktails.bin"
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+
+    # 3) JSON 읽기
+    with open(INPUT_JSON_PATH, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw.decode("utf-8"))
+
+    # 4) 바이너리 카탈로그로 저장 (원본 JSON 내용의 sha256과 함께)
+    node_count = compile_catalog(data, OUTPUT_BIN_PATH, source_digest=hashlib.sha256(raw).hexdigest())
+
+    elapsed = time.perf_counter() - start
+    print(f"‘{OUTPUT_BIN_PATH}’ 파일이 생성되었습니다. (노드 {node_count}개, {elapsed:.2f}초)")
@@ -0,0 +1,35 @@
+import csv
+import sys
+import time
+
+from CocktailTree import CocktailTree
+
+# 1) 원본 JSON 카탈로그
+CATALOG_PATH = "cocktails.json"
+
+# 2) 결과를 저장할 파일명 (CSV: 칵테일, 만드는 순서, 전체 재료). "-"이면 표준 출력
+OUTPUT_PATH = sys.argv[1] if len(sys.argv) > 1 else "recipes.csv"
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+
+    # 3) 트리 생성
+    tree = CocktailTree()
+    tree.build_tree_from_json(CATALOG_PATH)
+
+    # 4) 레시피 경로를 하나씩 받아 바로 기록 (전체 결과를 메모리에 모으지 않음)
+    out = sys.stdout if OUTPUT_PATH == "-" else open(OUTPUT_PATH, "w", encoding="utf-8", newline="")
+    writer = csv.writer(out)
+    writer.writerow(["cocktail", "path", "ingredients"])
+    count = 0
+    for node, path in tree.iter_recipe_paths():
+        if node.name == "Empty Glass":
+            continue
+        writer.writerow([node.name, " > ".join(n.name for n in path[1:]), ", ".join(node.full_ingredients)])
+        count += 1
+    if out is not sys.stdout:
+        out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"칵테일 {count}개의 레시피를 기록했습니다. ({elapsed:.2f}초)", file=sys.stderr)
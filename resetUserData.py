@@ -1,5 +1,8 @@
+import os
 import pickle
 
+from UserData import UserData
+
 남궁석 = 20222890
 송민혁 = 20202939
 
@@ -8,12 +11,16 @@ userData = {
     송민혁 : {"Gin", "Dry Vermouth", "Olive Brine", "Olive Garnish"},
 }
 
-# 파일로 저장
+# 파일로 저장 (예전 형식, 저장소가 처음 만들어질 때 가져오는 원본)
 with open('userData.pickle', 'wb') as f:
     pickle.dump(userData, f)
+
+# 저장소(userData.db)를 지우고 다시 만든다
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists("userData.db" + suffix):
+        os.remove("userData.db" + suffix)
+
+# 저장소 불러오기 (userData.pickle의 내용을 가져옴)
+loaded = UserData()
     
-# 파일 불러오기
-with open('userData.pickle', 'rb') as f:
-    loaded_dict = pickle.load(f)
-    
-print(loaded_dict)
\ No newline at end of file
+print(loaded.data)